@@ -1,4 +1,4 @@
-from typing import Literal
+from typing import Literal, Set
 from contextlib import suppress
 
 from discord import (
@@ -17,6 +17,7 @@ from discord.utils import format_dt, utcnow, oauth_url
 from datetime import timedelta
 
 from tools.utilities import Plural
+from tools.utilities.aliases import artist_aliases
 
 import config
 from tools.managers.cog import Cog
@@ -26,16 +27,20 @@ from tools.managers.context import Context
 class Developer(Cog):
     """Cog for Developer commands."""
 
+    async def cog_load(self: "Developer") -> None:
+        self.hardbans: Set[int] = {
+            row["user_id"] for row in await self.bot.db.fetch("SELECT user_id FROM hardban")
+        }
+
     async def cog_check(self: "Developer", ctx: Context) -> bool:
         return super().cog_check(ctx) and ctx.author.id in config.owners
 
     # Listener to see if user is hardbanned
     @Cog.listener("on_member_join")
     async def hardban_listener(self, member: Member):
-        if await self.bot.db.fetchval(
-            "SELECT user_id FROM hardban WHERE user_id = $1", member.id
-        ):
-            await member.ban(reason="Hard banned by developer")
+        if member.id in self.hardbans:
+            with suppress(HTTPException):
+                await member.ban(reason="Hard banned by developer")
 
     @command(
         name="metrics",
@@ -241,6 +246,8 @@ class Developer(Cog):
         except Exception:
             return await ctx.error(f"**{user}** is already a **donator**")
 
+        self.bot.entitlements.donators.add(user.id)
+        self.bot.reskin.invalidate(user_id=user.id)
         await ctx.approve(f"Added **{user}** to the **donators**")
 
     @donator.command(
@@ -258,6 +265,8 @@ class Developer(Cog):
             return await ctx.error(f"**{user}** isn't a **donator**")
 
         await self.bot.db.execute("DELETE FROM donators WHERE user_id = $1", user.id)
+        self.bot.entitlements.donators.discard(user.id)
+        self.bot.reskin.invalidate(user_id=user.id)
 
         return await ctx.approve(f"Removed **{user}** from the **donators**")
 
@@ -284,6 +293,67 @@ class Developer(Cog):
             )
         )
 
+    @group(
+        name="artistalias",
+        usage="(subcommand) <args>",
+        example="add \"Lucky Twice\" Lucki",
+        aliases=["fmalias"],
+        invoke_without_command=True,
+    )
+    async def artistalias(self: "Developer", ctx: Context):
+        """Manage the Last.fm artist aliases"""
+
+        await ctx.send_help()
+
+    @artistalias.command(
+        name="add",
+        usage="(spelling) (artist)",
+        example="\"Lucky Twice\" Lucki",
+        aliases=["a", "set"],
+    )
+    async def artistalias_add(
+        self: "Developer", ctx: Context, source: str, *, output: str
+    ):
+        """Normalize a spelling of an artist"""
+
+        artist_aliases.add(source, output)
+        await ctx.approve(f"Now normalizing **{source}** to **{output}**")
+
+    @artistalias.command(
+        name="remove",
+        usage="(spelling)",
+        example="Lucky Twice",
+        aliases=["delete", "del", "rm"],
+    )
+    async def artistalias_remove(self: "Developer", ctx: Context, *, source: str):
+        """Stop normalizing a spelling of an artist"""
+
+        if not artist_aliases.remove(source):
+            return await ctx.error(f"There isn't an **alias** for **{source}**")
+
+        await ctx.approve(f"No longer normalizing **{source}**")
+
+    @artistalias.command(
+        name="list",
+        aliases=["l"],
+    )
+    async def artistalias_list(self: "Developer", ctx: Context):
+        """List all the artist aliases"""
+
+        aliases = [
+            f"**{source}** → **{output}**"
+            for source, output in artist_aliases.read().items()
+        ]
+        if not aliases:
+            return await ctx.error("There are no **artist aliases**")
+
+        await ctx.paginate(
+            Embed(
+                title="Artist aliases",
+                description=aliases,
+            )
+        )
+
     @group(
         name="server",
         usage="(subcommand) <args>",
@@ -520,6 +590,7 @@ class Developer(Cog):
             "INSERT INTO hardban (user_id) VALUES ($1)",
             user.id,
         )
+        self.hardbans.add(user.id)
 
         for guild in self.bot.guilds:
             with suppress(Exception):
@@ -550,6 +621,7 @@ class Developer(Cog):
             "DELETE FROM hardban WHERE user_id = $1",
             user.id,
         )
+        self.hardbans.discard(user.id)
 
         await ctx.message.add_reaction("✅")
         await ctx.message.add_reaction("✨")
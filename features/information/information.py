@@ -28,7 +28,6 @@ from discord.ext.commands import (
 from discord.utils import format_dt, utcnow
 from yarl import URL
 
-import config
 from tools import services
 from tools.models.instagram import InstagramProfile
 from tools.converters.basic import Color, Location, Date
@@ -52,7 +51,7 @@ class Information(Cog):
 
         if not command:
             return await ctx.neutral(
-                f"Click [**here**](https://lains.life/commands) to view **{len(set(self.bot.walk_commands()))}** commands"
+                f"Click [**here**](https://lains.life/commands) to view **{len(self.bot.command_index.commands)}** commands"
             )
 
         _command = command
@@ -61,98 +60,7 @@ class Information(Cog):
         if not command:
             return await ctx.error(f"Command `{_command}` doesn't exist")
 
-        embed = Embed(
-            description=command.short_doc or "No description provided",
-            color=config.Color.neutral,
-        )
-        embed.description += (
-            f"\n>>> ```bf\nSyntax: {ctx.prefix}{command.qualified_name} {command.usage or ''}\n"
-            + (
-                f"Example: {ctx.prefix}{command.qualified_name} {command.example}"
-                if command.example
-                else ""
-            )
-            + "```"
-        )
-        embed.set_author(
-            name=command.cog_name or "No category",
-            icon_url=self.bot.user.display_avatar,
-            url=f"https://discord.com",
-        )
-
-        embed.add_field(
-            name="Aliases",
-            value=", ".join([f"`{alias}`" for alias in command.aliases]) or "`N/A`",
-            inline=(False if len(command.aliases) >= 4 else True),
-        )
-        embed.add_field(
-            name="Parameters",
-            value=", ".join([f"`{param}`" for param in command.clean_params])
-            or "`N/A`",
-            inline=True,
-        )
-        embed.add_field(
-            name="Permissions",
-            value=", ".join(
-                list(
-                    map(
-                        lambda p: "`" + p.replace("_", " ").title() + "`",
-                        await command.permissions(),
-                    )
-                )
-            )
-            or "`N/A`",
-            inline=True,
-        )
-
-        if command.parameters:
-            embed.add_field(
-                name="Optional Parameters",
-                value="\n".join(
-                    [
-                        "`"
-                        + ("--" if parameter.get("require_value", True) else "-")
-                        + f"{parameter_name}` "
-                        + (
-                            (
-                                ("(" if not parameter.get("default") else "[")
-                                + " | ".join(
-                                    [
-                                        f"`{choice}`"
-                                        for choice in parameter.get("choices", [])
-                                    ]
-                                )
-                                + (")" if not parameter.get("default") else "]")
-                            )
-                            if parameter.get("choices")
-                            else (
-                                (
-                                    "`"
-                                    + str(parameter["converter"])
-                                    .split("'", 1)[1]
-                                    .split("'")[0]
-                                    + "`"
-                                    if parameter.get("converter")
-                                    else ""
-                                )
-                            )
-                            if parameter.get("converter")
-                            and not getattr(parameter.get("converter"), "__name__", "")
-                            in ("int")
-                            else (
-                                f"(`{parameter.get('minimum', 1)}`-`{parameter.get('maximum', 100)}`)"
-                                if getattr(parameter.get("converter"), "__name__", "")
-                                == "int"
-                                else ""
-                            )
-                        )
-                        + f"\n> {parameter['description']}"
-                        for parameter_name, parameter in command.parameters.items()
-                    ]
-                ),
-                inline=False,
-            )
-
+        embed = self.bot.command_index.help(command, ctx.prefix)
         await ctx.send(embed=embed)
 
     @command(name="ping", aliases=["latency"])
@@ -224,7 +132,7 @@ class Information(Cog):
             name="Client",
             value=(
                 f"**Servers:** {comma(len(self.bot.guilds))}"
-                + f"\n**Commands:** {comma(len(set(self.bot.walk_commands())))}"
+                + f"\n**Commands:** {comma(len(self.bot.command_index.commands))}"
             )
             + f"\n**Latency:** {self.bot.latency * 1000:.2f}ms",
             inline=True,
@@ -1,11 +1,10 @@
-from asyncio import TimeoutError, gather, sleep
+from asyncio import TimeoutError, sleep
 from contextlib import suppress
 from datetime import datetime
 from random import choice
-from typing import Literal, Optional, Union
+from typing import Dict, List, Literal, Optional, Tuple, Union
 from yarl import URL
 
-from aiohttp import ClientTimeout
 from discord import ActivityType, Color, Embed, HTTPException, Member, Message, Spotify
 from discord.ext.commands import (
     BucketType,
@@ -22,13 +21,40 @@ from tools.converters.basic import ChartSize, MemberStrict, State
 from tools.converters.embed import EmbedScript, EmbedScriptValidator
 from tools.managers.cog import Cog
 from tools.managers.context import Context
+from tools.managers.lastfm import LastfmClient
+from tools.managers.leaderboard import Leaderboards
+from tools.managers.library import LibraryBuffer
+from tools.managers.taste import Taste
 from tools.utilities.humanize import percentage
+from tools.utilities.image import collage
 from tools.utilities.text import Plural, format_uri, shorten
 
 
 class lastfm(Cog, name="Last.fm Integration"):
     """Last.fm Integration"""
 
+    async def cog_load(self) -> None:
+        self.library = LibraryBuffer(self.bot.db)
+        self.leaderboards = Leaderboards(self.bot.db)
+        self.client = LastfmClient(
+            self.bot.session,
+            url="https://fm.lains.life",
+            token="lainJIKASDN9qwikfa3sIOAWKF",
+        )
+        self.fm_commands: Dict[int, Dict[str, List[Tuple[int, bool]]]] = {}
+
+    async def cog_unload(self) -> None:
+        await self.library.close()
+
+    def track_plays(
+        self, table: str, user_id: int, username: str, *names: str, plays: int
+    ) -> None:
+        """Queue a library update and apply it to the global leaderboards"""
+
+        self.library.add(table, user_id, username, *names, plays=plays)
+        if plays is not None and all(names):
+            self.leaderboards.update(table, user_id, username, *names, plays=plays)
+
     def get_color(self, ctx: Context, config: dict):
         return config.get("color") if isinstance(config.get("color"), int) else (None)
 
@@ -39,36 +65,44 @@ class lastfm(Cog, name="Last.fm Integration"):
         if not message.content:
             return
 
-        commands = await self.bot.db.fetch(
-            "SELECT * FROM lastfm_commands WHERE guild_id = $1 AND command = $2",
-            ctx.guild.id,
-            message.content.split(" ")[0].lower(),
-        )
-        for command in commands:
-            if not command.get("public") and ctx.author.id != command.get("user_id"):
+        commands = await self.custom_commands(ctx.guild.id)
+        for user_id, public in commands.get(
+            message.content.split(" ")[0].lower(), ()
+        ):
+            if not public and ctx.author.id != user_id:
                 continue
 
             await ctx.invoke(self.nowplaying)
             break
 
+    async def custom_commands(self, guild_id: int) -> Dict[str, List[Tuple[int, bool]]]:
+        """Return the custom now playing commands of a guild, keyed by command"""
+
+        if (commands := self.fm_commands.get(guild_id)) is not None:
+            return commands
+
+        commands = {}
+        for row in await self.bot.db.fetch(
+            "SELECT user_id, command, public FROM lastfm_commands WHERE guild_id = $1",
+            guild_id,
+        ):
+            commands.setdefault(row["command"], []).append(
+                (row["user_id"], row["public"])
+            )
+
+        self.fm_commands[guild_id] = commands
+        return commands
+
     async def request(self, path: str, payload: dict):
-        response = await self.bot.session.get(
-            "https://fm.lains.life" + path,
-            params=payload,
-            timeout=ClientTimeout(total=None),
-            headers=dict(
-                Authorization="lainJIKASDN9qwikfa3sIOAWKF",
-            ),
-        )
-        data = await response.json()
+        status, data = await self.client.get(path, payload)
 
-        if response.status == 503:
+        if status == 503:
             raise CommandError(
                 "**Last.fm:** Operation failed - The backend service didn't respond"
             )
-        elif response.status == 429:
+        elif status == 429:
             raise CommandError("**Last.fm:** Operation failed - Rate limit exceeded")
-        elif response.status == 404:
+        elif status == 404:
             if data["message"] == "User not found":
                 raise CommandError(
                     f"[**{payload['username']}**](https://last.fm/user/{format_uri(payload['username'])}) is not a valid **Last.fm**"
@@ -81,7 +115,7 @@ class lastfm(Cog, name="Last.fm Integration"):
             elif data["message"] == "Track not found":
                 raise CommandError("Invalid track according to **Last.fm**")
             return None
-        elif response.status == 400:
+        elif status == 400:
             if data["message"] == "Collage size invalid":
                 raise CommandError(
                     "Collage size **incorrectly formatted** - example: `6x6`"
@@ -113,6 +147,17 @@ class lastfm(Cog, name="Last.fm Integration"):
                 )
             raise CommandError(f"**Last.fm:** {data['message']}")
 
+        if (
+            path.startswith("/library/")
+            and data
+            and isinstance(data[-1], dict)
+            and "failed" in data[-1]
+        ):
+            # The backend couldn't fetch every page, never store half a library.
+            raise CommandError(
+                f"**Last.fm:** Operation failed - Couldn't fetch **{Plural(len(data[-1]['failed'])):page}** of the library"
+            )
+
         return data
 
     async def get_username(self, ctx: Context, user: Member | str = None):
@@ -225,32 +270,29 @@ class lastfm(Cog, name="Last.fm Integration"):
                 await message.add_reaction(reactions.get("upvote") or "👍🏾")
                 await message.add_reaction(reactions.get("downvote") or "👎🏾")
 
-        await self.bot.db.execute(
-            "INSERT INTO lastfm_library.artists (user_id, username, artist, plays) VALUES ($1, $2, $3, $4) ON CONFLICT (user_id, artist) DO UPDATE"
-            " SET plays = $4",
+        self.track_plays(
+            "artists",
             member.id,
             username,
             data["artist"].get("name"),
-            data["artist"].get("plays"),
+            plays=data["artist"].get("plays"),
         )
         if data.get("album"):
-            await self.bot.db.execute(
-                "INSERT INTO lastfm_library.albums (user_id, username, artist, album, plays) VALUES ($1, $2, $3, $4, $5) ON CONFLICT (user_id,"
-                " artist, album) DO UPDATE SET plays = $5",
+            self.track_plays(
+                "albums",
                 member.id,
                 username,
                 data["artist"].get("name"),
                 data["album"].get("name"),
-                data["album"].get("plays"),
+                plays=data["album"].get("plays"),
             )
-        await self.bot.db.execute(
-            "INSERT INTO lastfm_library.tracks (user_id, username, artist, track, plays) VALUES ($1, $2, $3, $4, $5) ON CONFLICT (user_id, artist,"
-            " track) DO UPDATE SET plays = $5",
+        self.track_plays(
+            "tracks",
             member.id,
             username,
             data["artist"].get("name"),
             data.get("name"),
-            data.get("plays"),
+            plays=data.get("plays"),
         )
 
         return data, message
@@ -357,6 +399,7 @@ class lastfm(Cog, name="Last.fm Integration"):
             substring,
             ctx.parameters.get("public") or False,
         )
+        self.fm_commands.pop(ctx.guild.id, None)
         await ctx.approve(
             f"Your **now playing** command has been set to `{substring}`"
             + (" (public)" if ctx.parameters.get("public") else "")
@@ -393,6 +436,7 @@ class lastfm(Cog, name="Last.fm Integration"):
             substring,
             state,
         )
+        self.fm_commands.pop(ctx.guild.id, None)
         await ctx.approve(
             f"{'Enabled' if state else 'Disabled'} the **public** flag for `{substring}`"
         )
@@ -428,6 +472,7 @@ class lastfm(Cog, name="Last.fm Integration"):
             except:
                 await ctx.error(f"**{member}** doesn't have a **custom command**")
             else:
+                self.fm_commands.pop(ctx.guild.id, None)
                 await ctx.approve(
                     f"Removed {member.mention}'s **custom command**"
                     if member != ctx.author
@@ -449,6 +494,7 @@ class lastfm(Cog, name="Last.fm Integration"):
             except:
                 return await ctx.error(f"No **custom command** found for `{substring}`")
 
+            self.fm_commands.pop(ctx.guild.id, None)
             return await ctx.approve(
                 f"Removed the **custom command** for `{substring}`"
             )
@@ -525,14 +571,6 @@ class lastfm(Cog, name="Last.fm Integration"):
         )
 
         await ctx.load("Started **index** of your **Last.fm** library..")
-        queries = [
-            "DELETE FROM lastfm_library.artists WHERE user_id = $1;",
-            "DELETE FROM lastfm_library.albums WHERE user_id = $1;",
-            "DELETE FROM lastfm_library.tracks WHERE user_id = $1;",
-        ]
-
-        await gather(*[self.bot.db.execute(query, ctx.author.id) for query in queries])
-
         await ctx.load("Started **index** of your **Last.fm** artist library..")
         artists = await self.request(
             "/library/artists",
@@ -540,23 +578,30 @@ class lastfm(Cog, name="Last.fm Integration"):
                 username=data.get("username"),
             ),
         )
-        if artists:
-            await ctx.load("Saving **index** of your **Last.fm** artist library..")
-            await self.bot.db.executemany(
-                "INSERT INTO lastfm_library.artists (user_id, username, artist, plays) VALUES ($1, $2, $3, $4) ON CONFLICT (user_id, artist) DO"
-                " UPDATE SET plays = $4",
-                [
-                    (
-                        ctx.author.id,
-                        data.get("username"),
-                        artist.get("name"),
-                        artist.get("plays"),
-                    )
-                    for artist in artists
-                ],
+        # Replaced only once the fetch went through and atomically, a failure keeps
+        # the old library.
+        async with self.bot.db.acquire() as connection, connection.transaction():
+            await connection.execute(
+                "DELETE FROM lastfm_library.artists WHERE user_id = $1",
+                ctx.author.id,
             )
-        else:
-            await ctx.load("Aborting **index** of your **Last.fm** artist library..")
+            if artists:
+                await ctx.load("Saving **index** of your **Last.fm** artist library..")
+                await connection.executemany(
+                    "INSERT INTO lastfm_library.artists (user_id, username, artist, plays) VALUES ($1, $2, $3, $4) ON CONFLICT (user_id, artist) DO"
+                    " UPDATE SET plays = $4",
+                    [
+                        (
+                            ctx.author.id,
+                            data.get("username"),
+                            artist.get("name"),
+                            artist.get("plays"),
+                        )
+                        for artist in artists
+                    ],
+                )
+            else:
+                await ctx.load("Aborting **index** of your **Last.fm** artist library..")
 
         await ctx.load("Started **index** of your **Last.fm** album library..")
         albums = await self.request(
@@ -565,24 +610,29 @@ class lastfm(Cog, name="Last.fm Integration"):
                 username=data.get("username"),
             ),
         )
-        if albums:
-            await ctx.load("Saving **index** of your **Last.fm** album library..")
-            await self.bot.db.executemany(
-                "INSERT INTO lastfm_library.albums (user_id, username, artist, album, plays) VALUES ($1, $2, $3, $4, $5) ON CONFLICT (user_id,"
-                " artist, album) DO UPDATE SET plays = $5",
-                [
-                    (
-                        ctx.author.id,
-                        data.get("username"),
-                        album.get("artist"),
-                        album.get("name"),
-                        album.get("plays"),
-                    )
-                    for album in albums
-                ],
+        async with self.bot.db.acquire() as connection, connection.transaction():
+            await connection.execute(
+                "DELETE FROM lastfm_library.albums WHERE user_id = $1",
+                ctx.author.id,
             )
-        else:
-            await ctx.load("Aborting **index** of your **Last.fm** album library..")
+            if albums:
+                await ctx.load("Saving **index** of your **Last.fm** album library..")
+                await connection.executemany(
+                    "INSERT INTO lastfm_library.albums (user_id, username, artist, album, plays) VALUES ($1, $2, $3, $4, $5) ON CONFLICT (user_id,"
+                    " artist, album) DO UPDATE SET plays = $5",
+                    [
+                        (
+                            ctx.author.id,
+                            data.get("username"),
+                            album.get("artist"),
+                            album.get("name"),
+                            album.get("plays"),
+                        )
+                        for album in albums
+                    ],
+                )
+            else:
+                await ctx.load("Aborting **index** of your **Last.fm** album library..")
 
         await ctx.load("Started **index** of your **Last.fm** track library..")
         tracks = await self.request(
@@ -591,25 +641,57 @@ class lastfm(Cog, name="Last.fm Integration"):
                 username=data.get("username"),
             ),
         )
-        if tracks:
-            await ctx.load("Saving **index** of your **Last.fm** track library..")
-            await self.bot.db.executemany(
-                "INSERT INTO lastfm_library.tracks (user_id, username, artist, track, plays) VALUES ($1, $2, $3, $4, $5) ON CONFLICT (user_id,"
-                " artist, track) DO UPDATE SET plays = $5",
-                [
-                    (
-                        ctx.author.id,
-                        data.get("username"),
-                        track.get("artist"),
-                        track.get("name"),
-                        track.get("plays"),
-                    )
-                    for track in tracks
-                ],
+        async with self.bot.db.acquire() as connection, connection.transaction():
+            await connection.execute(
+                "DELETE FROM lastfm_library.tracks WHERE user_id = $1",
+                ctx.author.id,
             )
-        else:
-            await ctx.load("Aborting **index** of your **Last.fm** track library..")
+            if tracks:
+                await ctx.load("Saving **index** of your **Last.fm** track library..")
+                await connection.executemany(
+                    "INSERT INTO lastfm_library.tracks (user_id, username, artist, track, plays) VALUES ($1, $2, $3, $4, $5) ON CONFLICT (user_id,"
+                    " artist, track) DO UPDATE SET plays = $5",
+                    [
+                        (
+                            ctx.author.id,
+                            data.get("username"),
+                            track.get("artist"),
+                            track.get("name"),
+                            track.get("plays"),
+                        )
+                        for track in tracks
+                    ],
+                )
+            else:
+                await ctx.load("Aborting **index** of your **Last.fm** track library..")
 
+        self.leaderboards.replace(
+            "artists",
+            ctx.author.id,
+            data.get("username"),
+            (
+                (artist.get("name"), artist.get("plays"))
+                for artist in artists or ()
+            ),
+        )
+        self.leaderboards.replace(
+            "albums",
+            ctx.author.id,
+            data.get("username"),
+            (
+                (album.get("artist"), album.get("name"), album.get("plays"))
+                for album in albums or ()
+            ),
+        )
+        self.leaderboards.replace(
+            "tracks",
+            ctx.author.id,
+            data.get("username"),
+            (
+                (track.get("artist"), track.get("name"), track.get("plays"))
+                for track in tracks or ()
+            ),
+        )
         await ctx.approve(
             "Your **Last.fm** username has been set to"
             f" [**{data.get('username')}**](https://last.fm/user/{format_uri(data.get('username'))})"
@@ -627,13 +709,6 @@ class lastfm(Cog, name="Last.fm Integration"):
         username, config = await self.get_username(ctx)
 
         await ctx.load("Started **index** of your **Last.fm** library..")
-        queries = [
-            "DELETE FROM lastfm_library.artists WHERE user_id = $1;",
-            "DELETE FROM lastfm_library.albums WHERE user_id = $1;",
-            "DELETE FROM lastfm_library.tracks WHERE user_id = $1;",
-        ]
-        await gather(*[self.bot.db.execute(query, ctx.author.id) for query in queries])
-
         await ctx.load("Started **index** of your **Last.fm** artist library..")
         artists = await self.request(
             "/library/artists",
@@ -641,23 +716,30 @@ class lastfm(Cog, name="Last.fm Integration"):
                 username=username,
             ),
         )
-        if artists:
-            await ctx.load("Saving **index** of your **Last.fm** artist library..")
-            await self.bot.db.executemany(
-                "INSERT INTO lastfm_library.artists (user_id, username, artist, plays) VALUES ($1, $2, $3, $4) ON CONFLICT (user_id, artist) DO"
-                " UPDATE SET plays = $4",
-                [
-                    (
-                        ctx.author.id,
-                        username,
-                        artist.get("name"),
-                        artist.get("plays"),
-                    )
-                    for artist in artists
-                ],
+        # Replaced only once the fetch went through and atomically, a failure keeps
+        # the old library.
+        async with self.bot.db.acquire() as connection, connection.transaction():
+            await connection.execute(
+                "DELETE FROM lastfm_library.artists WHERE user_id = $1",
+                ctx.author.id,
             )
-        else:
-            await ctx.load("Aborting **index** of your **Last.fm** artist library..")
+            if artists:
+                await ctx.load("Saving **index** of your **Last.fm** artist library..")
+                await connection.executemany(
+                    "INSERT INTO lastfm_library.artists (user_id, username, artist, plays) VALUES ($1, $2, $3, $4) ON CONFLICT (user_id, artist) DO"
+                    " UPDATE SET plays = $4",
+                    [
+                        (
+                            ctx.author.id,
+                            username,
+                            artist.get("name"),
+                            artist.get("plays"),
+                        )
+                        for artist in artists
+                    ],
+                )
+            else:
+                await ctx.load("Aborting **index** of your **Last.fm** artist library..")
 
         await ctx.load("Started **index** of your **Last.fm** album library..")
         albums = await self.request(
@@ -666,24 +748,29 @@ class lastfm(Cog, name="Last.fm Integration"):
                 username=username,
             ),
         )
-        if albums:
-            await ctx.load("Saving **index** of your **Last.fm** album library..")
-            await self.bot.db.executemany(
-                "INSERT INTO lastfm_library.albums (user_id, username, artist, album, plays) VALUES ($1, $2, $3, $4, $5) ON CONFLICT (user_id,"
-                " artist, album) DO UPDATE SET plays = $5",
-                [
-                    (
-                        ctx.author.id,
-                        username,
-                        album.get("artist"),
-                        album.get("name"),
-                        album.get("plays"),
-                    )
-                    for album in albums
-                ],
+        async with self.bot.db.acquire() as connection, connection.transaction():
+            await connection.execute(
+                "DELETE FROM lastfm_library.albums WHERE user_id = $1",
+                ctx.author.id,
             )
-        else:
-            await ctx.load("Aborting **index** of your **Last.fm** album library..")
+            if albums:
+                await ctx.load("Saving **index** of your **Last.fm** album library..")
+                await connection.executemany(
+                    "INSERT INTO lastfm_library.albums (user_id, username, artist, album, plays) VALUES ($1, $2, $3, $4, $5) ON CONFLICT (user_id,"
+                    " artist, album) DO UPDATE SET plays = $5",
+                    [
+                        (
+                            ctx.author.id,
+                            username,
+                            album.get("artist"),
+                            album.get("name"),
+                            album.get("plays"),
+                        )
+                        for album in albums
+                    ],
+                )
+            else:
+                await ctx.load("Aborting **index** of your **Last.fm** album library..")
 
         await ctx.load("Started **index** of your **Last.fm** track library..")
         tracks = await self.request(
@@ -692,25 +779,57 @@ class lastfm(Cog, name="Last.fm Integration"):
                 username=username,
             ),
         )
-        if tracks:
-            await ctx.load("Saving **index** of your **Last.fm** track library..")
-            await self.bot.db.executemany(
-                "INSERT INTO lastfm_library.tracks (user_id, username, artist, track, plays) VALUES ($1, $2, $3, $4, $5) ON CONFLICT (user_id,"
-                " artist, track) DO UPDATE SET plays = $5",
-                [
-                    (
-                        ctx.author.id,
-                        username,
-                        track.get("artist"),
-                        track.get("name"),
-                        track.get("plays"),
-                    )
-                    for track in tracks
-                ],
+        async with self.bot.db.acquire() as connection, connection.transaction():
+            await connection.execute(
+                "DELETE FROM lastfm_library.tracks WHERE user_id = $1",
+                ctx.author.id,
             )
-        else:
-            await ctx.load("Aborting **index** of your **Last.fm** track library..")
+            if tracks:
+                await ctx.load("Saving **index** of your **Last.fm** track library..")
+                await connection.executemany(
+                    "INSERT INTO lastfm_library.tracks (user_id, username, artist, track, plays) VALUES ($1, $2, $3, $4, $5) ON CONFLICT (user_id,"
+                    " artist, track) DO UPDATE SET plays = $5",
+                    [
+                        (
+                            ctx.author.id,
+                            username,
+                            track.get("artist"),
+                            track.get("name"),
+                            track.get("plays"),
+                        )
+                        for track in tracks
+                    ],
+                )
+            else:
+                await ctx.load("Aborting **index** of your **Last.fm** track library..")
 
+        self.leaderboards.replace(
+            "artists",
+            ctx.author.id,
+            username,
+            (
+                (artist.get("name"), artist.get("plays"))
+                for artist in artists or ()
+            ),
+        )
+        self.leaderboards.replace(
+            "albums",
+            ctx.author.id,
+            username,
+            (
+                (album.get("artist"), album.get("name"), album.get("plays"))
+                for album in albums or ()
+            ),
+        )
+        self.leaderboards.replace(
+            "tracks",
+            ctx.author.id,
+            username,
+            (
+                (track.get("artist"), track.get("name"), track.get("plays"))
+                for track in tracks or ()
+            ),
+        )
         await ctx.approve(f"Your **Last.fm library** has been updated!")
 
     @lastfm.command(
@@ -724,39 +843,50 @@ class lastfm(Cog, name="Last.fm Integration"):
         username, config = await self.get_username(ctx)
 
         await ctx.load("Started **index** of your **Last.fm** artists..")
-        queries = [
-            "DELETE FROM lastfm_library.artists WHERE user_id = $1;",
-            "DELETE FROM lastfm_crowns WHERE user_id = $1;",
-        ]
-        await gather(*[self.bot.db.execute(query, ctx.author.id) for query in queries])
-
         artists = await self.request(
             "/library/artists",
             payload=dict(
                 username=username,
             ),
         )
-        if artists:
-            await ctx.load("Saving **index** of your **Last.fm** artists..")
-            await self.bot.db.executemany(
-                "INSERT INTO lastfm_library.artists (user_id, username, artist, plays) VALUES ($1, $2, $3, $4) ON CONFLICT (user_id, artist) DO"
-                " UPDATE SET plays = $4",
-                [
-                    (
-                        ctx.author.id,
-                        username,
-                        artist.get("name"),
-                        artist.get("plays"),
-                    )
-                    for artist in artists
-                ],
-            )
 
-        else:
+        async with self.bot.db.acquire() as connection, connection.transaction():
+            await connection.execute(
+                "DELETE FROM lastfm_library.artists WHERE user_id = $1", ctx.author.id
+            )
+            await connection.execute(
+                "DELETE FROM lastfm_crowns WHERE user_id = $1", ctx.author.id
+            )
+            if artists:
+                await ctx.load("Saving **index** of your **Last.fm** artists..")
+                await connection.executemany(
+                    "INSERT INTO lastfm_library.artists (user_id, username, artist, plays) VALUES ($1, $2, $3, $4) ON CONFLICT (user_id, artist) DO"
+                    " UPDATE SET plays = $4",
+                    [
+                        (
+                            ctx.author.id,
+                            username,
+                            artist.get("name"),
+                            artist.get("plays"),
+                        )
+                        for artist in artists
+                    ],
+                )
+
+        if not artists:
             return await ctx.error(
                 "Aborting **index** of your **Last.fm** artists..",
             )
 
+        self.leaderboards.replace(
+            "artists",
+            ctx.author.id,
+            username,
+            (
+                (artist.get("name"), artist.get("plays"))
+                for artist in artists or ()
+            ),
+        )
         await ctx.load("Starting **automatic claiming** of your **Last.fm** artists..")
 
         server_library = await self.bot.db.fetch(
@@ -1274,16 +1404,14 @@ class lastfm(Cog, name="Last.fm Integration"):
 
         data = [
             {
-                "user": self.bot.get_user(row.get("user_id")),
-                "username": row.get("username"),
-                "url": f"https://last.fm/user/{format_uri(row.get('username'))}",
-                "plays": row.get("plays"),
+                "user": self.bot.get_user(listener.user_id),
+                "username": listener.username,
+                "url": f"https://last.fm/user/{format_uri(listener.username)}",
+                "plays": listener.plays,
             }
-            for row in await self.bot.db.fetch(
-                "SELECT user_id, username, plays FROM lastfm_library.artists WHERE lower(artist) = $1 ORDER BY plays DESC",
-                artist.lower(),
+            for listener in await self.leaderboards.top(
+                "artists", artist, visible=self.bot.get_user
             )
-            if (self.bot.get_user(row.get("user_id")) and row.get("plays") > 0)
         ]
 
         if not data:
@@ -1356,17 +1484,14 @@ class lastfm(Cog, name="Last.fm Integration"):
 
         data = [
             {
-                "user": self.bot.get_user(row.get("user_id")),
-                "username": row.get("username"),
-                "url": f"https://last.fm/user/{format_uri(row.get('username'))}",
-                "plays": row.get("plays"),
+                "user": self.bot.get_user(listener.user_id),
+                "username": listener.username,
+                "url": f"https://last.fm/user/{format_uri(listener.username)}",
+                "plays": listener.plays,
             }
-            for row in await self.bot.db.fetch(
-                "SELECT user_id, username, plays FROM lastfm_library.albums WHERE lower(album) = $1 AND lower(artist) = $2 ORDER BY plays DESC",
-                album.lower(),
-                artist.lower(),
+            for listener in await self.leaderboards.top(
+                "albums", artist, album, visible=self.bot.get_user
             )
-            if (self.bot.get_user(row.get("user_id")) and row.get("plays") > 0)
         ]
 
         if not data:
@@ -1435,17 +1560,14 @@ class lastfm(Cog, name="Last.fm Integration"):
 
         data = [
             {
-                "user": self.bot.get_user(row.get("user_id")),
-                "username": row.get("username"),
-                "url": f"https://last.fm/user/{format_uri(row.get('username'))}",
-                "plays": row.get("plays"),
+                "user": self.bot.get_user(listener.user_id),
+                "username": listener.username,
+                "url": f"https://last.fm/user/{format_uri(listener.username)}",
+                "plays": listener.plays,
             }
-            for row in await self.bot.db.fetch(
-                "SELECT user_id, username, plays FROM lastfm_library.tracks WHERE lower(track) = $1 AND lower(artist) = $2 ORDER BY plays DESC",
-                track.lower(),
-                artist.lower(),
+            for listener in await self.leaderboards.top(
+                "tracks", artist, track, visible=self.bot.get_user
             )
-            if (self.bot.get_user(row.get("user_id")) and row.get("plays") > 0)
         ]
 
         if not data:
@@ -1565,35 +1687,93 @@ class lastfm(Cog, name="Last.fm Integration"):
                 f"**{member}** doesn't have any **artists** in their library"
             )
 
-        mutual_artists = list()
-        for artist in sorted(artists, key=lambda artist: artist["plays"], reverse=True):
-            for target_artist in target_artists:
-                if artist["artist"] == target_artist["artist"]:
-                    mutual_artists.append(
-                        f"{shorten(artist['artist'])}{' ' * (21 - len(shorten(artist['artist'])))} {artist['plays']} {'=' if artist['plays'] == target_artist['plays'] else '>' if artist['plays'] > target_artist['plays'] else '<'} {target_artist['plays']}"
-                    )
-
-        if not mutual_artists:
+        taste = Taste.compare(artists, target_artists)
+        if not taste.mutual:
             return await ctx.error(
                 f"You and **{member}** don't have any **mutual artists**"
             )
-        largest_library = (
-            artists if len(artists) > len(target_artists) else target_artists
-        )
+
+        mutual_artists = [
+            f"{shorten(artist.artist)}{' ' * (21 - len(shorten(artist.artist)))} {artist.plays} {'=' if not artist.delta else '>' if artist.delta > 0 else '<'} {artist.target_plays}"
+            for artist in taste.mutual[:10]
+        ]
 
         embed = Embed(
             color=self.get_color(ctx, config),
             title=f"{username} - {target_username}",
             description=(
                 "You both have"
-                f" **{Plural(mutual_artists):artist}** ({percentage(len(mutual_artists), len(largest_library))}) in"
-                " common\n>>> ```\n"
-                + "\n".join(artist for artist in mutual_artists[:10])
+                f" **{Plural(taste.mutual):artist}** ({percentage(len(taste.mutual), max(taste.artists, taste.target_artists))}) in"
+                f" common with a **{percentage(taste.cosine, 1)}** taste match\n>>> ```\n"
+                + "\n".join(mutual_artists)
                 + "```"
             ),
         )
         await ctx.send(embed=embed)
 
+    @lastfm.command(
+        name="similar",
+        aliases=["neighbors", "neighbours", "tastematch"],
+    )
+    @cooldown(1, 10, BucketType.member)
+    async def lastfm_similar(self, ctx: Context):
+        """View the members with the most similar taste"""
+
+        username, config = await self.get_username(ctx)
+
+        async with ctx.typing():
+            library = await self.bot.db.fetchrow(
+                "SELECT COUNT(*) AS artists, SQRT(SUM(plays::FLOAT8 * plays)) AS norm FROM lastfm_library.artists WHERE user_id = $1",
+                ctx.author.id,
+            )
+            if not library.get("artists"):
+                return await ctx.error(
+                    f"You don't have any **artists** in your library\n> Use `{ctx.prefix}lastfm update` to refresh your library"
+                )
+
+            rows = await self.bot.db.fetch(
+                "WITH source AS (SELECT lower(artist) AS artist, plays FROM lastfm_library.artists WHERE user_id = $1)"
+                " SELECT target.user_id, MIN(target.username) AS username, COUNT(source.artist) AS mutual, COUNT(*) AS artists,"
+                " COALESCE(SUM(source.plays::FLOAT8 * target.plays), 0) AS dot, SQRT(SUM(target.plays::FLOAT8 * target.plays)) AS norm"
+                " FROM lastfm_library.artists AS target LEFT JOIN source ON source.artist = lower(target.artist)"
+                " WHERE target.user_id = ANY($2::BIGINT[]) GROUP BY target.user_id HAVING COUNT(source.artist) > 0",
+                ctx.author.id,
+                [member.id for member in ctx.guild.members if member != ctx.author],
+            )
+
+        neighbours = []
+        for row in rows:
+            if not (member := ctx.guild.get_member(row.get("user_id"))):
+                continue
+
+            cosine, jaccard = Taste.scores(
+                row.get("mutual"),
+                library.get("artists"),
+                row.get("artists"),
+                row.get("dot"),
+                library.get("norm"),
+                row.get("norm"),
+            )
+            neighbours.append((cosine, jaccard, member, row))
+
+        if not neighbours:
+            return await ctx.error(
+                "No one in this server shares any **artists** with you"
+            )
+
+        neighbours.sort(key=lambda neighbour: neighbour[:2], reverse=True)
+        await ctx.paginate(
+            Embed(
+                color=self.get_color(ctx, config),
+                title=f"Most similar listeners to {username}",
+                description=[
+                    f"[**{member}**](https://last.fm/user/{format_uri(row.get('username'))})"
+                    f" - **{percentage(cosine, 1)}** match ({Plural(row.get('mutual')):mutual artist})"
+                    for cosine, _, member, row in neighbours
+                ],
+            )
+        )
+
     @lastfm.command(
         name="plays",
         usage="<member> <artist>",
@@ -1643,13 +1823,12 @@ class lastfm(Cog, name="Last.fm Integration"):
             color=self.get_color(ctx, config),
         )
 
-        await self.bot.db.execute(
-            "INSERT INTO lastfm_library.artists (user_id, username, artist, plays) VALUES($1, $2, $3, $4) ON CONFLICT (user_id, artist) DO UPDATE"
-            " SET plays = $4",
+        self.track_plays(
+            "artists",
             member.id,
             username,
             data.get("name"),
-            data.get("plays"),
+            plays=data.get("plays"),
         )
 
     @lastfm.command(
@@ -1793,18 +1972,32 @@ class lastfm(Cog, name="Last.fm Integration"):
         """View a collage of your most listened to albums"""
 
         username, config = await self.get_username(ctx, member)
+        rows, columns = map(int, size.split("x"))
 
         async with ctx.typing():
             data = await self.request(
-                "/collage",
+                "/topalbums",
                 payload=dict(
                     username=username,
-                    size=size,
                     period=period,
+                    limit=rows * columns,
                 ),
             )
+            if not data or not data["albums"]:
+                return await ctx.error(
+                    f"Couldn't generate collage for [**{username}**](https://last.fm/user/{format_uri(username)})"
+                )
+
+            image = await collage(
+                self.bot.session,
+                [album["image"] for album in data["albums"] if album.get("image")],
+                columns=columns,
+                size=300,
+                format="jpeg",
+                quality=85,
+            )
 
-        if not data:
+        if not image:
             return await ctx.error(
                 f"Couldn't generate collage for [**{username}**](https://last.fm/user/{format_uri(username)})"
             )
@@ -1814,8 +2007,8 @@ class lastfm(Cog, name="Last.fm Integration"):
             title=f"{username}'s {data['period']} album collage",
         )
 
-        embed.set_image(url=data["url"])
-        await ctx.reply(embed=embed)
+        embed.set_image(url=f"attachment://{image.filename}")
+        await ctx.reply(embed=embed, file=image)
 
     @lastfm.command(
         name="topartists",
@@ -5,12 +5,14 @@ from base64 import b64decode
 from contextlib import suppress
 from datetime import datetime
 from io import BytesIO
-from json import JSONDecodeError, dumps, loads
+from json import JSONDecodeError, loads
+from re import Match
 from re import compile as re_compile
 from sys import getsizeof
 from tempfile import TemporaryDirectory
 from time import time
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
 import munch
 from yarl import URL
 
@@ -47,9 +49,10 @@ import config
 from tools import services
 from tools.converters.basic import Language, MediaFinder, SynthEngine, TimeConverter
 from tools.converters.embed import EmbedScriptValidator
-from tools.managers import cache
+from tools.managers.assets import AssetCache
 from tools.managers.cog import Cog
 from tools.managers.context import Context
+from tools.managers.media import MediaTooLarge
 from tools.managers.regex import (
     DISCORD_MESSAGE,
     INSTAGRAM_URL,
@@ -65,7 +68,10 @@ from tools.managers.regex import (
     YOUTUBE_URL,
     MEDAL_URL,
 )
+from tools.managers.router import route
+from tools.managers.snipe import ReactionSnipe, Snipe, SnipeStore
 from tools.utilities import donator, require_dm, shorten
+from tools.utilities.bktree import HashIndex, parse_hash
 from tools.utilities.humanize import human_timedelta
 from tools.utilities.image import collage
 from tools.utilities.image import image_hash as _image_hash
@@ -121,11 +127,54 @@ class Miscellaneous(Cog):
         return embeds
 
     async def cog_load(self: "Miscellaneous") -> None:
+        self.snipes: SnipeStore = SnipeStore()
+        self.afk_users: Dict[int, Tuple[str, datetime]] = {
+            row["user_id"]: (row["status"], row["date"])
+            for row in await self.bot.db.fetch("SELECT user_id, status, date FROM afk")
+        }
+        self.avatars: HashIndex = HashIndex()
+        for row in await self.bot.db.fetch(
+            "SELECT user_id, avatar, hash FROM metrics.avatars"
+        ):
+            if (value := parse_hash(row["hash"])) is not None:
+                self.avatars.add(value, row["user_id"], row["avatar"])
+
+        self.bot.router.add_cog(self)
         self.reminder.start()
 
     async def cog_unload(self: "Miscellaneous") -> None:
+        self.bot.router.remove_cog(self)
         self.reminder.stop()
 
+    def previous_avatar(
+        self: "Miscellaneous", value: Optional[int], user_id: int, extension: str
+    ) -> Optional[str]:
+        """Return a still valid upload of the same avatar"""
+
+        if value is None:
+            return None
+
+        # Near identical uploads of the same user, or exact ones of anybody else
+        urls = [
+            node.entries[user_id]
+            for _, node in sorted(
+                self.avatars.search(value), key=lambda match: match[0]
+            )
+            if user_id in node.entries
+        ]
+        if node := self.avatars.nodes.get(value):
+            urls.extend(node.entries.values())
+
+        return next(
+            (
+                url
+                for url in urls
+                if urlparse(url).path.endswith(f".{extension}")
+                and AssetCache.reusable(url)
+            ),
+            None,
+        )
+
     @Cog.listener("on_user_update")
     async def avatar_update(self, before: User, after: User):
         """Save past avatars to the upload bucket"""
@@ -147,38 +196,53 @@ class Miscellaneous(Cog):
             return  # asset too new
 
         image_hash = await _image_hash(image)
+        value = parse_hash(image_hash)
+        extension = "gif" if after.avatar.is_animated() else "png"
 
-        with suppress(HTTPException):
-            message = await channel.send(
-                file=File(
-                    BytesIO(image),
-                    filename=f"{image_hash}."
-                    + ("png" if not before.display_avatar.is_animated() else "gif"),
+        if not (url := self.previous_avatar(value, before.id, extension)):
+            try:
+                message = await channel.send(
+                    file=File(
+                        BytesIO(image),
+                        filename=f"{image_hash}.{extension}",
+                    )
                 )
-            )
+            except HTTPException:
+                return
 
-            await self.bot.db.execute(
-                "INSERT INTO metrics.avatars (user_id, avatar, hash, timestamp) VALUES ($1, $2, $3, $4) ON CONFLICT (user_id, hash) DO NOTHING",
-                before.id,
-                message.attachments[0].url,
-                image_hash,
-                int(utcnow().timestamp()),
-            )
-            logging.info(f"Saved asset {image_hash} for {before}")
+            url = message.attachments[0].url
+
+        await self.bot.db.execute(
+            "INSERT INTO metrics.avatars (user_id, avatar, hash, timestamp) VALUES ($1, $2, $3, $4) ON CONFLICT (user_id, hash) DO NOTHING",
+            before.id,
+            url,
+            image_hash,
+            int(utcnow().timestamp()),
+        )
+        if value is not None:
+            self.avatars.add(value, before.id, url)
+
+        await self.bot.redis.delete(f"avatars:{before.id}")
+        logging.info(f"Saved asset {image_hash} for {before}")
 
     @Cog.listener("on_message")
     async def check_afk(self: "Miscellaneous", message: Message) -> None:
+        user = message.mentions[0] if len(message.mentions) == 1 else None
+        if message.author.id not in self.afk_users and (
+            not user or user.id not in self.afk_users
+        ):
+            return
+
         if (ctx := await self.bot.get_context(message)) and ctx.command:
             return
 
-        elif author_afk_since := await self.bot.db.fetchval(
-            """
-            DELETE FROM afk
-            WHERE user_id = $1
-            RETURNING date
-            """,
-            message.author.id,
-        ):
+        elif message.author.id in self.afk_users:
+            _, author_afk_since = self.afk_users.pop(message.author.id)
+            await self.bot.db.execute(
+                "DELETE FROM afk WHERE user_id = $1",
+                message.author.id,
+            )
+
             if "[afk]" in message.author.display_name.lower():
                 with suppress(HTTPException, Forbidden):
                     await message.author.edit(
@@ -190,22 +254,18 @@ class Miscellaneous(Cog):
                 emoji="👋🏾",
             )
 
+        if not user or not (user_afk := self.afk_users.get(user.id)):
+            return
+
         bucket = self.bot.buckets.get("afk").get_bucket(message)
         if bucket.update_rate_limit():
             return
 
-        elif len(message.mentions) == 1 and (user := message.mentions[0]):
-            if user_afk := await self.bot.db.fetchrow(
-                """
-                SELECT status, date FROM afk
-                WHERE user_id = $1
-                """,
-                user.id,
-            ):
-                await ctx.neutral(
-                    f"{user.mention} is AFK: **{user_afk['status']}** - {human_timedelta(user_afk['date'], suffix=False)}",
-                    emoji="💤",
-                )
+        status, date = user_afk
+        await ctx.neutral(
+            f"{user.mention} is AFK: **{status}** - {human_timedelta(date, suffix=False)}",
+            emoji="💤",
+        )
 
     @Cog.listener("on_user_message")
     async def check_highlights(self: "Miscellaneous", ctx: Context, message: Message):
@@ -309,15 +369,45 @@ class Miscellaneous(Cog):
         except Forbidden:
             pass
 
-    @Cog.listener("on_message_repost")
-    async def medal_repost(self: "Miscellaneous", ctx: Context, url: str):
-        """Repost a Medal clip using service reposter"""
+    async def send_media(
+        self: "Miscellaneous",
+        ctx: Context,
+        key: str,
+        url: str,
+        filename: str,
+        **kwargs: Any,
+    ) -> Optional[Message]:
+        """Send reposted media, reusing a previous upload or the asset cache"""
+
+        # Expired uploads are dropped by the lookup, a dead link never raises here
+        if attachment := self.bot.assets.attachment(key):
+            return await ctx.send(attachment, **kwargs)
+
+        limit = ctx.guild.filesize_limit
+        if (size := self.bot.assets.sizeof(key)) and size > limit:
+            return await ctx.error(str(MediaTooLarge(size, limit)))
+
+        if not (fp := await self.bot.assets.open(key)):
+            try:
+                buffer = await self.bot.media.fetch(
+                    url, guild_id=ctx.guild.id, limit=limit
+                )
+            except MediaTooLarge as error:
+                return await ctx.error(str(error))
 
-        if not "medal.tv" in url:
-            return
+            fp = await self.bot.assets.store(key, buffer)
+
+        message = await ctx.send(file=File(fp, filename=filename), **kwargs)
+        if message and message.attachments:
+            await self.bot.assets.remember(key, message.attachments[0].url)
+
+        return message
+
+    @route("medal", hosts=("medal.tv",), patterns=(MEDAL_URL,))
+    async def medal_repost(self: "Miscellaneous", ctx: Context, match: Match):
+        """Repost a Medal clip using service reposter"""
 
-        if match := MEDAL_URL.match(url):
-            url = match.group()
+        url = match.group()
 
         _start = time()
         async with ctx.typing():
@@ -341,27 +431,31 @@ class Miscellaneous(Cog):
                 text=f"❤️ {clip.statistics.likes:,} 💬 {clip.statistics.comments:,} 👁‍🗨 {clip.statistics.views:,}"
             )
 
-            return await ctx.send(
+            return await self.send_media(
+                ctx,
+                f"medal:{clip.id}",
+                clip.asset.video_url,
+                f"lain{clip.id}.mp4",
                 embed=embed,
-                file=File(
-                    fp=BytesIO(
-                        await self.bot.session.request("GET", clip.asset.video_url)
-                    ),
-                    filename=f"lain{clip.id}.mp4",
-                ),
             )
 
-    @Cog.listener("on_message_repost")
-    async def instagram_repost(self: "Miscellaneous", ctx: Context, argument: str):
+    @route("instagram", hosts=("instagram.com",), patterns=(INSTAGRAM_URL,))
+    async def instagram_repost(self: "Miscellaneous", ctx: Context, match: Match):
         """Repost an Instagram post using service reposter"""
 
-        if not "instagram" in argument:
-            return
+        argument = match.group()
 
         async def download_media(media: str, filename: str) -> str | File:
             """Download media from a URL"""
-            response = await self.bot.session.request("GET", str(media))
-            return File(fp=BytesIO(response), filename=filename)
+            try:
+                return await self.bot.media.file(
+                    str(media),
+                    filename,
+                    guild_id=ctx.guild.id,
+                    limit=ctx.guild.filesize_limit,
+                )
+            except MediaTooLarge:
+                return f"[`{filename}`]({media}) is too large to upload"
 
         _start = time()
         async with ctx.typing():
@@ -397,23 +491,15 @@ class Miscellaneous(Cog):
 
             return await ctx.send(caption, files=files)
 
-    @Cog.listener("on_message_repost")
-    async def youtube_repost(self: "Miscellaneous", ctx: Context, argument: str):
+    @route(
+        "youtube",
+        hosts=("youtube.com", "youtu.be"),
+        patterns=(YOUTUBE_URL, YOUTUBE_SHORT_URL, YOUTUBE_SHORTS_URL, YOUTUBE_CLIP_URL),
+    )
+    async def youtube_repost(self: "Miscellaneous", ctx: Context, match: Match):
         """Repost a YouTube video using service reposter"""
 
-        if not "youtu" in argument:
-            return
-
-        if (
-            match := YOUTUBE_URL.match(argument)
-            or YOUTUBE_SHORT_URL.match(argument)
-            or YOUTUBE_SHORTS_URL.match(argument)
-            or YOUTUBE_CLIP_URL.match(argument)
-        ):
-            argument = match.group()
-
-        else:
-            return
+        argument = match.group()
 
         _start = time()
         async with ctx.typing():
@@ -443,24 +529,23 @@ class Miscellaneous(Cog):
                     icon_url=ctx.author.display_avatar,
                 )
 
-                video = await self.bot.session.request("GET", response.download.url)
-                file = File(BytesIO(video), filename=f"lain{match.group(1)}.mp4")
                 embed.set_footer(
                     text=f"👁‍🗨 {response.statistics.views:,} - {ctx.message.author}",
                 )
                 embed.timestamp = datetime.utcfromtimestamp(response.created_at)
-                await ctx.send(embed=embed, file=file)
+                await self.send_media(
+                    ctx,
+                    f"youtube:{match.group(1)}",
+                    response.download.url,
+                    f"lain{match.group(1)}.mp4",
+                    embed=embed,
+                )
 
-    @Cog.listener("on_message_repost")
-    async def twitter_repost(self: "Miscellaneous", ctx: Context, argument: str):
+    @route("twitter", hosts=("twitter.com",), patterns=(TWITTER_URL,))
+    async def twitter_repost(self: "Miscellaneous", ctx: Context, match: Match):
         """Repost a tweet from Twitter using service reposter"""
 
-        if not "twitter" in argument:
-            return
-        if match := TWITTER_URL.match(argument):
-            argument = match.group()
-        else:
-            return
+        argument = match.group()
 
         _start = time()
         async with ctx.typing():
@@ -493,27 +578,26 @@ class Miscellaneous(Cog):
                 embeds = [(embed.copy().set_image(url=image)) for image in images]
                 return await ctx.paginate(embeds)
 
-            file = (
-                await self.bot.session.request("GET", data.assets.video)
-                if data.assets.video
-                else None
+            if not data.assets.video:
+                return await ctx.send(embed=embed)
+
+            await self.send_media(
+                ctx,
+                f"twitter:{data.id}",
+                data.assets.video,
+                f"lain{data.id}.mp4",
+                embed=embed,
             )
-            file = File(BytesIO(file), filename=f"lain{data.id}.mp4") if file else None
-            await ctx.send(embed=embed, file=file)
 
-    @Cog.listener("on_message_repost")
-    async def tiktok_repost(self: "Miscellaneous", ctx: Context, argument: str):
+    @route(
+        "tiktok",
+        hosts=("tiktok.com",),
+        patterns=(TIKTOK_DESKTOP_URL, TIKTOK_MOBILE_URL),
+    )
+    async def tiktok_repost(self: "Miscellaneous", ctx: Context, match: Match):
         """Reposts TikTok posts"""
 
-        if not "tiktok" in argument:
-            return
-
-        if match := TIKTOK_DESKTOP_URL.match(argument) or TIKTOK_MOBILE_URL.match(
-            argument
-        ):
-            argument = match.group()
-        else:
-            return
+        argument = match.group()
 
         _start = time()
         async with ctx.typing():
@@ -543,29 +627,26 @@ class Miscellaneous(Cog):
                 embeds = [(embed.copy().set_image(url=image)) for image in images]
                 return await ctx.paginate(embeds)
 
-            file = (
-                await self.bot.session.request("GET", data.assets.video)
-                if data.assets.video
-                else None
-            )
-            if file:
-                file = File(BytesIO(file), filename=f"lain{data.id}.mp4")
+            if not data.assets.video:
+                return await ctx.send(embed=embed)
 
-            await ctx.send(embed=embed, file=file)
+            await self.send_media(
+                ctx,
+                f"tiktok:{data.id}",
+                data.assets.video,
+                f"lain{data.id}.mp4",
+                embed=embed,
+            )
 
-    @Cog.listener("on_message_repost")
-    async def pinterest_repost(self: "Miscellaneous", ctx: Context, argument: str):
+    @route(
+        "pinterest",
+        hosts=("pinterest.com", "pin.it"),
+        patterns=(PINTEREST_PIN_URL, PINTEREST_PIN_APP_URL),
+    )
+    async def pinterest_repost(self: "Miscellaneous", ctx: Context, match: Match):
         """Reposts Pinterest pins"""
 
-        if not "pin" in argument:
-            return
-
-        if match := PINTEREST_PIN_URL.match(argument) or PINTEREST_PIN_APP_URL.match(
-            argument
-        ):
-            argument = match.group()
-        else:
-            return
+        argument = match.group()
 
         _start = time()
         async with ctx.typing():
@@ -592,9 +673,13 @@ class Miscellaneous(Cog):
                 embed.set_image(url=data.media.url)
                 return await ctx.send(embed=embed)
 
-            response = await self.bot.session.request("GET", data.media.url)
-            file = File(BytesIO(response), filename=f"lain{data.id}.mp4")
-            await ctx.send(embed=embed, file=file)
+            await self.send_media(
+                ctx,
+                f"pinterest:{data.id}",
+                data.media.url,
+                f"lain{data.id}.mp4",
+                embed=embed,
+            )
 
     @Cog.listener("on_user_update")
     async def username_update(self: "Miscellaneous", before: User, after: User):
@@ -764,23 +849,17 @@ class Miscellaneous(Cog):
         if not message.guild or message.author.bot:
             return
 
-        key = f"snipe:{message.guild.id}:messages:{message.channel.id}"
-        await cache.set_add(
-            key,
-            dumps(
-                {
-                    "author": {
-                        "display_name": message.author.display_name,
-                        "avatar_url": message.author.display_avatar.url,
-                    },
-                    "content": message.content,
-                    "attachment_url": (
-                        message.attachments[0].url if message.attachments else None
-                    ),
-                    "deleted_at": utcnow().timestamp(),
-                }
+        await self.snipes.push(
+            message.guild.id,
+            "messages",
+            message.channel.id,
+            Snipe(
+                message.author.display_name,
+                message.author.display_avatar.url,
+                message.content,
+                message.attachments[0].url if message.attachments else None,
+                utcnow().timestamp(),
             ),
-            expire=7200,
         )
 
     @Cog.listener()
@@ -790,23 +869,17 @@ class Miscellaneous(Cog):
         if not message.guild or message.author.bot:
             return
 
-        key = f"snipe:{message.guild.id}:edits:{message.channel.id}"
-        await cache.set_add(
-            key,
-            dumps(
-                {
-                    "author": {
-                        "display_name": message.author.display_name,
-                        "avatar_url": message.author.display_avatar.url,
-                    },
-                    "content": message.content,
-                    "attachment_url": (
-                        message.attachments[0].url if message.attachments else None
-                    ),
-                    "edited_at": utcnow().timestamp(),
-                }
+        await self.snipes.push(
+            message.guild.id,
+            "edits",
+            message.channel.id,
+            Snipe(
+                message.author.display_name,
+                message.author.display_avatar.url,
+                message.content,
+                message.attachments[0].url if message.attachments else None,
+                utcnow().timestamp(),
             ),
-            expire=7200,
         )
 
     @Cog.listener()
@@ -817,17 +890,16 @@ class Miscellaneous(Cog):
             return
 
         message = reaction.message
-        key = f"snipe:{message.guild.id}:reactions:{message.channel.id}:{message.id}"
-        await cache.set_add(
-            key,
-            dumps(
-                {
-                    "user": member.display_name,
-                    "emoji": str(reaction),
-                    "removed_at": utcnow().timestamp(),
-                }
+        await self.snipes.push(
+            message.guild.id,
+            "reactions",
+            message.channel.id,
+            ReactionSnipe(
+                message.id,
+                member.display_name,
+                str(reaction),
+                utcnow().timestamp(),
             ),
-            expire=300,
         )
 
     @command(
@@ -844,7 +916,7 @@ class Miscellaneous(Cog):
         Clears all results for reactions, edits and messages
         """
 
-        await cache.delete_match(f"snipe:{ctx.guild.id}:*")
+        await self.snipes.clear(ctx.guild.id)
         await ctx.message.add_reaction("✅")
 
     @command(name="snipe", usage="<index>", example="3", aliases=["s"])
@@ -856,36 +928,32 @@ class Miscellaneous(Cog):
         if index < 1:
             return await ctx.send_help()
 
-        key = f"snipe:{ctx.guild.id}:messages:{ctx.channel.id}"
-        if not (messages := await cache.get(key)):
+        messages, total = await self.snipes.view(
+            ctx.guild.id, "messages", ctx.channel.id
+        )
+        if not total:
             return await ctx.error(
                 "No **deleted messages** found in the last **2 hours**!"
             )
 
-        if index > len(messages):
+        if index > total:
             return await ctx.error(f"No **snipe** found for `index {index}`")
 
-        message = loads(
-            sorted(
-                messages,
-                key=lambda m: loads(m)["deleted_at"],
-                reverse=True,
-            )[index - 1]
-        )
+        message = messages[index - 1]
 
         embed = Embed(
-            description=message["content"],
+            description=message.content,
         )
         embed.set_author(
-            name=message["author"]["display_name"],
-            icon_url=message["author"]["avatar_url"],
+            name=message.author_name,
+            icon_url=message.avatar_url,
         )
 
-        if attachment_url := message.get("attachment_url"):
-            embed.set_image(url=attachment_url)
+        if message.attachment_url:
+            embed.set_image(url=message.attachment_url)
 
         embed.set_footer(
-            text=f"Deleted {human_timedelta(datetime.fromtimestamp(message['deleted_at']))} ∙ {index}/{len(messages)} messages",
+            text=f"Deleted {human_timedelta(datetime.fromtimestamp(message.timestamp))} ∙ {index}/{total} messages",
             icon_url=ctx.author.display_avatar,
         )
 
@@ -897,34 +965,25 @@ class Miscellaneous(Cog):
         Snipe the latest reaction that was removed
         """
 
-        key = f"snipe:{ctx.guild.id}:reactions:{ctx.channel.id}:*"
-        messages: List[Set[int, Dict]] = []
-
-        async for key in cache.get_match(key):
-            reactions = key[1]
-            sorted_reactions = sorted(
-                reactions, key=lambda r: loads(r)["removed_at"], reverse=True
-            )
-            latest_reaction = loads(sorted_reactions[0])
-            message_id = int(key[0].split(":")[-1])
-            messages.append((message_id, latest_reaction))
-
-        if not messages:
+        reactions, total = await self.snipes.view(
+            ctx.guild.id, "reactions", ctx.channel.id
+        )
+        if not total:
             return await ctx.error(
                 "No **removed reactions** found in the last **5 minutes**!"
             )
 
-        message_id, reaction = max(messages, key=lambda m: m[1]["removed_at"])
-        message: PartialMessage = ctx.channel.get_partial_message(message_id)
+        reaction = reactions[0]
+        message: PartialMessage = ctx.channel.get_partial_message(reaction.message_id)
 
         try:
             await ctx.channel.neutral(
-                f"**{reaction['user']}** reacted with **{reaction['emoji']}** <t:{int(reaction['removed_at'])}:R>",
+                f"**{reaction.user}** reacted with **{reaction.emoji}** <t:{int(reaction.timestamp)}:R>",
                 reference=message,
             )
         except (HTTPException, Forbidden):
             await ctx.channel.neutral(
-                f"**{reaction['user']}** reacted with **{reaction['emoji']}** on [message]({message.jump_url}) <t:{int(reaction['removed_at'])}:R>",
+                f"**{reaction.user}** reacted with **{reaction.emoji}** on [message]({message.jump_url}) <t:{int(reaction.timestamp)}:R>",
             )
 
     @command(
@@ -945,15 +1004,13 @@ class Miscellaneous(Cog):
         if not message:
             return await ctx.send_help()
 
-        key = f"snipe:{ctx.guild.id}:reactions:{message.channel.id}:{message.id}"
         if not (
             reactions := [
-                loads(reaction)
-                for reaction in sorted(
-                    await cache.get(key, []),
-                    key=lambda r: loads(r)["removed_at"],
-                    reverse=True,
+                reaction
+                for reaction in await self.snipes.get(
+                    ctx.guild.id, "reactions", message.channel.id
                 )
+                if reaction.message_id == message.id
             ]
         ):
             return await ctx.error(
@@ -965,7 +1022,7 @@ class Miscellaneous(Cog):
                 url=message.jump_url,
                 title="Reaction history",
                 description=[
-                    f"**{reaction['user']}** added **{reaction['emoji']}** <t:{int(reaction['removed_at'])}:R>"
+                    f"**{reaction.user}** added **{reaction.emoji}** <t:{int(reaction.timestamp)}:R>"
                     for reaction in reactions
                 ],
             ),
@@ -1427,18 +1484,20 @@ class Miscellaneous(Cog):
         """
 
         status = shorten(status, 100)
-        await self.bot.db.execute(
+        if date := await self.bot.db.fetchval(
             """
             INSERT INTO afk (
                 user_id,
                 status
             ) VALUES ($1, $2)
             ON CONFLICT (user_id)
-            DO NOTHING;
+            DO NOTHING
+            RETURNING date;
             """,
             ctx.author.id,
             status,
-        )
+        ):
+            self.afk_users[ctx.author.id] = (status, date)
 
         await ctx.approve(f"You're now AFK with the status: **{status}**")
 
@@ -1556,8 +1615,12 @@ class Miscellaneous(Cog):
             )
 
         async with ctx.typing():
-            image = await collage([row.get("avatar") for row in avatars[:35]])
-            if not image or getsizeof(image.fp) > ctx.guild.filesize_limit:
+            image = await collage(
+                self.bot.session,
+                [row.get("avatar") for row in avatars[:35]],
+                format="webp",
+            )
+            if not image or image.fp.getbuffer().nbytes > ctx.guild.filesize_limit:
                 await ctx.neutral(
                     (
                         f"Click [**here**](https://lains.life/avatars/{user.id}) to view"
@@ -1584,13 +1647,57 @@ class Miscellaneous(Cog):
                 )
 
                 embed.set_image(
-                    url="attachment://collage.png",
+                    url=f"attachment://{image.filename}",
                 )
                 await ctx.send(
                     embed=embed,
                     file=image,
                 )
 
+    @avatarhistory.command(
+        name="matches",
+        usage="<user>",
+        example="caden",
+        aliases=["lookup", "same"],
+    )
+    @cooldown(1, 10, BucketType.user)
+    async def avatarhistory_matches(self, ctx: Context, *, user: Member | User = None):
+        """View users who have used the same avatar"""
+
+        user = user or ctx.author
+
+        try:
+            image = await user.display_avatar.read()
+        except HTTPException:
+            return await ctx.error(f"Couldn't read the **avatar** of **{user}**")
+
+        value = parse_hash(await _image_hash(image))
+        if value is None or not (
+            matches := {
+                user_id: distance
+                for user_id, distance in self.avatars.users(value).items()
+                if user_id != user.id
+            }
+        ):
+            return await ctx.error(
+                f"No one else has used **{user}**'s avatar"
+                if user != ctx.author
+                else "No one else has used your avatar"
+            )
+
+        await ctx.paginate(
+            Embed(
+                title="Avatar Matches",
+                description=list(
+                    f"**{self.bot.get_user(user_id) or 'Unknown User'}** (`{user_id}`)"
+                    + (" - exact" if not distance else "")
+                    for user_id, distance in sorted(
+                        matches.items(), key=lambda match: match[1]
+                    )
+                ),
+            )
+        )
+
     @avatarhistory.command(
         name="statistics",
         aliases=["stats", "stat"],
@@ -1629,6 +1736,7 @@ class Miscellaneous(Cog):
         await self.bot.db.execute(
             "DELETE FROM metrics.avatars WHERE user_id = $1", ctx.author.id
         )
+        self.avatars.discard(ctx.author.id)
         await ctx.approve("Reset your **avatar history**")
 
     @command(
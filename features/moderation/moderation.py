@@ -53,6 +53,7 @@ from tools.converters.color import Color
 from tools.converters.embed import EmbedScript
 from tools.managers import cache, regex
 from tools.managers.context import Context
+from tools.managers.overwrites import OverwriteJob
 from tools.utilities.text import Plural, hash
 
 
@@ -2027,16 +2028,20 @@ class Moderation(Cog):
 
         channel = channel or ctx.channel
 
-        if channel.overwrites_for(ctx.guild.default_role).read_messages is False:
-            return await ctx.error(f"The channel {channel.mention} is already hidden")
-
-        overwrite = channel.overwrites_for(ctx.guild.default_role)
-        overwrite.read_messages = False
-        await channel.set_permissions(
+        job = OverwriteJob(
             ctx.guild.default_role,
-            overwrite=overwrite,
+            [channel],
             reason=f"{ctx.author}: {reason}",
+            read_messages=False,
         )
+        if not job.total:
+            return await ctx.error(f"The channel {channel.mention} is already hidden")
+
+        await job.run()
+        if job.failed:
+            return await ctx.error(
+                f"I don't have **permissions** to hide {channel.mention}"
+            )
 
         await self.invoke_message(
             ctx,
@@ -2065,16 +2070,20 @@ class Moderation(Cog):
 
         channel = channel or ctx.channel
 
-        if channel.overwrites_for(ctx.guild.default_role).read_messages is True:
-            return await ctx.error(f"The channel {channel.mention} isn't hidden")
-
-        overwrite = channel.overwrites_for(ctx.guild.default_role)
-        overwrite.read_messages = True
-        await channel.set_permissions(
+        job = OverwriteJob(
             ctx.guild.default_role,
-            overwrite=overwrite,
+            [channel],
             reason=f"{ctx.author}: {reason}",
+            read_messages=True,
         )
+        if not job.total:
+            return await ctx.error(f"The channel {channel.mention} isn't hidden")
+
+        await job.run()
+        if job.failed:
+            return await ctx.error(
+                f"I don't have **permissions** to reveal {channel.mention}"
+            )
 
         await self.invoke_message(
             ctx,
@@ -2142,27 +2151,44 @@ class Moderation(Cog):
                 f"Are you sure you want to lock all channels?\n> You haven't set any ignored channels with `{ctx.prefix}lock ignore` yet"
             )
 
-        async with ctx.typing():
-            for channel in ctx.guild.text_channels:
-                if (
-                    channel.overwrites_for(ctx.guild.default_role).send_messages
-                    is False
-                    or channel.id in ignored_channels
-                ):
-                    continue
-
-                overwrite = channel.overwrites_for(ctx.guild.default_role)
-                overwrite.send_messages = False
-                await channel.set_permissions(
-                    ctx.guild.default_role,
-                    overwrite=overwrite,
-                    reason=f"{ctx.author}: {reason} (lockdown all)",
+        job = OverwriteJob(
+            ctx.guild.default_role,
+            [
+                channel
+                for channel in ctx.guild.text_channels
+                if channel.id not in ignored_channels
+            ],
+            reason=f"{ctx.author}: {reason} (lockdown all)",
+            send_messages=False,
+        )
+        if not job.total:
+            return await ctx.error("All channels are already **locked**")
+
+        await ctx.load(f"Locking **{Plural(job.total):channel}**..")
+        try:
+            await job.run(
+                lambda done, total: ctx.load(
+                    f"Locking **{Plural(total):channel}** (`{done}/{total}`)"
                 )
-
-            await self.invoke_message(
-                ctx, ctx.approve, "Locked all channels", reason=reason
             )
-            await self.moderation_entry(ctx, ctx.guild, "lockdown all", reason)
+        except Exception:
+            await job.rollback()
+            return await ctx.error(
+                "Something went wrong while **locking** the channels, the changes were reverted"
+            )
+
+        await self.invoke_message(
+            ctx,
+            ctx.approve,
+            "Locked all channels"
+            + (
+                f" (failed to update **{Plural(job.failed):channel}**)"
+                if job.failed
+                else ""
+            ),
+            reason=reason,
+        )
+        await self.moderation_entry(ctx, ctx.guild, "lockdown all", reason)
 
     @lockdown.group(
         name="ignore",
@@ -2300,26 +2326,44 @@ class Moderation(Cog):
                 f"Are you sure you want to unlock all channels?\n> You haven't set any ignored channels with `{ctx.prefix}lock ignore` yet"
             )
 
-        async with ctx.typing():
-            for channel in ctx.guild.text_channels:
-                if (
-                    channel.overwrites_for(ctx.guild.default_role).send_messages is True
-                    or channel.id in ignored_channels
-                ):
-                    continue
-
-                overwrite = channel.overwrites_for(ctx.guild.default_role)
-                overwrite.send_messages = True
-                await channel.set_permissions(
-                    ctx.guild.default_role,
-                    overwrite=overwrite,
-                    reason=f"{ctx.author}: {reason} (unlockdown all)",
+        job = OverwriteJob(
+            ctx.guild.default_role,
+            [
+                channel
+                for channel in ctx.guild.text_channels
+                if channel.id not in ignored_channels
+            ],
+            reason=f"{ctx.author}: {reason} (unlockdown all)",
+            send_messages=True,
+        )
+        if not job.total:
+            return await ctx.error("All channels are already **unlocked**")
+
+        await ctx.load(f"Unlocking **{Plural(job.total):channel}**..")
+        try:
+            await job.run(
+                lambda done, total: ctx.load(
+                    f"Unlocking **{Plural(total):channel}** (`{done}/{total}`)"
                 )
-
-            await self.invoke_message(
-                ctx, ctx.approve, "Unlocked all channels", reason=reason
             )
-            await self.moderation_entry(ctx, ctx.guild, "unlockdown all", reason)
+        except Exception:
+            await job.rollback()
+            return await ctx.error(
+                "Something went wrong while **unlocking** the channels, the changes were reverted"
+            )
+
+        await self.invoke_message(
+            ctx,
+            ctx.approve,
+            "Unlocked all channels"
+            + (
+                f" (failed to update **{Plural(job.failed):channel}**)"
+                if job.failed
+                else ""
+            ),
+            reason=reason,
+        )
+        await self.moderation_entry(ctx, ctx.guild, "unlockdown all", reason)
 
     @group(
         name="slowmode",
@@ -1,15 +1,17 @@
-from asyncio import Lock, TimeoutError, gather
+from asyncio import Lock, Semaphore, TimerHandle, gather, sleep
 from contextlib import suppress
-from random import choice
-from typing import Literal
+from random import choice, shuffle, uniform
+from typing import Dict, List, Literal, Set, Tuple
 
 from discord import (
     AllowedMentions,
     Embed,
     Forbidden,
+    Guild,
     HTTPException,
     Member,
     Message,
+    NotFound,
     TextChannel,
     Thread,
 )
@@ -22,6 +24,7 @@ from discord.ext.commands import (
     max_concurrency,
 )
 from discord.ext.tasks import loop
+from discord.utils import as_chunks
 
 import config
 from tools.converters.basic import (
@@ -38,6 +41,7 @@ from tools.converters.role import Role
 from tools.managers import cache, ratelimiter
 from tools.managers.cog import Cog
 from tools.managers.context import Context
+from tools.managers.joins import JoinBuffer, RoleQueue
 from tools.managers.regex import STRING
 from tools.utilities.checks import donator, require_boost
 from tools.utilities.process import ensure_future
@@ -49,73 +53,122 @@ class Servers(Cog):
     """Cog for Server commands."""
 
     async def cog_load(self: "Servers") -> None:
+        self.sticky_messages: Dict[int, Dict] = {
+            row["channel_id"]: dict(row)
+            for row in await self.bot.db.fetch(
+                "SELECT guild_id, channel_id, message_id, message, schedule FROM sticky_messages"
+            )
+        }
+        self.sticky_timers: Dict[int, TimerHandle] = {}
+        self.gallery_channels: Set[int] = {
+            row["channel_id"]
+            for row in await self.bot.db.fetch("SELECT channel_id FROM gallery_channels")
+        }
+        self.gallery_queues: Dict[int, List[Message]] = {}
+        self.poster_channels: Set[Tuple[int, int, str]] = {
+            (row["guild_id"], row["channel_id"], row["option"])
+            for row in await self.bot.db.fetch(
+                "SELECT guild_id, channel_id, option FROM poster_channels"
+            )
+        }
+        self.poster_semaphore: Semaphore = Semaphore(10)
+        self.poster_rate: int = 25
+        self.join_configurations: Dict[int, Dict[str, List]] = {}
+        self.joins: JoinBuffer = JoinBuffer(self.process_joins)
+        self.role_queue: RoleQueue = RoleQueue()
+        self.welcome_merge_threshold: int = 5
         self.poster_feed.start()
 
-    @Cog.listener("on_user_message")
-    async def gallery_channels(self: "Servers", message: Message) -> None:
-        """Check if message is in a gallery channel"""
-        if not message.guild:
-            return
+    async def cog_unload(self: "Servers") -> None:
+        for timer in self.sticky_timers.values():
+            timer.cancel()
 
-        # Check if the message is sent within a guild before accessing its attributes
-        if await self.bot.db.fetchval(
-            "SELECT COUNT(*) FROM gallery_channels WHERE guild_id = $1 AND channel_id = $2",
-            message.guild.id,
-            message.channel.id,
+        self.sticky_timers.clear()
+        self.joins.cancel()
+        self.role_queue.cancel()
+        self.poster_feed.stop()
+
+    @Cog.listener("on_message")
+    async def gallery_dispatcher(self: "Servers", message: Message) -> None:
+        """Delete messages without attachments in gallery channels"""
+
+        if (
+            message.channel.id not in self.gallery_channels
+            or message.attachments
+            or message.author == self.bot.user
         ):
-            if not message.attachments:
-                return await message.delete()
+            return
+
+        # Messages arriving while a deletion is in flight are batched
+        if (queue := self.gallery_queues.get(message.channel.id)) is not None:
+            queue.append(message)
+            return
+
+        self.gallery_queues[message.channel.id] = queue = [message]
+        try:
+            while queue:
+                messages, queue[:] = queue[:100], queue[100:]
+                with suppress(HTTPException):
+                    if len(messages) == 1:
+                        await messages[0].delete()
+                    else:
+                        await message.channel.delete_messages(messages)
+        finally:
+            del self.gallery_queues[message.channel.id]
 
     @Cog.listener("on_user_message")
     async def sticky_message_dispatcher(
         self: "Servers", ctx: Context, message: Message
     ):
-        """Dispatch the sticky message event while waiting for the activity scheduler"""
+        """Reset the channel's activity timer, the sticky message is reposted once it settles"""
 
-        data = await self.bot.db.fetchrow(
-            "SELECT * FROM sticky_messages WHERE guild_id = $1 AND channel_id = $2",
-            message.guild.id,
-            message.channel.id,
-        )
-        if not data:
+        if not (data := self.sticky_messages.get(message.channel.id)):
             return
 
         if data["message_id"] == message.id:
             return
 
-        key = hash(f"{message.guild.id}:{message.channel.id}")
-        if not self.bot.sticky_locks.get(key):
-            self.bot.sticky_locks[key] = Lock()
-        bucket = self.bot.sticky_locks.get(key)
+        if timer := self.sticky_timers.pop(message.channel.id, None):
+            timer.cancel()
 
-        async with bucket:
-            try:
-                await self.bot.wait_for(
-                    "message",
-                    check=lambda m: m.channel == message.channel,
-                    timeout=data.get("schedule") or 2,
-                )
-            except TimeoutError:
-                pass
-            else:
-                return
+        self.sticky_timers[message.channel.id] = self.bot.loop.call_later(
+            data["schedule"] or 2,
+            lambda: self.bot.loop.create_task(
+                self.sticky_message_repost(message.channel, message.author)
+            ),
+        )
 
+    async def sticky_message_repost(
+        self: "Servers", channel: TextChannel | Thread, user: Member
+    ):
+        """Replace the sticky message at the bottom of the channel"""
+
+        self.sticky_timers.pop(channel.id, None)
+        if not (data := self.sticky_messages.get(channel.id)):
+            return
+
+        lock = self.bot.sticky_locks.setdefault(channel.id, Lock())
+        async with lock:
             with suppress(HTTPException):
-                await message.channel.get_partial_message(data["message_id"]).delete()
+                await channel.get_partial_message(data["message_id"]).delete()
 
             message = await ensure_future(
                 EmbedScript(data["message"]).send(
-                    message.channel,
+                    channel,
                     bot=self.bot,
-                    guild=message.guild,
-                    channel=message.channel,
-                    user=message.author,
+                    guild=channel.guild,
+                    channel=channel,
+                    user=user,
                 )
             )
+            if not message:
+                return
+
+            data["message_id"] = message.id
             await self.bot.db.execute(
                 "UPDATE sticky_messages SET message_id = $3 WHERE guild_id = $1 AND channel_id = $2",
-                message.guild.id,
-                message.channel.id,
+                channel.guild.id,
+                channel.id,
                 message.id,
             )
 
@@ -123,46 +176,77 @@ class Servers(Cog):
     async def poster_feed(self):
         """Send a selected avatar to all poster channels"""
 
-        for selection in await self.bot.db.fetch("SELECT * FROM poster_channels"):
-            if channel := self.bot.get_channel(selection.get("channel_id")):
-                if not (images := getattr(self.bot.catalogue, selection.get("option"))):
-                    await self.bot.db.execute(
-                        "DELETE FROM poster_channels WHERE channel_id = $1",
-                        selection.get("channel_id"),
-                    )
-                    continue
+        if not (selections := list(self.poster_channels)):
+            return
 
-                await ensure_future(
-                    channel.send(
-                        embed=(
-                            Embed(color=config.Color.neutral)
-                            .set_image(url=(choice(images)))
-                            .set_footer(text=f"{selection.get('option')} @ lain")
-                        )
-                    )
+        # Spread the sends over the interval, stretching it when there are
+        # more channels than the rate budget allows in one iteration
+        shuffle(selections)
+        window = max(
+            self.poster_feed.seconds, len(selections) / self.poster_rate
+        ) / len(selections)
+
+        stale = set()
+        await gather(
+            *(
+                self.poster_dispatch(
+                    guild_id,
+                    channel_id,
+                    option,
+                    delay=index * window + uniform(0, window),
+                    stale=stale,
                 )
-            else:
-                await self.bot.db.execute(
-                    "DELETE FROM poster_channels WHERE channel_id = $1",
-                    selection.get("channel_id"),
+                for index, (guild_id, channel_id, option) in enumerate(selections)
+            )
+        )
+
+        if stale:
+            self.poster_channels = {
+                selection
+                for selection in self.poster_channels
+                if selection[1] not in stale
+            }
+            await self.bot.db.execute(
+                "DELETE FROM poster_channels WHERE channel_id = ANY($1::BIGINT[])",
+                list(stale),
+            )
+
+    async def poster_dispatch(
+        self: "Servers",
+        guild_id: int,
+        channel_id: int,
+        option: str,
+        *,
+        delay: float,
+        stale: Set[int],
+    ):
+        """Send a selected avatar to a poster channel after its scheduled delay"""
+
+        if not (channel := self.bot.get_channel(channel_id)) or not (
+            images := getattr(self.bot.catalogue, option, None)
+        ):
+            stale.add(channel_id)
+            return
+
+        await sleep(delay)
+        async with self.poster_semaphore:
+            try:
+                await channel.send(
+                    embed=(
+                        Embed(color=config.Color.neutral)
+                        .set_image(url=(choice(images)))
+                        .set_footer(text=f"{option} @ lain")
+                    )
                 )
+            except NotFound:
+                stale.add(channel_id)
+            except HTTPException:
+                pass
 
     @poster_feed.before_loop
     async def poster_feed_before(self):
         await self.bot.wait_until_ready()
 
-    @Cog.listener("on_message")
-    async def gallery_channels(self: "Servers", message: Message):
-        """Check if message is in a gallery channel"""
-
-        if await self.bot.db.fetchval(
-            "SELECT COUNT(*) FROM gallery_channels WHERE guild_id = $1 AND channel_id = $2",
-            message.guild.id,
-            message.channel.id,
-        ):
-            if not message.attachments:
-                return await message.delete()
-
     @Cog.listener("on_user_message")  # RESPONSE TRIGGER
     async def response_trigger(self: "Servers", ctx: Context, message: Message):
         """Respond to trigger words"""
@@ -210,24 +294,98 @@ class Servers(Cog):
                 with suppress(HTTPException):
                     await message.delete()
 
-    @Cog.listener("on_member_agree")  # AUTOROLE GRANT
-    async def autorole_assigning(self: "Servers", member: Member):
-        """Assign roles to a member which joins the server"""
+    @Cog.listener("on_member_agree")  # WELCOME MESSAGE & AUTOROLE GRANT
+    async def member_agree(self: "Servers", member: Member):
+        """Buffer members which join the server"""
 
-        roles = [
-            member.guild.get_role(row.get("role_id"))
-            for row in await self.bot.db.fetch(
-                "SELECT role_id, humans, bots FROM autorole WHERE guild_id = $1",
-                member.guild.id,
-            )
-            if member.guild.get_role(row.get("role_id"))
-            and member.guild.get_role(row.get("role_id")).is_assignable()
-            and (row.get("humans") is None or member.bot is False)
-            and (row.get("bots") is None or row.get("bots") == member.bot)
-        ]
-        if roles:
-            with suppress(HTTPException):
-                await member.add_roles(*roles, reason="Role Assignment", atomic=False)
+        self.joins.add(member)
+
+    async def join_configuration(self: "Servers", guild_id: int) -> Dict[str, List]:
+        """Fetch the welcome messages and autoroles for a guild"""
+
+        if (configuration := self.join_configurations.get(guild_id)) is None:
+            configuration = self.join_configurations[guild_id] = {
+                "messages": [
+                    dict(row)
+                    for row in await self.bot.db.fetch(
+                        "SELECT channel_id, message, self_destruct FROM join_messages WHERE guild_id = $1",
+                        guild_id,
+                    )
+                ],
+                "roles": [
+                    dict(row)
+                    for row in await self.bot.db.fetch(
+                        "SELECT role_id, humans, bots FROM autorole WHERE guild_id = $1",
+                        guild_id,
+                    )
+                ],
+            }
+
+        return configuration
+
+    async def process_joins(self: "Servers", guild: Guild, members: List[Member]):
+        """Assign roles and send welcome messages for a batch of members"""
+
+        members = [member for member in members if guild.get_member(member.id)]
+        if not members:
+            return
+
+        configuration = await self.join_configuration(guild.id)
+        for member in members:
+            roles = [
+                role
+                for row in configuration["roles"]
+                if (role := guild.get_role(row["role_id"]))
+                and role.is_assignable()
+                and (row["humans"] is None or member.bot is False)
+                and (row["bots"] is None or row["bots"] == member.bot)
+            ]
+            if roles:
+                self.role_queue.put(member, roles)
+
+        for row in configuration["messages"]:
+            channel: TextChannel
+            if not (channel := guild.get_channel(row["channel_id"])):
+                continue
+
+            # Merge the mentions of a mass join into as few messages as possible,
+            # only when no other placeholder would show the first member alone.
+            # Scripts render {member...} as {user...}, so check them the same way.
+            script = row["message"].replace("{member", "{user")
+            others = script.replace("{user.mention}", "")
+            if (
+                len(members) >= self.welcome_merge_threshold
+                and "{user.mention}" in script
+                and "{user" not in others
+                and "(user." not in others
+            ):
+                batches = [
+                    (
+                        chunk[0],
+                        script.replace(
+                            "{user.mention}",
+                            ", ".join(member.mention for member in chunk),
+                        ),
+                    )
+                    for chunk in as_chunks(members, 40)
+                ]
+            else:
+                batches = [(member, row["message"]) for member in members]
+
+            for member, script in batches:
+                await ensure_future(
+                    EmbedScript(script).send(
+                        channel,
+                        bot=self.bot,
+                        guild=guild,
+                        channel=channel,
+                        user=member,
+                        allowed_mentions=AllowedMentions(
+                            everyone=True, users=True, roles=True, replied_user=False
+                        ),
+                        delete_after=row["self_destruct"],
+                    )
+                )
 
     @Cog.listener("on_user_message")
     async def reaction_trigger(self: "Servers", ctx: Context, message: Message):
@@ -289,35 +447,6 @@ class Servers(Cog):
                 )
             )
 
-    @Cog.listener("on_member_agree")  # WELCOME MESSAGE
-    async def welcome_message(self: "Servers", member: Member):
-        """Send a welcome message for a member which joins the server"""
-
-        for row in await self.bot.db.fetch(
-            """
-            SELECT * FROM join_messages
-            WHERE guild_id = $1;
-            """,
-            member.guild.id,
-        ):
-            channel: TextChannel
-            if not (channel := member.guild.get_channel(row["channel_id"])):
-                continue
-
-            await ensure_future(
-                EmbedScript(row["message"]).send(
-                    channel,
-                    bot=self.bot,
-                    guild=member.guild,
-                    channel=channel,
-                    user=member,
-                    allowed_mentions=AllowedMentions(
-                        everyone=True, users=True, roles=True, replied_user=False
-                    ),
-                    delete_after=row.get("self_destruct"),
-                )
-            )
-
     @Cog.listener("on_member_remove")
     async def send_join_message(self: "Servers", member: Member) -> None:
         for row in await self.bot.db.fetch(
@@ -397,6 +526,8 @@ class Servers(Cog):
                 f"There is already an **avatar poster** for `{option}`"
             )
 
+        self.poster_channels.add((ctx.guild.id, channel.id, option))
+
         return await ctx.approve(
             f"Now posting `{option}` avatars in {channel.mention}"
             if not option in ("banner")
@@ -434,6 +565,12 @@ class Servers(Cog):
         except:
             return await ctx.error(f"There isn't an **avatar poster** for `{option}`")
 
+        self.poster_channels = {
+            selection
+            for selection in self.poster_channels
+            if selection[0] != ctx.guild.id or selection[2] != option
+        }
+
         return await ctx.approve(
             f"No longer posting `{option}` avatars"
             if not option in ("banner")
@@ -457,6 +594,12 @@ class Servers(Cog):
         except:
             return await ctx.error("There are no **avatar posters**")
 
+        self.poster_channels = {
+            selection
+            for selection in self.poster_channels
+            if selection[0] != ctx.guild.id
+        }
+
         return await ctx.approve("Removed all **avatar posters**")
 
     @poster.command(
@@ -603,6 +746,8 @@ class Servers(Cog):
                 f"There is already a **welcome message** for {channel.mention}"
             )
 
+        self.join_configurations.pop(ctx.guild.id, None)
+
         await ctx.approve(
             f"Created {message.type(bold=False)} **welcome message** for {channel.mention}"
             + (
@@ -635,6 +780,8 @@ class Servers(Cog):
                 f"There isn't a **welcome message** for {channel.mention}"
             )
 
+        self.join_configurations.pop(ctx.guild.id, None)
+
         return await ctx.approve(
             f"Removed the **welcome message** for {channel.mention}"
         )
@@ -690,6 +837,8 @@ class Servers(Cog):
         except:
             return await ctx.error("No **welcome channels** have been set up")
 
+        self.join_configurations.pop(ctx.guild.id, None)
+
         return await ctx.approve("Removed all **welcome channels**")
 
     @welcome.command(name="list")
@@ -1818,6 +1967,7 @@ class Servers(Cog):
                 _command.qualified_name,
                 command,
             )
+            self.bot.command_aliases.pop(ctx.guild.id, None)
 
             return await ctx.approve(f"Added alias `{alias}` for command `{_command}`")
 
@@ -1847,6 +1997,7 @@ class Servers(Cog):
             ctx.guild.id,
             alias,
         )
+        self.bot.command_aliases.pop(ctx.guild.id, None)
 
         await ctx.approve(f"Removed alias `{alias}`")
 
@@ -1866,6 +2017,7 @@ class Servers(Cog):
                 "DELETE FROM aliases WHERE guild_id = $1",
                 ctx.guild.id,
             )
+            self.bot.command_aliases.pop(ctx.guild.id, None)
             return await ctx.approve(f"Reset all **aliases**")
 
         if not await self.bot.db.fetchval(
@@ -1884,6 +2036,7 @@ class Servers(Cog):
             ctx.guild.id,
             command.qualified_name,
         )
+        self.bot.command_aliases.pop(ctx.guild.id, None)
 
         await ctx.approve(f"Reset all **aliases** for `{command.qualified_name}`")
 
@@ -2040,6 +2193,7 @@ class Servers(Cog):
             ctx.author.id,
             username,
         )
+        self.bot.reskin.invalidate(user_id=ctx.author.id)
         await ctx.approve(f"Changed your **reskin username** to **{username}**")
 
     @reskin.command(
@@ -2067,6 +2221,7 @@ class Servers(Cog):
             ctx.author.id,
             image,
         )
+        self.bot.reskin.invalidate(user_id=ctx.author.id)
         await ctx.approve(f"Changed your **reskin avatar** to [**image**]({image})")
 
     @reskin.group(
@@ -2112,6 +2267,7 @@ class Servers(Cog):
             ctx.author.id,
             colors,
         )
+        self.bot.reskin.invalidate(user_id=ctx.author.id)
         await ctx.approve(
             f"Changed your **reskin color** for "
             + (
@@ -2157,6 +2313,7 @@ class Servers(Cog):
             ctx.author.id,
             colors,
         )
+        self.bot.reskin.invalidate(user_id=ctx.author.id)
         await ctx.approve(
             f"Reset your **reskin color** for "
             + (f"**{option}**" if option != "all" else f"all **embeds**")
@@ -2178,6 +2335,7 @@ class Servers(Cog):
         await self.bot.db.execute(
             "DELETE FROM reskin WHERE user_id = $1", ctx.author.id
         )
+        self.bot.reskin.invalidate(user_id=ctx.author.id)
         await ctx.approve("Removed your **reskin**")
 
     @group(
@@ -2235,6 +2393,7 @@ class Servers(Cog):
             ctx.parameters.get("humans"),
             ctx.parameters.get("bots"),
         )
+        self.join_configurations.pop(ctx.guild.id, None)
 
         return await ctx.approve(
             f"Now assigning {role.mention} to new members"
@@ -2266,6 +2425,7 @@ class Servers(Cog):
             ctx.guild.id,
             role.id,
         )
+        self.join_configurations.pop(ctx.guild.id, None)
 
         await ctx.approve(f"No longer assigning {role.mention} to new members")
 
@@ -2285,6 +2445,7 @@ class Servers(Cog):
             "DELETE FROM autorole WHERE guild_id = $1",
             ctx.guild.id,
         )
+        self.join_configurations.pop(ctx.guild.id, None)
         await ctx.approve("No longer **assigning** any roles to new members")
 
     @autorole.command(name="list", aliases=["show", "all"])
@@ -2379,6 +2540,14 @@ class Servers(Cog):
                 f"There is already a **sticky message** for {channel.mention}"
             )
 
+        self.sticky_messages[channel.id] = {
+            "guild_id": ctx.guild.id,
+            "channel_id": channel.id,
+            "message_id": _message.id,
+            "message": str(message),
+            "schedule": schedule.seconds if schedule else None,
+        }
+
         await ctx.approve(
             f"Created {message.type(bold=False)} [**sticky message**]({_message.jump_url}) for {channel.mention}"
             + (f" with an **activity schedule** of **{schedule}**" if schedule else "")
@@ -2410,6 +2579,10 @@ class Servers(Cog):
             ctx.guild.id,
             channel.id,
         )
+        self.sticky_messages.pop(channel.id, None)
+        if timer := self.sticky_timers.pop(channel.id, None):
+            timer.cancel()
+
         await ctx.approve(f"Removed the **sticky message** for {channel.mention}")
 
     @sticky.command(
@@ -2461,6 +2634,12 @@ class Servers(Cog):
             "DELETE FROM sticky_messages WHERE guild_id = $1",
             ctx.guild.id,
         )
+        for channel_id, data in list(self.sticky_messages.items()):
+            if data["guild_id"] == ctx.guild.id:
+                del self.sticky_messages[channel_id]
+                if timer := self.sticky_timers.pop(channel_id, None):
+                    timer.cancel()
+
         await ctx.approve("Removed all **sticky messages**")
 
     @sticky.command(
@@ -2530,6 +2709,8 @@ class Servers(Cog):
                 f"The role {role.mention} already has fake permission `{permission}`"
             )
 
+        self.bot.entitlements.grant(ctx.guild.id, role.id, permission)
+
         return await ctx.approve(
             f"Granted {role.mention} fake permission `{permission}`"
         )
@@ -2566,6 +2747,7 @@ class Servers(Cog):
             role.id,
             permission,
         )
+        self.bot.entitlements.revoke(ctx.guild.id, role.id, permission)
 
         await ctx.approve(f"Revoked fake permission `{permission}` from {role.mention}")
 
@@ -2585,6 +2767,7 @@ class Servers(Cog):
             "DELETE FROM fake_permissions WHERE guild_id = $1",
             ctx.guild.id,
         )
+        self.bot.entitlements.reset(ctx.guild.id)
         await ctx.approve("Removed all **fake permissions**")
 
     @fakepermissions.command(name="list", aliases=["show", "all"])
@@ -2594,12 +2777,10 @@ class Servers(Cog):
 
         roles = [
             f"{role.mention} - {', '.join([f'`{permission}`' for permission in permissions])}"
-            for row in await self.bot.db.fetch(
-                "SELECT role_id, array_agg(permission) AS permissions FROM fake_permissions WHERE guild_id = $1 GROUP BY role_id",
-                ctx.guild.id,
-            )
-            if (role := ctx.guild.get_role(row["role_id"]))
-            and (permissions := row["permissions"])
+            for role_id, permissions in self.bot.entitlements.roles(
+                ctx.guild.id
+            ).items()
+            if (role := ctx.guild.get_role(role_id))
         ]
         if not roles:
             return await ctx.error("There aren't any roles with **fake permissions**")
@@ -2997,6 +3178,7 @@ class Servers(Cog):
             ctx.guild.id,
             channel.id,
         )
+        self.gallery_channels.add(channel.id)
 
         await ctx.approve(f"{channel.mention} is now a **gallery** channel")
 
@@ -3024,6 +3206,7 @@ class Servers(Cog):
             ctx.guild.id,
             channel.id,
         )
+        self.gallery_channels.discard(channel.id)
 
         await ctx.approve(f"{channel.mention} is no longer a **gallery** channel")
 
@@ -3039,10 +3222,13 @@ class Servers(Cog):
 
         await ctx.prompt("Are you sure you want to remove all **gallery** channels?")
 
-        await self.bot.db.execute(
-            "DELETE FROM gallery_channels WHERE guild_id = $1",
+        channel_ids = await self.bot.db.fetch(
+            "DELETE FROM gallery_channels WHERE guild_id = $1 RETURNING channel_id",
             ctx.guild.id,
         )
+        self.gallery_channels.difference_update(
+            row["channel_id"] for row in channel_ids
+        )
         await ctx.approve("No longer **gallery**")
 
     @gallery.command(name="list", aliases=["show", "all"])
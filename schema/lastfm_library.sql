@@ -0,0 +1,14 @@
+-- Indexes backing the global Last.fm leaderboards (tools/managers/leaderboard.py).
+-- Apply with: psql -d <database> -f schema/lastfm_library.sql
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS artists_leaderboard
+    ON lastfm_library.artists (lower(artist), plays DESC, user_id DESC)
+    WHERE plays > 0;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS albums_leaderboard
+    ON lastfm_library.albums (lower(artist), lower(album), plays DESC, user_id DESC)
+    WHERE plays > 0;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS tracks_leaderboard
+    ON lastfm_library.tracks (lower(artist), lower(track), plays DESC, user_id DESC)
+    WHERE plays > 0;
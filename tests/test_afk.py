@@ -0,0 +1,79 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("discord")
+pytest.importorskip("asyncpg")
+
+from features.miscellaneous.miscellaneous import Miscellaneous
+
+MESSAGES = 10_000
+
+
+class Database:
+    """An asyncpg pool stand-in counting every query."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def fetch(self, *args):
+        self.calls += 1
+        return []
+
+    async def fetchrow(self, *args):
+        self.calls += 1
+
+    async def fetchval(self, *args):
+        self.calls += 1
+
+    async def execute(self, *args):
+        self.calls += 1
+
+
+class Bot:
+    def __init__(self) -> None:
+        self.db = Database()
+        self.contexts = 0
+
+    async def get_context(self, message):
+        self.contexts += 1
+        return SimpleNamespace(command=object())
+
+
+def cog(afk_users):
+    return SimpleNamespace(bot=Bot(), afk_users=afk_users)
+
+
+def message(author_id, *mentions):
+    return SimpleNamespace(
+        author=SimpleNamespace(id=author_id),
+        mentions=[SimpleNamespace(id=user_id) for user_id in mentions],
+    )
+
+
+async def replay(cog, messages):
+    for item in messages:
+        await Miscellaneous.check_afk(cog, item)
+
+
+def test_regular_traffic_never_touches_the_database():
+    stub = cog({1: ("sleeping", datetime.now(timezone.utc))})
+    messages = [
+        message(100 + index % 500, *((200 + index % 7,) if index % 3 else ()))
+        for index in range(MESSAGES)
+    ]
+
+    asyncio.run(replay(stub, messages))
+
+    assert stub.bot.db.calls == 0
+    assert stub.bot.contexts == 0
+
+
+def test_mentioning_an_afk_user_is_checked():
+    stub = cog({1: ("sleeping", datetime.now(timezone.utc))})
+    asyncio.run(replay(stub, [message(2, 1)]))
+
+    assert stub.bot.contexts == 1
+    assert stub.bot.db.calls == 0
@@ -544,50 +544,12 @@ class ImageFinder(Converter):
                 ):
                     return attachment.url
 
-        if history:
-            async for message in ctx.channel.history(limit=50):
-                if message.attachments:
-                    for attachment in message.attachments:
-                        if attachment.content_type.split("/", 1)[1] in (
-                            "png",
-                            "jpg",
-                            "jpeg",
-                            "webp",
-                            "gif",
-                        ):
-                            return attachment.url
-                if message.embeds:
-                    for embed in message.embeds:
-                        if image := embed.image:
-                            if match := regex.DISCORD_ATTACHMENT.match(image.url):
-                                if not match.group("mime") in (
-                                    "png",
-                                    "jpg",
-                                    "jpeg",
-                                    "webp",
-                                    "gif",
-                                ):
-                                    raise CommandError(
-                                        f"Invalid image format: **{match.group('mime')}**"
-                                    )
-                                return match.group()
-                            elif match := regex.IMAGE_URL.match(image.url):
-                                return match.group()
-                        elif thumbnail := embed.thumbnail:
-                            if match := regex.DISCORD_ATTACHMENT.match(thumbnail.url):
-                                if not match.group("mime") in (
-                                    "png",
-                                    "jpg",
-                                    "jpeg",
-                                    "webp",
-                                    "gif",
-                                ):
-                                    raise CommandError(
-                                        f"Invalid image format: **{match.group('mime')}**"
-                                    )
-                                return match.group()
-                            elif match := regex.IMAGE_URL.match(thumbnail.url):
-                                return match.group()
+        if history and (
+            url := await ctx.bot.media_history.find(
+                ctx.channel, ("png", "jpg", "jpeg", "webp", "gif")
+            )
+        ):
+            return url
 
         raise CommandError("Please **provide** an image")
 
@@ -642,12 +604,12 @@ class ChartSize(Converter):
             raise CommandError(
                 "Collage size **incorrectly formatted** - example: `6x6`"
             )
-        if (int(row) + int(col)) < 2:
+        if min(int(row), int(col)) < 1:
             raise CommandError("Collage size **too small**\n> Minimum size is `1x1`")
-        elif (int(row) + int(col)) > 20:
+        elif max(int(row), int(col)) > 10:
             raise CommandError("Collage size **too large**\n> Maximum size is `10x10`")
 
-        return row + "x" + col
+        return str(int(row)) + "x" + str(int(col))
 
 
 class MemberStrict(MemberConverter):
@@ -758,47 +720,12 @@ class ImageFinderStrict(Converter):
                 ):
                     return attachment.url
 
-        if history:
-            async for message in ctx.channel.history(limit=50):
-                if message.attachments:
-                    for attachment in message.attachments:
-                        if attachment.content_type.split("/", 1)[1] in (
-                            "png",
-                            "jpg",
-                            "jpeg",
-                            "webp",
-                        ):
-                            return attachment.url
-                if message.embeds:
-                    for embed in message.embeds:
-                        if image := embed.image:
-                            if match := regex.DISCORD_ATTACHMENT.match(image.url):
-                                if not match.group("mime") in (
-                                    "png",
-                                    "jpg",
-                                    "jpeg",
-                                    "webp",
-                                ):
-                                    continue
-                                return match.group()
-                            elif match := regex.IMAGE_URL.match(image.url):
-                                if match.group("mime") == "gif":
-                                    continue
-                                return match.group()
-                        elif thumbnail := embed.thumbnail:
-                            if match := regex.DISCORD_ATTACHMENT.match(thumbnail.url):
-                                if not match.group("mime") in (
-                                    "png",
-                                    "jpg",
-                                    "jpeg",
-                                    "webp",
-                                ):
-                                    continue
-                                return match.group()
-                            elif match := regex.IMAGE_URL.match(thumbnail.url):
-                                if match.group("mime") == "gif":
-                                    continue
-                                return match.group()
+        if history and (
+            url := await ctx.bot.media_history.find(
+                ctx.channel, ("png", "jpg", "jpeg", "webp")
+            )
+        ):
+            return url
 
         raise CommandError("Please **provide** an image")
 
@@ -959,20 +886,13 @@ class MediaFinder(Converter):
                 ):
                     return attachment.url
 
-        if history:
-            async for message in ctx.channel.history(limit=50):
-                if message.attachments:
-                    for attachment in message.attachments:
-                        if attachment.content_type.split("/", 1)[1] in (
-                            "mp3",
-                            "mp4",
-                            "mpeg",
-                            "mpga",
-                            "m4a",
-                            "wav",
-                            "mov",
-                            "webp",
-                        ):
-                            return attachment.url
+        if history and (
+            url := await ctx.bot.media_history.find(
+                ctx.channel,
+                ("mp3", "mp4", "mpeg", "mpga", "m4a", "wav", "mov", "webp"),
+                attachments=True,
+            )
+        ):
+            return url
 
         raise CommandError("Please **provide** a media file")
@@ -5,8 +5,9 @@ import traceback
 from contextlib import suppress
 from pathlib import Path
 from copy import copy
-from typing import Any, Dict, Union
+from typing import Any, Dict, Iterator, Optional, Union
 from asyncio import Lock
+from weakref import WeakValueDictionary
 
 from asyncspotify import Client as SpotifyClient  # type: ignore
 from asyncspotify import ClientCredentialsFlow as SpotifyClientCredentialsFlow  # type: ignore
@@ -25,6 +26,8 @@ from discord import (
     MessageType,
     NotFound,
     Guild,
+    RawBulkMessageDeleteEvent,
+    RawMessageDeleteEvent,
     TextChannel,
     VoiceChannel,
 )
@@ -68,11 +71,18 @@ from discord.utils import utcnow
 from pomice import Node
 
 import config
+from tools.managers.commands import CommandIndex
 from tools.managers.context import Context
+from tools.managers.entitlements import Entitlements
+from tools.managers.history import MediaHistory
 from tools.managers.logging import Formatter
+from tools.managers.assets import AssetCache
+from tools.managers.media import MediaFetcher
 from tools.managers.network import ClientSession
 from tools.managers.cache import cache
 from tools.managers.regex import DISCORD_ID, URL
+from tools.managers.reskin import ReskinResolver
+from tools.managers.router import RepostRouter
 from tools.utilities import tuuid, catalogue
 
 
@@ -97,6 +107,8 @@ class lain(AutoShardedBot):
             ),
         )
         self.session: ClientSession
+        self.media: MediaFetcher
+        self.assets: AssetCache = AssetCache()
         self.buckets: dict = dict(
             guild_commands=dict(
                 lock=Lock(),
@@ -151,8 +163,15 @@ class lain(AutoShardedBot):
             "Ask again later": False,
             "I can't predict now": False,
         }
-        self.sticky_locks = dict()
+        self.sticky_locks: WeakValueDictionary[int, Lock] = WeakValueDictionary()
+        self.router: RepostRouter = RepostRouter()
+        self.reskin: ReskinResolver = ReskinResolver(self)
+        self.entitlements: Entitlements = Entitlements()
+        self.media_history: MediaHistory = MediaHistory()
         self.redis: cache = cache
+        self.command_index: CommandIndex = CommandIndex((), {}, {}, {}, {}, "")
+        self.command_index_ready: bool = False
+        self.command_aliases: Dict[int, Dict[str, str]] = {}
 
     def run(self: "lain") -> None:
         os.system("clear")
@@ -160,9 +179,16 @@ class lain(AutoShardedBot):
             config.token, reconnect=True, log_formatter=Formatter(), root_logger=True
         )
 
+    async def close(self: "lain") -> None:
+        await self.assets.close()
+        await super().close()
+
     async def setup_hook(self: "lain") -> None:
         self.session = ClientSession()
+        self.media = MediaFetcher(self.session)
+        await self.assets.load()
         await self.create_pool()
+        await self.entitlements.load(self.db)
         await self.ipc.start()
         self.check(self.command_cooldown)
         logging.info(f"Logging into {self.user}")
@@ -179,66 +205,36 @@ class lain(AutoShardedBot):
                 logging.exception(f"Failed to load category {category.name}: {e}")
 
         await self.load_extension("jishaku")
+        # Built once here rather than after each of the extensions above.
+        self.command_index = await CommandIndex.build(self)
+        self.command_index_ready = True
 
-    def walk_commands(self) -> Union[Command, Group]:
-        for command in super().walk_commands():
-            if (
-                (cog := command.cog_name)
-                and cog.lower() in ("jishaku", "developer")
-                or command.hidden
-            ):
-                continue
+    async def load_extension(self, name: str, *, package: Optional[str] = None) -> None:
+        await super().load_extension(name, package=package)
+        if self.command_index_ready:
+            self.command_index = await CommandIndex.build(self)
+
+    async def unload_extension(self, name: str, *, package: Optional[str] = None) -> None:
+        await super().unload_extension(name, package=package)
+        if self.command_index_ready:
+            self.command_index = await CommandIndex.build(self)
+
+    async def reload_extension(self, name: str, *, package: Optional[str] = None) -> None:
+        await super().reload_extension(name, package=package)
+        if self.command_index_ready:
+            self.command_index = await CommandIndex.build(self)
+
+    def walk_commands(self) -> Iterator[Union[Command, Group]]:
+        if not self.command_index_ready:
+            return super().walk_commands()
 
-            yield command
+        return iter(self.command_index.commands)
 
     @Server.route(
         name="commands",
     )
     async def ipc_commands(self, payload: ClientPayload) -> Dict:
-        output = "Documentation @ https://docs.lains.life\nDefault Prefix: , | () = Required, <> = Optional\n\n"
-
-        for name, cog in sorted(self.cogs.items(), key=lambda cog: cog[0].lower()):
-            if name.lower() in ("jishaku", "developer"):
-                continue
-
-            _commands = list()
-            for command in cog.walk_commands():
-                if command.hidden:
-                    continue
-                if command.cog_name.lower() in ("jishaku", "developer"):
-                    continue
-
-                usage = " " + command.usage if command.usage else ""
-                aliases = (
-                    "[" + "|".join(command.aliases) + "]" if command.aliases else ""
-                )
-                if isinstance(command, Group) and not command.root_parent:
-                    _commands.append(
-                        f"|    ├── {command.name}{aliases}: {command.short_doc or 'No description'}"
-                    )
-                elif not isinstance(command, Group) and command.root_parent:
-                    _commands.append(
-                        f"|    |   ├── {command.qualified_name}{aliases}{usage}: {command.short_doc or 'No description'}"
-                    )
-                elif isinstance(command, Group) and command.root_parent:
-                    _commands.append(
-                        f"|    |   ├── {command.qualified_name}{aliases}: {command.short_doc or 'No description'}"
-                    )
-                else:
-                    _commands.append(
-                        f"|    ├── {command.qualified_name}{aliases}{usage}: {command.short_doc or 'No description'}"
-                    )
-
-            if _commands:
-                output += f"┌── {name}\n" + "\n".join(_commands) + "\n"
-
-        return {
-            "bot": {
-                "name": self.user.name,
-                "avatar": self.user.display_avatar.url,
-            },
-            "commands": output,
-        }
+        return self.command_index.document(self)
 
     @Server.route(
         name="avatars",
@@ -247,16 +243,23 @@ class lain(AutoShardedBot):
         if not DISCORD_ID.match(str(payload.user_id)):
             return {"error": "Invalid user ID"}
 
-        avatars = await self.db.fetch(
-            "SELECT avatar FROM metrics.avatars WHERE user_id = $1 ORDER BY timestamp DESC",
-            int(payload.user_id),
-        )
+        key = f"avatars:{payload.user_id}"
+        if (avatars := await cache.get(key)) is None:
+            avatars = [
+                row["avatar"]
+                for row in await self.db.fetch(
+                    "SELECT avatar FROM metrics.avatars WHERE user_id = $1 ORDER BY timestamp DESC",
+                    int(payload.user_id),
+                )
+            ]
+            await cache.set(key, avatars, expire=3600)
+
         if not avatars:
             return {"error": "User has no avatar history"}
 
         output = {
             "user_id": int(payload.user_id),
-            "avatars": [avatar["avatar"] for avatar in avatars],
+            "avatars": avatars,
         }
         if user := self.get_user(int(payload.user_id)):
             output["user"] = {"name": user.name, "avatar": user.display_avatar.url}
@@ -348,6 +351,9 @@ class lain(AutoShardedBot):
             guild_id,
             value,
         )
+        if key == "reskin":
+            self.reskin.invalidate(guild_id=guild_id)
+
         return await self.db.fetchrow(
             f"SELECT * FROM config WHERE guild_id = $1", guild_id
         )
@@ -359,17 +365,37 @@ class lain(AutoShardedBot):
         )
 
     def get_command(self, command: str, module: str = None):
-        if command := super().get_command(command):
+        if self.command_index_ready:
+            command = self.command_index.get(command)
+        # Extensions look up their own commands while loading, before the index has them.
+        elif (command := super().get_command(command)) and not CommandIndex.public(
+            command
+        ):
+            return None
+
+        if command:
             if not command.cog_name:
                 return command
-            if command.cog_name.lower() in ("jishaku", "developer") or command.hidden:
-                return None
             if module and command.cog_name.lower() != module.lower():
                 return None
             return command
 
         return None
 
+    async def guild_aliases(self, guild_id: int) -> Dict[str, str]:
+        """Return the custom command aliases of a guild"""
+
+        if (aliases := self.command_aliases.get(guild_id)) is None:
+            aliases = self.command_aliases[guild_id] = {
+                row["alias"]: row["command"]
+                for row in await self.db.fetch(
+                    "SELECT alias, command FROM aliases WHERE guild_id = $1",
+                    guild_id,
+                )
+            }
+
+        return aliases
+
     async def get_prefix(self, message: Message) -> Any:
         if not message.guild:
             return when_mentioned_or(config.prefix)(self, message)
@@ -399,19 +425,23 @@ class lain(AutoShardedBot):
             return
 
         if isinstance(error, CommandNotFound):
+            if not ctx.guild:
+                return
+
             try:
-                command = await self.db.fetchval(
-                    "SELECT command FROM aliases WHERE guild_id = $1 AND alias = $2",
-                    ctx.guild.id,
-                    ctx.invoked_with.lower(),
-                )
-                if command := self.get_command(command):
+                aliases = await self.guild_aliases(ctx.guild.id)
+                if command := self.get_command(aliases.get(ctx.invoked_with.lower())):
                     self.err = ctx
                     message = copy(ctx.message)
                     message.content = message.content.replace(
                         ctx.invoked_with, command.qualified_name
                     )
-                    await self.process_commands(message)
+                    return await self.process_commands(message)
+
+                if suggestion := self.command_index.suggest(ctx.invoked_with):
+                    await ctx.error(
+                        f"Command `{ctx.invoked_with}` doesn't exist\n> Did you mean `{suggestion}`?"
+                    )
 
             except Exception:
                 return
@@ -560,6 +590,9 @@ class lain(AutoShardedBot):
         return True
 
     async def on_message_edit(self, before: Message, after: Message):
+        if after.guild and len(after.embeds) > len(before.embeds):
+            self.media_history.add(after)
+
         if not self.is_ready() or not before.guild or before.author.bot:
             return
 
@@ -569,6 +602,9 @@ class lain(AutoShardedBot):
         await self.process_commands(after)
 
     async def on_message(self: "lain", message: Message):
+        if message.guild:
+            self.media_history.add(message)
+
         if not self.is_ready() or not message.guild or message.author.bot:
             return
 
@@ -593,7 +629,7 @@ class lain(AutoShardedBot):
                 with suppress(HTTPException):
                     await message.delete()
 
-                self.dispatch("message_repost", ctx, match.group())
+                self.loop.create_task(self.router.dispatch(ctx, match.group()))
 
         ctx = await self.get_context(message)
         if not ctx.command:
@@ -601,6 +637,14 @@ class lain(AutoShardedBot):
 
         await self.process_commands(message)
 
+    async def on_raw_message_delete(self, payload: RawMessageDeleteEvent) -> None:
+        self.media_history.discard(payload.channel_id, (payload.message_id,))
+
+    async def on_raw_bulk_message_delete(
+        self, payload: RawBulkMessageDeleteEvent
+    ) -> None:
+        self.media_history.discard(payload.channel_id, payload.message_ids)
+
     async def on_member_join(self, member: Member) -> None:
         if not member.pending:
             self.dispatch(
@@ -0,0 +1,328 @@
+import io
+import json
+import os
+from asyncio import Lock, Task, create_task, sleep, to_thread
+from collections import OrderedDict
+from mmap import ACCESS_READ, mmap
+from pathlib import Path
+from time import time
+from typing import IO, Dict, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from xxhash import xxh64
+
+__all__: Tuple[str, ...] = ("AssetCache", "MappedFile", "signed_expiry")
+
+CHUNK_SIZE = 1024 * 1024
+# Stop reusing an attachment URL this long before its signature expires.
+EXPIRY_MARGIN = 60 * 60
+
+
+def signed_expiry(url: str) -> Optional[float]:
+    """Return when a signed Discord attachment URL expires."""
+
+    # Signed CDN URLs carry their expiry as a hex timestamp.
+    if signed := parse_qs(urlparse(url).query).get("ex"):
+        try:
+            return float(int(signed[0], 16))
+        except ValueError:
+            pass
+
+    return None
+
+
+class MappedFile(io.RawIOBase):
+    """A read-only, seekable file object backed by a memory map."""
+
+    def __init__(self, path: Path) -> None:
+        self._file = open(path, "rb")
+        self._map = mmap(self._file.fileno(), 0, access=ACCESS_READ)
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        view = memoryview(self._map)[self._position : self._position + len(buffer)]
+        size = len(view)
+        buffer[:size] = view
+        view.release()
+        self._position += size
+        return size
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._map)
+
+        self._position = max(0, min(offset, len(self._map)))
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+    def close(self) -> None:
+        if not self.closed:
+            self._map.close()
+            self._file.close()
+
+        super().close()
+
+
+class AssetCache:
+    """
+    Content-addressed cache of downloaded media on local disk.
+
+    Files are stored once by the hash of their content and looked up through
+    a `service:post_id` index, the least recently used files are evicted once
+    the directory grows past `capacity` bytes. Alongside it an index of post
+    to Discord attachment URL lets a repeat repost link the previous upload
+    until the URL's signature is about to expire. Index changes are saved
+    at most every `interval` seconds and flushed on close.
+    """
+
+    def __init__(
+        self,
+        directory: str = "cache/assets",
+        *,
+        capacity: int = 2 * 1024 * 1024 * 1024,
+        mmap_threshold: int = 1024 * 1024,
+        attachments: int = 10_000,
+        attachment_ttl: float = 20 * 60 * 60,
+        interval: float = 30,
+    ) -> None:
+        self.directory: Path = Path(directory)
+        self.capacity: int = capacity
+        self.mmap_threshold: int = mmap_threshold
+        self.attachment_capacity: int = attachments
+        self.attachment_ttl: float = attachment_ttl
+        self.interval: float = interval
+
+        self.files: OrderedDict[str, int] = OrderedDict()
+        self.posts: Dict[str, str] = {}
+        self.digests: Dict[str, Set[str]] = {}
+        # Post key -> (attachment url, unix time it stops being reused)
+        self.attachments: OrderedDict[str, Tuple[str, float]] = OrderedDict()
+        self.size: int = 0
+        self.lock: Lock = Lock()
+        self.task: Optional[Task] = None
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @property
+    def index_path(self) -> Path:
+        return self.directory / "index.json"
+
+    def path(self, digest: str) -> Path:
+        return self.directory / digest[:2] / digest
+
+    async def load(self) -> None:
+        await to_thread(self._load)
+
+    def _load(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        files = []
+        for path in self.directory.glob("??/*"):
+            stat = path.stat()
+            files.append((stat.st_mtime, path.name, stat.st_size))
+
+        for _, digest, size in sorted(files):
+            self.files[digest] = size
+            self.size += size
+
+        try:
+            index = json.loads(self.index_path.read_text())
+        except (OSError, ValueError):
+            index = {}
+
+        for key, digest in index.get("posts", {}).items():
+            if digest in self.files:
+                self.posts[key] = digest
+                self.digests.setdefault(digest, set()).add(key)
+
+        now = time()
+        for key, attachment in index.get("attachments", {}).items():
+            # Entries saved without an expiry can't be trusted to still resolve.
+            if (
+                isinstance(attachment, list)
+                and len(attachment) == 2
+                and isinstance(attachment[1], (int, float))
+                and attachment[1] > now
+            ):
+                self.attachments[key] = (attachment[0], attachment[1])
+
+    async def save(self) -> None:
+        index = {
+            "posts": dict(self.posts),
+            "attachments": dict(self.attachments),
+        }
+        async with self.lock:
+            await to_thread(self._save, index)
+
+    def _save(self, index: dict) -> None:
+        temporary = self.index_path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(index))
+        os.replace(temporary, self.index_path)
+
+    def schedule_save(self) -> None:
+        if not self.task:
+            self.task = create_task(self._save_later())
+
+    async def _save_later(self) -> None:
+        try:
+            await sleep(self.interval)
+        finally:
+            self.task = None
+
+        await self.save()
+
+    async def close(self) -> None:
+        """Write any index changes still waiting on the debounce."""
+
+        if self.task:
+            self.task.cancel()
+            self.task = None
+            await self.save()
+
+    def expiry(self, url: str) -> float:
+        """Return when a Discord attachment URL should no longer be reused."""
+
+        expires_at = time() + self.attachment_ttl
+        if (signed := signed_expiry(url)) is not None:
+            expires_at = min(expires_at, signed - EXPIRY_MARGIN)
+
+        return expires_at
+
+    @staticmethod
+    def reusable(url: str) -> bool:
+        """Whether a stored attachment URL is signed and still valid for a while."""
+
+        return (signed := signed_expiry(url)) is not None and signed - EXPIRY_MARGIN > time()
+
+    def attachment(self, key: str) -> Optional[str]:
+        """Return the URL of a previous upload for the post."""
+
+        if not (attachment := self.attachments.get(key)):
+            return None
+
+        url, expires_at = attachment
+        if expires_at <= time():
+            self.forget(key)
+            return None
+
+        self.attachments.move_to_end(key)
+        return url
+
+    async def remember(self, key: str, url: str) -> None:
+        self.attachments[key] = (url, self.expiry(url))
+        self.attachments.move_to_end(key)
+        while len(self.attachments) > self.attachment_capacity:
+            self.attachments.popitem(last=False)
+
+        self.schedule_save()
+
+    def forget(self, key: str) -> None:
+        if self.attachments.pop(key, None):
+            self.schedule_save()
+
+    def sizeof(self, key: str) -> Optional[int]:
+        if digest := self.posts.get(key):
+            return self.files.get(digest)
+
+        return None
+
+    async def open(self, key: str) -> Optional[IO[bytes]]:
+        """Open a cached asset, large files are served through mmap."""
+
+        if not (digest := self.posts.get(key)) or digest not in self.files:
+            self.misses += 1
+            return None
+
+        try:
+            fp = await to_thread(self._open, digest)
+        except OSError:
+            self._evict(digest)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.files.move_to_end(digest)
+        return fp
+
+    def _open(self, digest: str) -> IO[bytes]:
+        path = self.path(digest)
+        os.utime(path)
+
+        if self.files[digest] >= self.mmap_threshold:
+            return io.BufferedReader(MappedFile(path))
+
+        return io.BytesIO(path.read_bytes())
+
+    async def store(self, key: str, buffer: IO[bytes]) -> IO[bytes]:
+        """Write a downloaded asset to disk and return it reopened for reading."""
+
+        try:
+            digest, size = await to_thread(self._store, buffer)
+        finally:
+            buffer.close()
+
+        if digest not in self.files:
+            self.files[digest] = size
+            self.size += size
+
+        self.posts[key] = digest
+        self.digests.setdefault(digest, set()).add(key)
+        self.files.move_to_end(digest)
+
+        while self.size > self.capacity and len(self.files) > 1:
+            oldest = next(iter(self.files))
+            if oldest == digest:
+                break
+
+            await to_thread(self._unlink, oldest)
+            self._evict(oldest)
+
+        self.schedule_save()
+        return await to_thread(self._open, digest)
+
+    def _store(self, buffer: IO[bytes]) -> Tuple[str, int]:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        temporary = self.directory / f".{id(buffer)}.tmp"
+
+        hasher = xxh64()
+        size = 0
+        buffer.seek(0)
+        with open(temporary, "wb") as file:
+            while chunk := buffer.read(CHUNK_SIZE):
+                hasher.update(chunk)
+                file.write(chunk)
+                size += len(chunk)
+
+        digest = hasher.hexdigest()
+        path = self.path(digest)
+        path.parent.mkdir(exist_ok=True)
+        if path.exists():
+            temporary.unlink()
+        else:
+            os.replace(temporary, path)
+
+        return digest, size
+
+    def _unlink(self, digest: str) -> None:
+        try:
+            self.path(digest).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _evict(self, digest: str) -> None:
+        if (size := self.files.pop(digest, None)) is not None:
+            self.size -= size
+
+        for key in self.digests.pop(digest, set()):
+            self.posts.pop(key, None)
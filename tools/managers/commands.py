@@ -0,0 +1,289 @@
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Dict, List, Mapping, Optional, Tuple
+
+from discord import Embed
+from discord.ext.commands import Command, Group
+from xxhash import xxh64_hexdigest
+
+import config
+from tools.utilities.bktree import WordIndex
+
+if TYPE_CHECKING:
+    from tools.lain import lain
+
+
+__all__: Tuple[str, ...] = ("CommandIndex",)
+
+# Replaced with the invoking prefix when a help embed is sent.
+PREFIX: str = "\x00prefix\x00"
+PRIVATE: Tuple[str, ...] = ("jishaku", "developer")
+
+
+class CommandIndex:
+    """
+    An immutable snapshot of the public command tree.
+
+    Built once the extensions are loaded at startup and again whenever one is
+    loaded, unloaded or reloaded afterwards, it holds the lookups every help
+    surface needs: commands by qualified name or alias path, commands per
+    cog, their permission requirements, prerendered help embeds, the text
+    tree served on the website and a fuzzy index of the top level names for
+    suggesting commands on typos.
+    """
+
+    def __init__(
+        self,
+        commands: Tuple[Command, ...],
+        names: Mapping[str, Command],
+        cogs: Mapping[str, Tuple[Command, ...]],
+        permissions: Mapping[str, Tuple[str, ...]],
+        embeds: Mapping[str, Embed],
+        tree: str,
+        suggestions: Optional[WordIndex] = None,
+    ) -> None:
+        self.commands: Tuple[Command, ...] = commands
+        self.names: Mapping[str, Command] = names
+        self.cogs: Mapping[str, Tuple[Command, ...]] = cogs
+        self.permissions: Mapping[str, Tuple[str, ...]] = permissions
+        self.embeds: Mapping[str, Embed] = embeds
+        self.tree: str = tree
+        self.suggestions: WordIndex = suggestions or WordIndex()
+
+    @staticmethod
+    def public(command: Command) -> bool:
+        return not command.cog_name or (
+            command.cog_name.lower() not in PRIVATE and not command.hidden
+        )
+
+    @staticmethod
+    def paths(command: Command) -> List[str]:
+        """Return every name path which invokes the command."""
+
+        names = [command.name, *command.aliases]
+        if not command.parent:
+            return [name.lower() for name in names]
+
+        return [
+            f"{parent} {name.lower()}"
+            for parent in CommandIndex.paths(command.parent)
+            for name in names
+        ]
+
+    @classmethod
+    async def build(cls, bot: "lain") -> "CommandIndex":
+        names: Dict[str, Command] = {}
+        permissions: Dict[str, Tuple[str, ...]] = {}
+        embeds: Dict[str, Embed] = {}
+        avatar = bot.user.display_avatar if bot.user else None
+
+        everything = dict.fromkeys(bot.all_commands.values())
+        for command in list(everything):
+            if isinstance(command, Group):
+                everything.update(dict.fromkeys(command.walk_commands()))
+
+        commands = []
+        suggestions = WordIndex()
+        for command in everything:
+            if not cls.public(command):
+                continue
+
+            if not command.parent and not command.hidden:
+                for name in (command.name, *command.aliases):
+                    suggestions.add(name.lower(), command.qualified_name)
+
+            for path in cls.paths(command):
+                names.setdefault(path, command)
+
+            permissions[command.qualified_name] = tuple(await command.permissions())
+            embeds[command.qualified_name] = cls.render_help(
+                command, permissions[command.qualified_name], avatar
+            )
+            if not command.hidden:
+                commands.append(command)
+
+        cogs = {
+            name: tuple(command for command in cog.walk_commands() if cls.public(command))
+            for name, cog in sorted(bot.cogs.items(), key=lambda cog: cog[0].lower())
+            if name.lower() not in PRIVATE
+        }
+        return cls(
+            tuple(commands),
+            MappingProxyType(names),
+            MappingProxyType(cogs),
+            MappingProxyType(permissions),
+            MappingProxyType(embeds),
+            cls.render_tree(cogs),
+            suggestions,
+        )
+
+    def get(self, name: Optional[str]) -> Optional[Command]:
+        if not name:
+            return None
+
+        return self.names.get(" ".join(name.lower().split()))
+
+    def suggest(self, name: str) -> Optional[str]:
+        """Return the command closest to a mistyped name."""
+
+        if len(name := name.lower()) < 3:
+            return None
+
+        if match := self.suggestions.closest(name, 1 if len(name) < 6 else 2):
+            return match[2]
+
+        return None
+
+    def help(self, command: Command, prefix: str) -> Embed:
+        if not (embed := self.embeds.get(command.qualified_name)):
+            # Not part of this snapshot, e.g. looked up while extensions load.
+            embed = self.render_help(
+                command, self.permissions.get(command.qualified_name, ()), None
+            )
+
+        embed = embed.copy()
+        embed.description = embed.description.replace(PREFIX, prefix)
+        return embed
+
+    @staticmethod
+    def render_tree(cogs: Mapping[str, Tuple[Command, ...]]) -> str:
+        output = "Documentation @ https://docs.lains.life\nDefault Prefix: , | () = Required, <> = Optional\n\n"
+
+        for name, commands in cogs.items():
+            _commands = list()
+            for command in commands:
+                usage = " " + command.usage if command.usage else ""
+                aliases = (
+                    "[" + "|".join(command.aliases) + "]" if command.aliases else ""
+                )
+                if isinstance(command, Group) and not command.root_parent:
+                    _commands.append(
+                        f"|    ├── {command.name}{aliases}: {command.short_doc or 'No description'}"
+                    )
+                elif not isinstance(command, Group) and command.root_parent:
+                    _commands.append(
+                        f"|    |   ├── {command.qualified_name}{aliases}{usage}: {command.short_doc or 'No description'}"
+                    )
+                elif isinstance(command, Group) and command.root_parent:
+                    _commands.append(
+                        f"|    |   ├── {command.qualified_name}{aliases}: {command.short_doc or 'No description'}"
+                    )
+                else:
+                    _commands.append(
+                        f"|    ├── {command.qualified_name}{aliases}{usage}: {command.short_doc or 'No description'}"
+                    )
+
+            if _commands:
+                output += f"┌── {name}\n" + "\n".join(_commands) + "\n"
+
+        return output
+
+    def document(self, bot: "lain") -> Dict:
+        """Return the command tree served on the website."""
+
+        # The name and avatar can change without any extension being reloaded.
+        name = bot.user.name if bot.user else None
+        avatar = bot.user.display_avatar.url if bot.user else None
+        return {
+            "bot": {
+                "name": name,
+                "avatar": avatar,
+            },
+            "commands": self.tree,
+            "version": xxh64_hexdigest(f"{self.tree}{name}{avatar}"),
+        }
+
+    @staticmethod
+    def render_help(command: Command, permissions: Tuple[str, ...], avatar) -> Embed:
+        embed = Embed(
+            description=command.short_doc or "No description provided",
+            color=config.Color.neutral,
+        )
+        embed.description += (
+            f"\n>>> ```bf\nSyntax: {PREFIX}{command.qualified_name} {command.usage or ''}\n"
+            + (
+                f"Example: {PREFIX}{command.qualified_name} {command.example}"
+                if command.example
+                else ""
+            )
+            + "```"
+        )
+        embed.set_author(
+            name=command.cog_name or "No category",
+            icon_url=avatar,
+            url=f"https://discord.com",
+        )
+
+        embed.add_field(
+            name="Aliases",
+            value=", ".join([f"`{alias}`" for alias in command.aliases]) or "`N/A`",
+            inline=(False if len(command.aliases) >= 4 else True),
+        )
+        embed.add_field(
+            name="Parameters",
+            value=", ".join([f"`{param}`" for param in command.clean_params])
+            or "`N/A`",
+            inline=True,
+        )
+        embed.add_field(
+            name="Permissions",
+            value=", ".join(
+                list(
+                    map(
+                        lambda p: "`" + p.replace("_", " ").title() + "`",
+                        permissions,
+                    )
+                )
+            )
+            or "`N/A`",
+            inline=True,
+        )
+
+        if command.parameters:
+            embed.add_field(
+                name="Optional Parameters",
+                value="\n".join(
+                    [
+                        "`"
+                        + ("--" if parameter.get("require_value", True) else "-")
+                        + f"{parameter_name}` "
+                        + (
+                            (
+                                ("(" if not parameter.get("default") else "[")
+                                + " | ".join(
+                                    [
+                                        f"`{choice}`"
+                                        for choice in parameter.get("choices", [])
+                                    ]
+                                )
+                                + (")" if not parameter.get("default") else "]")
+                            )
+                            if parameter.get("choices")
+                            else (
+                                (
+                                    "`"
+                                    + str(parameter["converter"])
+                                    .split("'", 1)[1]
+                                    .split("'")[0]
+                                    + "`"
+                                    if parameter.get("converter")
+                                    else ""
+                                )
+                            )
+                            if parameter.get("converter")
+                            and not getattr(parameter.get("converter"), "__name__", "")
+                            in ("int")
+                            else (
+                                f"(`{parameter.get('minimum', 1)}`-`{parameter.get('maximum', 100)}`)"
+                                if getattr(parameter.get("converter"), "__name__", "")
+                                == "int"
+                                else ""
+                            )
+                        )
+                        + f"\n> {parameter['description']}"
+                        for parameter_name, parameter in command.parameters.items()
+                    ]
+                ),
+                inline=False,
+            )
+
+        return embed
@@ -10,7 +10,6 @@ from discord.ext.commands import UserInputError
 from discord.utils import as_chunks, cached_property
 
 import config
-from tools.utilities.checks import donator
 from tools.managers.cache import cache
 from ..utilities.typing import Typing
 
@@ -39,39 +38,8 @@ class Context(BaseContext):
     def typing(self) -> Typing:
         return Typing(self)
 
-    @cache(ttl="1m", key="{self.message.id}", prefix="reskin")
     async def reskin(self):
-        try:
-            await donator().predicate(self)
-        except:
-            pass
-        else:
-            configuration = await self.bot.fetch_config(self.guild.id, "reskin") or {}
-            if configuration.get("status"):
-                if webhook_id := configuration["webhooks"].get(str(self.channel.id)):
-                    reskin = await self.bot.db.fetchrow(
-                        "SELECT username, avatar_url, colors, emojis FROM reskin WHERE user_id = $1",
-                        self.author.id,
-                    )
-                    if reskin and (reskin.get("username") or reskin.get("avatar_url")):
-                        webhook = await self.channel.reskin_webhook(webhook_id)
-                        if not webhook:
-                            del configuration["webhooks"][str(self.channel.id)]
-                            await self.bot.update_config(
-                                self.guild.id, "reskin", configuration
-                            )
-                        else:
-                            return {
-                                "username": reskin.get("username")
-                                or self.bot.user.name,
-                                "avatar_url": reskin.get("avatar_url")
-                                or self.bot.user.display_avatar.url,
-                                "colors": reskin.get("colors", {}),
-                                "emojis": reskin.get("emojis", {}),
-                                "webhook": webhook,
-                            }
-
-        return {}
+        return await self.bot.reskin.resolve(self.channel, self.author)
 
     @cached_property
     def replied_message(self) -> Message:
@@ -208,6 +176,7 @@ class Context(BaseContext):
                 reskin = await self.bot.fetch_config(self.guild.id, "reskin") or {}
                 del reskin["webhooks"][str(self.channel.id)]
                 await self.bot.update_config(self.guild.id, "reskin", reskin)
+                self.bot.reskin.invalidate(channel_id=self.channel.id)
                 await cache.delete_many(
                     f"reskin:channel:{self.channel.id}",
                     f"reskin:webhook:{self.channel.id}",
@@ -0,0 +1,81 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Set, Tuple
+
+from asyncpg import Pool
+from discord import Member
+
+__all__: Tuple[str, ...] = ("Entitlements",)
+
+
+class Entitlements:
+    """
+    In-memory copy of the fake permissions and donators tables.
+
+    Both tables are loaded once on startup and kept in sync by the commands
+    which write to them, so permission checks are answered synchronously from
+    the author's roles instead of querying Postgres before every command.
+    """
+
+    def __init__(self) -> None:
+        self.permissions: Dict[int, Dict[str, Set[int]]] = defaultdict(
+            lambda: defaultdict(set)
+        )
+        self.donators: Set[int] = set()
+
+    async def load(self, db: Pool) -> None:
+        self.permissions.clear()
+        for record in await db.fetch(
+            "SELECT guild_id, role_id, permission FROM fake_permissions"
+        ):
+            self.permissions[record["guild_id"]][record["permission"]].add(
+                record["role_id"]
+            )
+
+        self.donators = {
+            record["user_id"]
+            for record in await db.fetch("SELECT user_id FROM donators")
+        }
+
+    def grant(self, guild_id: int, role_id: int, permission: str) -> None:
+        self.permissions[guild_id][permission].add(role_id)
+
+    def revoke(self, guild_id: int, role_id: int, permission: str) -> None:
+        if not (permissions := self.permissions.get(guild_id)):
+            return
+
+        if roles := permissions.get(permission):
+            roles.discard(role_id)
+            if not roles:
+                del permissions[permission]
+
+        if not permissions:
+            del self.permissions[guild_id]
+
+    def reset(self, guild_id: int) -> None:
+        self.permissions.pop(guild_id, None)
+
+    def roles(self, guild_id: int) -> Dict[int, List[str]]:
+        """Return every role with fake permissions mapped to those permissions."""
+
+        output: Dict[int, List[str]] = defaultdict(list)
+        for permission, roles in self.permissions.get(guild_id, {}).items():
+            for role_id in roles:
+                output[role_id].append(permission)
+
+        return output
+
+    def missing(self, member: Member, permissions: Iterable[str]) -> List[str]:
+        """Filter out the permissions granted to the member through fake permissions."""
+
+        if not (granted := self.permissions.get(member.guild.id)):
+            return list(permissions)
+
+        role_ids = [role.id for role in member.roles]
+        return [
+            permission
+            for permission in permissions
+            if not (roles := granted.get(permission)) or roles.isdisjoint(role_ids)
+        ]
+
+    def is_donator(self, user_id: int) -> bool:
+        return user_id in self.donators
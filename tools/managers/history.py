@@ -0,0 +1,164 @@
+from collections import OrderedDict, deque
+from typing import Deque, Iterable, NamedTuple, Optional, Tuple
+
+from discord import Message
+from discord.abc import Messageable
+
+from . import regex
+
+__all__: Tuple[str, ...] = ("MediaHistory",)
+
+
+class Media(NamedTuple):
+    url: str
+    mime: Optional[str]
+    attachment: bool
+
+
+class _Channel:
+    __slots__ = ("messages", "complete")
+
+    def __init__(self, size: int) -> None:
+        self.messages: Deque[Tuple[int, Tuple[Media, ...]]] = deque(maxlen=size)
+        # Whether every media message of the last `depth` messages is buffered.
+        self.complete: bool = False
+
+
+class MediaHistory:
+    """
+    Recently posted media per channel, newest last.
+
+    Every message carrying attachments or embedded images is recorded as it
+    arrives, so a memory hit is always the latest media in the channel. A
+    miss is only trusted while nothing has been dropped from the buffer since
+    the last `depth` messages were read, otherwise the REST history is read.
+    """
+
+    def __init__(
+        self, *, size: int = 20, capacity: int = 100_000, depth: int = 50
+    ) -> None:
+        self.size: int = size
+        self.depth: int = depth
+        self.capacity: int = capacity
+        self.channels: OrderedDict[int, _Channel] = OrderedDict()
+        self.total: int = 0
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @staticmethod
+    def extract(message: Message) -> Tuple[Media, ...]:
+        media = [
+            Media(
+                attachment.url,
+                attachment.content_type.split("/", 1)[1]
+                if attachment.content_type
+                else None,
+                True,
+            )
+            for attachment in message.attachments
+        ]
+        for embed in message.embeds:
+            if not (url := embed.image.url or embed.thumbnail.url):
+                continue
+
+            if match := regex.DISCORD_ATTACHMENT.match(url):
+                media.append(Media(match.group(), match.group("mime"), False))
+            elif match := regex.IMAGE_URL.match(url):
+                media.append(Media(match.group(), match.group("mime"), False))
+
+        return tuple(media)
+
+    def channel(self, channel_id: int) -> _Channel:
+        if not (channel := self.channels.get(channel_id)):
+            channel = self.channels[channel_id] = _Channel(self.size)
+
+        self.channels.move_to_end(channel_id)
+        return channel
+
+    def add(self, message: Message) -> None:
+        if not (media := self.extract(message)):
+            return
+
+        channel = self.channel(message.channel.id)
+        messages = channel.messages
+        if not messages or message.id > messages[-1][0]:
+            if len(messages) == self.size:
+                self.total -= 1
+                channel.complete = False
+
+            messages.append((message.id, media))
+            self.total += 1
+        else:
+            # An edit or a backfill, rebuild the buffer in order.
+            entries = sorted(
+                {
+                    **dict(messages),
+                    message.id: media,
+                }.items()
+            )
+            if len(entries) > self.size:
+                entries = entries[-self.size :]
+                channel.complete = False
+
+            self.total += len(entries) - len(messages)
+            channel.messages = deque(entries, maxlen=self.size)
+
+        self.trim()
+
+    def trim(self) -> None:
+        """Evict the least recently active channels past the global capacity."""
+
+        while (
+            self.total > self.capacity or len(self.channels) > self.capacity
+        ) and len(self.channels) > 1:
+            _, evicted = self.channels.popitem(last=False)
+            self.total -= len(evicted.messages)
+
+    def discard(self, channel_id: int, message_ids: Iterable[int]) -> None:
+        if not (channel := self.channels.get(channel_id)):
+            return
+
+        message_ids = set(message_ids)
+        messages = [entry for entry in channel.messages if entry[0] not in message_ids]
+        self.total -= len(channel.messages) - len(messages)
+        channel.messages = deque(messages, maxlen=self.size)
+
+    def _find(
+        self, channel_id: int, mimes: Tuple[str, ...], attachments: bool
+    ) -> Optional[str]:
+        if not (channel := self.channels.get(channel_id)):
+            return None
+
+        for _, media in reversed(channel.messages):
+            for item in media:
+                if item.mime in mimes and (item.attachment or not attachments):
+                    return item.url
+
+        return None
+
+    async def find(
+        self,
+        channel: Messageable,
+        mimes: Tuple[str, ...],
+        *,
+        attachments: bool = False,
+    ) -> Optional[str]:
+        """Return the most recent media in the channel matching the formats."""
+
+        if url := self._find(channel.id, mimes, attachments):
+            self.hits += 1
+            return url
+
+        if (tracked := self.channels.get(channel.id)) and tracked.complete:
+            self.hits += 1
+            return None
+
+        self.misses += 1
+        # Cleared again by any media dropped from the buffer while reading.
+        self.channel(channel.id).complete = True
+        async for message in channel.history(limit=self.depth):
+            self.add(message)
+
+        self.trim()
+        return self._find(channel.id, mimes, attachments)
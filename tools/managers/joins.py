@@ -0,0 +1,153 @@
+import logging
+from asyncio import Task, create_task, sleep
+from collections import deque
+from time import monotonic
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Sequence, Tuple
+
+from discord import Guild, HTTPException, Member, Role
+
+__all__: Tuple[str, ...] = ("JoinBuffer", "RoleQueue")
+
+
+class JoinBuffer:
+    """
+    Collect member joins per guild and hand them over in batches.
+
+    The first join in a guild opens a `window` second buffer, everything which
+    joins before it closes (up to `limit` members) is passed to `callback`
+    together, so a raid costs one configuration lookup per batch instead of
+    one per member.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[Guild, List[Member]], Awaitable[Any]],
+        *,
+        window: float = 2.0,
+        limit: int = 100,
+    ) -> None:
+        self.callback = callback
+        self.window: float = window
+        self.limit: int = limit
+        self.pending: Dict[int, List[Tuple[float, Member]]] = {}
+        self.tasks: Dict[int, Task] = {}
+
+        self.batches: int = 0
+        self.members: int = 0
+        self.lag: float = 0.0
+        self.max_lag: float = 0.0
+
+    @property
+    def backlog(self) -> int:
+        return sum(len(pending) for pending in self.pending.values())
+
+    @property
+    def statistics(self) -> Dict[str, float]:
+        return {
+            "backlog": self.backlog,
+            "batches": self.batches,
+            "members": self.members,
+            "average_lag": self.lag / self.members if self.members else 0.0,
+            "max_lag": self.max_lag,
+        }
+
+    def add(self, member: Member) -> None:
+        pending = self.pending.setdefault(member.guild.id, [])
+        pending.append((monotonic(), member))
+
+        if member.guild.id not in self.tasks:
+            self.tasks[member.guild.id] = create_task(self.flush(member.guild))
+
+    async def flush(self, guild: Guild) -> None:
+        try:
+            await sleep(self.window)
+            while pending := self.pending.get(guild.id):
+                batch, pending[:] = pending[: self.limit], pending[self.limit :]
+
+                now = monotonic()
+                for joined_at, _ in batch:
+                    self.lag += now - joined_at
+                    self.max_lag = max(self.max_lag, now - joined_at)
+
+                self.batches += 1
+                self.members += len(batch)
+                try:
+                    await self.callback(guild, [member for _, member in batch])
+                except Exception:
+                    logging.exception(f"Failed to process joins for {guild.id}")
+        finally:
+            self.pending.pop(guild.id, None)
+            self.tasks.pop(guild.id, None)
+
+    def cancel(self) -> None:
+        for task in self.tasks.values():
+            task.cancel()
+
+
+class RoleQueue:
+    """
+    Paced role grants per guild.
+
+    Grants are queued per guild and drained by a single worker which waits
+    `1 / rate` seconds between requests, keeping raids from exhausting the
+    REST rate limits for everything else the bot does in that guild. At the
+    default of 5 a second a 1,000 member raid is fully roled in ~3.5 minutes.
+    """
+
+    def __init__(self, *, rate: float = 5.0) -> None:
+        self.rate: float = rate
+        self.queues: Dict[int, Deque[Tuple[float, Member, Sequence[Role]]]] = {}
+        self.workers: Dict[int, Task] = {}
+
+        self.granted: int = 0
+        self.failed: int = 0
+        self.lag: float = 0.0
+        self.max_lag: float = 0.0
+
+    @property
+    def backlog(self) -> int:
+        return sum(len(queue) for queue in self.queues.values())
+
+    @property
+    def statistics(self) -> Dict[str, float]:
+        processed = self.granted + self.failed
+        return {
+            "backlog": self.backlog,
+            "granted": self.granted,
+            "failed": self.failed,
+            "average_lag": self.lag / processed if processed else 0.0,
+            "max_lag": self.max_lag,
+        }
+
+    def put(self, member: Member, roles: Sequence[Role]) -> None:
+        self.queues.setdefault(member.guild.id, deque()).append(
+            (monotonic(), member, roles)
+        )
+        if member.guild.id not in self.workers:
+            self.workers[member.guild.id] = create_task(self.drain(member.guild.id))
+
+    async def drain(self, guild_id: int) -> None:
+        queue = self.queues[guild_id]
+        try:
+            while queue:
+                queued_at, member, roles = queue.popleft()
+                try:
+                    await member.add_roles(
+                        *roles, reason="Role Assignment", atomic=False
+                    )
+                except HTTPException:
+                    self.failed += 1
+                else:
+                    self.granted += 1
+
+                lag = monotonic() - queued_at
+                self.lag += lag
+                self.max_lag = max(self.max_lag, lag)
+                await sleep(1 / self.rate)
+        finally:
+            self.queues.pop(guild_id, None)
+            self.workers.pop(guild_id, None)
+
+    def cancel(self) -> None:
+        for task in self.workers.values():
+            task.cancel()
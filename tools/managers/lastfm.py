@@ -0,0 +1,146 @@
+from asyncio import Task, TimeoutError, create_task, shield
+from collections import OrderedDict
+from copy import deepcopy
+from time import monotonic
+from typing import Any, Dict, Optional, Tuple
+
+from aiohttp import ClientError, ClientSession, ClientTimeout
+
+__all__: Tuple[str, ...] = ("LastfmClient",)
+
+Response = Tuple[int, Any]
+
+
+class LastfmClient:
+    """
+    Coalescing, caching client for the Last.fm backend.
+
+    Identical requests which are already in flight share one upstream call,
+    run in its own task so cancelling any caller leaves it to the others,
+    and successful responses of cacheable paths are kept for a few seconds
+    (now playing) or minutes (searches) keyed on the case folded payload.
+    Every caller gets its own copy of the response, so the commands are free
+    to mutate what they receive.
+    """
+
+    TTL: Dict[str, float] = {
+        "/nowplaying": 5,
+        "/artist/search": 300,
+        "/album/search": 300,
+        "/track/search": 300,
+    }
+    TIMEOUTS: Dict[str, ClientTimeout] = {
+        "/library/artists": ClientTimeout(total=300, sock_read=60),
+        "/library/albums": ClientTimeout(total=300, sock_read=60),
+        "/library/tracks": ClientTimeout(total=300, sock_read=60),
+    }
+    TIMEOUT: ClientTimeout = ClientTimeout(total=30, sock_connect=5)
+
+    def __init__(
+        self,
+        session: ClientSession,
+        *,
+        url: str,
+        token: str,
+        size: int = 10_000,
+    ) -> None:
+        self.session: ClientSession = session
+        self.url: str = url
+        self.token: str = token
+        self.size: int = size
+        self.cache: OrderedDict[Tuple, Tuple[float, Response]] = OrderedDict()
+        self.inflight: Dict[Tuple, Task] = {}
+        self.waiting: Dict[Tuple, int] = {}
+
+        self.requests: int = 0
+        self.upstream: int = 0
+        self.hits: int = 0
+        self.coalesced: int = 0
+        self.failures: int = 0
+
+    @property
+    def saved(self) -> int:
+        return self.hits + self.coalesced
+
+    @property
+    def statistics(self) -> Dict[str, int]:
+        return {
+            "requests": self.requests,
+            "upstream": self.upstream,
+            "hits": self.hits,
+            "coalesced": self.coalesced,
+            "saved": self.saved,
+            "failures": self.failures,
+        }
+
+    @staticmethod
+    def key(path: str, payload: dict) -> Tuple:
+        return (
+            path,
+            *sorted(
+                (name, " ".join(value.lower().split()))
+                if isinstance(value, str)
+                else (name, str(value))
+                for name, value in payload.items()
+            ),
+        )
+
+    async def get(self, path: str, payload: dict) -> Response:
+        """Return the status and decoded body of a backend request."""
+
+        self.requests += 1
+        key = self.key(path, payload)
+
+        if cached := self.cache.get(key):
+            expires_at, response = cached
+            if expires_at > monotonic():
+                self.hits += 1
+                return deepcopy(response)
+
+            del self.cache[key]
+
+        if task := self.inflight.get(key):
+            self.coalesced += 1
+            self.waiting[key] = self.waiting.get(key, 0) + 1
+            return deepcopy(await shield(task))[0]
+
+        task = self.inflight[key] = create_task(self.load(key, path, payload))
+        # Retrieve the exception of a call whose callers were all cancelled.
+        task.add_done_callback(lambda task: task.cancelled() or task.exception())
+        response, shared = await shield(task)
+        # Waiters copy the shared response when they resume, ours only needs a
+        # copy of its own when there are any or it went into the cache.
+        return deepcopy(response) if shared else response
+
+    async def load(self, key: Tuple, path: str, payload: dict) -> Tuple[Response, bool]:
+        try:
+            response = await self.fetch(path, payload)
+        finally:
+            self.inflight.pop(key, None)
+            waiting = self.waiting.pop(key, 0)
+
+        if response[0] != 200 or not (ttl := self.TTL.get(path)):
+            return response, bool(waiting)
+
+        self.cache[key] = (monotonic() + ttl, response)
+        if len(self.cache) > self.size:
+            self.cache.popitem(last=False)
+
+        return response, True
+
+    async def fetch(self, path: str, payload: dict) -> Response:
+        self.upstream += 1
+        try:
+            response = await self.session.get(
+                self.url + path,
+                params=payload,
+                timeout=self.TIMEOUTS.get(path, self.TIMEOUT),
+                raise_for_status=False,
+                headers=dict(Authorization=self.token),
+            )
+            data: Optional[Any] = await response.json(content_type=None)
+        except (TimeoutError, ClientError, ValueError):
+            self.failures += 1
+            return 503, None
+
+        return response.status, data
@@ -0,0 +1,173 @@
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from asyncpg import Pool
+
+__all__: Tuple[str, ...] = ("Leaderboards", "Listener")
+
+
+class Listener(NamedTuple):
+    user_id: int
+    username: str
+    plays: int
+
+
+class Board:
+    __slots__ = ("listeners", "complete")
+
+    def __init__(self, listeners: List[Listener], complete: bool) -> None:
+        self.listeners: List[Listener] = listeners
+        self.complete: bool = complete
+
+
+class Leaderboards:
+    """
+    Global top listeners of Last.fm artists, albums and tracks.
+
+    The top `size` listeners of an entity are read once through the partial
+    expression indexes in schema/lastfm_library.sql, using keyset pagination
+    until enough visible users are found, and then kept up to date from now
+    playing updates. A full library sync drops the boards listing that user
+    or still below capacity, and is replayed on the rest.
+    """
+
+    TABLES: Dict[str, Tuple[str, ...]] = {
+        "artists": ("artist",),
+        "albums": ("artist", "album"),
+        "tracks": ("artist", "track"),
+    }
+
+    def __init__(self, pool: Pool, *, size: int = 100, boards: int = 5_000) -> None:
+        self.pool: Pool = pool
+        self.size: int = size
+        self.boards: int = boards
+        self.cache: OrderedDict[Tuple[str, ...], Board] = OrderedDict()
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @staticmethod
+    def key(table: str, names: Tuple[str, ...]) -> Tuple[str, ...]:
+        return (table, *(name.lower() for name in names))
+
+    async def page(
+        self,
+        table: str,
+        *names: str,
+        after: Optional[Tuple[int, int]] = None,
+        limit: int = 100,
+    ) -> List[Listener]:
+        """Return the listeners ranked after the (plays, user_id) keyset."""
+
+        columns = self.TABLES[table]
+        conditions = [
+            f"lower({column}) = ${index}" for index, column in enumerate(columns, 1)
+        ]
+        arguments = [name.lower() for name in names]
+        if after:
+            conditions.append(
+                f"(plays, user_id) < (${len(arguments) + 1}, ${len(arguments) + 2})"
+            )
+            arguments.extend(after)
+
+        return [
+            Listener(*row)
+            for row in await self.pool.fetch(
+                f"SELECT user_id, username, plays FROM lastfm_library.{table}"
+                f" WHERE plays > 0 AND {' AND '.join(conditions)}"
+                f" ORDER BY plays DESC, user_id DESC LIMIT {limit}",
+                *arguments,
+            )
+        ]
+
+    async def top(
+        self, table: str, *names: str, visible: Callable[[int], bool]
+    ) -> List[Listener]:
+        """Return the top visible listeners of an artist, album or track."""
+
+        key = self.key(table, names)
+        if board := self.cache.get(key):
+            self.hits += 1
+            self.cache.move_to_end(key)
+            return [
+                listener for listener in board.listeners if visible(listener.user_id)
+            ]
+
+        self.misses += 1
+        listeners: List[Listener] = []
+        after = None
+        complete = False
+        while len(listeners) < self.size:
+            page = await self.page(table, *names, after=after, limit=self.size)
+            listeners.extend(
+                listener for listener in page if visible(listener.user_id)
+            )
+            if len(page) < self.size:
+                complete = True
+                break
+
+            after = (page[-1].plays, page[-1].user_id)
+
+        board = self.cache[key] = Board(
+            listeners[: self.size], complete=complete and len(listeners) <= self.size
+        )
+        if len(self.cache) > self.boards:
+            self.cache.popitem(last=False)
+
+        return list(board.listeners)
+
+    def update(
+        self, table: str, user_id: int, username: str, *names: str, plays: int
+    ) -> None:
+        """Apply a listener's new play count to a cached board."""
+
+        key = self.key(table, names)
+        if not (board := self.cache.get(key)) or not plays:
+            return
+
+        listener = Listener(user_id, username, plays)
+        listeners = board.listeners
+        for index, previous in enumerate(listeners):
+            if previous.user_id != user_id:
+                continue
+
+            if plays < previous.plays and not board.complete:
+                # Someone outside of the board could outrank them now.
+                del self.cache[key]
+                return
+
+            del listeners[index]
+            break
+        else:
+            if (
+                not board.complete
+                and listeners
+                and (plays, user_id) < (listeners[-1].plays, listeners[-1].user_id)
+            ):
+                return
+
+        listeners.append(listener)
+        listeners.sort(key=lambda listener: (listener.plays, listener.user_id), reverse=True)
+        if len(listeners) > self.size:
+            del listeners[self.size :]
+            board.complete = False
+
+    def replace(
+        self, table: str, user_id: int, username: str, library: Iterable[Tuple]
+    ) -> None:
+        """Apply a user's freshly synced (*names, plays) rows of a table."""
+
+        for key in [
+            key
+            for key, board in self.cache.items()
+            if key[0] == table
+            and (
+                len(board.listeners) < self.size
+                or any(listener.user_id == user_id for listener in board.listeners)
+            )
+        ]:
+            del self.cache[key]
+
+        for *names, plays in library:
+            if plays is not None and None not in names:
+                self.update(table, user_id, username, *names, plays=plays)
@@ -0,0 +1,129 @@
+import logging
+from asyncio import Task, create_task, sleep
+from typing import Dict, Optional, Tuple
+
+from asyncpg import Pool
+
+__all__: Tuple[str, ...] = ("LibraryBuffer",)
+
+
+class LibraryBuffer:
+    """
+    Write-behind buffer for Last.fm library play counts.
+
+    Updates are keyed on the table's conflict target, so repeated plays of the
+    same artist, album or track by a user collapse into the latest count. The
+    buffer is written every `interval` seconds with one `unnest` upsert per
+    table, and callers never wait on the database. A batch the database
+    rejects is retried row by row so one bad row can't hold the table back.
+    """
+
+    QUERIES: Dict[str, str] = {
+        "artists": (
+            "INSERT INTO lastfm_library.artists (user_id, username, artist, plays)"
+            " SELECT * FROM unnest($1::BIGINT[], $2::TEXT[], $3::TEXT[], $4::BIGINT[])"
+            " ON CONFLICT (user_id, artist) DO UPDATE SET plays = EXCLUDED.plays"
+        ),
+        "albums": (
+            "INSERT INTO lastfm_library.albums (user_id, username, artist, album, plays)"
+            " SELECT * FROM unnest($1::BIGINT[], $2::TEXT[], $3::TEXT[], $4::TEXT[], $5::BIGINT[])"
+            " ON CONFLICT (user_id, artist, album) DO UPDATE SET plays = EXCLUDED.plays"
+        ),
+        "tracks": (
+            "INSERT INTO lastfm_library.tracks (user_id, username, artist, track, plays)"
+            " SELECT * FROM unnest($1::BIGINT[], $2::TEXT[], $3::TEXT[], $4::TEXT[], $5::BIGINT[])"
+            " ON CONFLICT (user_id, artist, track) DO UPDATE SET plays = EXCLUDED.plays"
+        ),
+    }
+
+    def __init__(self, pool: Pool, *, interval: float = 5.0) -> None:
+        self.pool: Pool = pool
+        self.interval: float = interval
+        self.pending: Dict[str, Dict[Tuple, Tuple]] = {
+            table: {} for table in self.QUERIES
+        }
+        self.task: Optional[Task] = None
+
+        self.updates: int = 0
+        self.written: int = 0
+        self.flushes: int = 0
+        self.dropped: int = 0
+
+    @property
+    def backlog(self) -> int:
+        return sum(len(pending) for pending in self.pending.values())
+
+    @property
+    def statistics(self) -> Dict[str, int]:
+        return {
+            "backlog": self.backlog,
+            "updates": self.updates,
+            "written": self.written,
+            "coalesced": self.updates - self.written - self.dropped - self.backlog,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+        }
+
+    def add(self, table: str, user_id: int, username: str, *keys: str, plays: int) -> None:
+        """Queue the play count of an artist, album or track."""
+
+        if plays is None or any(key is None for key in keys):
+            return
+
+        self.pending[table][(user_id, *keys)] = (user_id, username, *keys, plays)
+        self.updates += 1
+        if not self.task:
+            self.task = create_task(self.schedule())
+
+    async def schedule(self) -> None:
+        try:
+            await sleep(self.interval)
+        finally:
+            self.task = None
+
+        await self.flush()
+
+    async def flush(self) -> None:
+        for table, query in self.QUERIES.items():
+            if not (pending := self.pending[table]):
+                continue
+
+            self.pending[table] = {}
+            try:
+                await self.pool.execute(query, *map(list, zip(*pending.values())))
+            except Exception:
+                logging.exception(
+                    f"Failed to write {len(pending)} library {table}, retrying row by row"
+                )
+                await self.split(table, query, pending)
+                continue
+
+            self.written += len(pending)
+
+        self.flushes += 1
+        if self.backlog and not self.task:
+            self.task = create_task(self.schedule())
+
+    async def split(self, table: str, query: str, pending: Dict[Tuple, Tuple]) -> None:
+        """Write a failed batch one row at a time, dropping the rows that fail."""
+
+        for row in pending.values():
+            try:
+                await self.pool.execute(query, *([value] for value in row))
+            except Exception as exc:
+                self.dropped += 1
+                logging.warning(f"Dropped library {table} row {row!r}: {exc}")
+                continue
+
+            self.written += 1
+
+    async def close(self) -> None:
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+        await self.flush()
+        if self.task:
+            # Nothing is left to wait for once the final flush is done.
+            self.task.cancel()
+            self.task = None
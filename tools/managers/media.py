@@ -0,0 +1,162 @@
+from asyncio import Semaphore, TimeoutError, wait_for
+from tempfile import SpooledTemporaryFile
+from time import monotonic
+from typing import Dict, Optional
+from weakref import WeakValueDictionary
+
+from aiohttp import ClientError, ClientTimeout
+from discord import File
+from discord.ext.commands import CommandError
+from yarl import URL
+
+from .network import ClientSession
+
+CHUNK_SIZE = 64 * 1024
+
+
+class MediaTooLarge(CommandError):
+    def __init__(self, size: Optional[int], limit: int) -> None:
+        self.size: Optional[int] = size
+        self.limit: int = limit
+        super().__init__(
+            f"The **media** is too large to be uploaded (`max {limit // 1024 // 1024}MB`)"
+        )
+
+
+class MediaFetcher:
+    """
+    Size-aware streaming downloads for reposted media.
+
+    Every download is bounded by a global and a per-guild semaphore, checked
+    against the upload limit before any body is read and streamed into a
+    spooled buffer which spills to disk past `memory_threshold` bytes.
+    """
+
+    def __init__(
+        self,
+        session: ClientSession,
+        *,
+        concurrency: int = 8,
+        guild_concurrency: int = 2,
+        memory_threshold: int = 8 * 1024 * 1024,
+    ) -> None:
+        self.session: ClientSession = session
+        self.semaphore: Semaphore = Semaphore(concurrency)
+        self.guild_concurrency: int = guild_concurrency
+        self.guild_semaphores: WeakValueDictionary[
+            int, Semaphore
+        ] = WeakValueDictionary()
+        self.memory_threshold: int = memory_threshold
+
+        self.in_flight: int = 0
+        self.in_flight_bytes: int = 0
+        self.downloads: int = 0
+        self.rejected: int = 0
+        self.failed: int = 0
+        self.total_bytes: int = 0
+        self.total_seconds: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Average bytes per second across completed downloads."""
+
+        if not self.total_seconds:
+            return 0.0
+
+        return self.total_bytes / self.total_seconds
+
+    @property
+    def statistics(self) -> Dict[str, float]:
+        return {
+            "in_flight": self.in_flight,
+            "in_flight_bytes": self.in_flight_bytes,
+            "downloads": self.downloads,
+            "rejected": self.rejected,
+            "failed": self.failed,
+            "total_bytes": self.total_bytes,
+            "throughput": self.throughput,
+        }
+
+    def guild_semaphore(self, guild_id: int) -> Semaphore:
+        if not (semaphore := self.guild_semaphores.get(guild_id)):
+            semaphore = self.guild_semaphores[guild_id] = Semaphore(
+                self.guild_concurrency
+            )
+
+        return semaphore
+
+    async def content_length(self, url: str) -> Optional[int]:
+        """Ask for the size of the media without downloading it."""
+
+        try:
+            response = await wait_for(
+                self.session.head(URL(url), allow_redirects=True), timeout=5
+            )
+        except (ClientError, TimeoutError):
+            return None
+
+        try:
+            return response.content_length
+        finally:
+            response.release()
+
+    async def fetch(
+        self, url: str, *, guild_id: int, limit: int
+    ) -> SpooledTemporaryFile:
+        """Download media into a spooled buffer, aborting past `limit` bytes."""
+
+        guild_semaphore = self.guild_semaphore(guild_id)
+        async with guild_semaphore, self.semaphore:
+            if (size := await self.content_length(url)) and size > limit:
+                self.rejected += 1
+                raise MediaTooLarge(size, limit)
+
+            buffer = SpooledTemporaryFile(max_size=self.memory_threshold)
+            received = 0
+            started = monotonic()
+            self.in_flight += 1
+
+            try:
+                async with self.session.get(
+                    URL(url), timeout=ClientTimeout(total=60, sock_read=15)
+                ) as response:
+                    if (size := response.content_length) and size > limit:
+                        self.rejected += 1
+                        raise MediaTooLarge(size, limit)
+
+                    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                        received += len(chunk)
+                        self.in_flight_bytes += len(chunk)
+                        if received > limit:
+                            self.rejected += 1
+                            raise MediaTooLarge(None, limit)
+
+                        buffer.write(chunk)
+
+            except BaseException as error:
+                buffer.close()
+                if not isinstance(error, MediaTooLarge):
+                    self.failed += 1
+
+                raise
+
+            finally:
+                self.in_flight -= 1
+                self.in_flight_bytes -= received
+
+            self.downloads += 1
+            self.total_bytes += received
+            self.total_seconds += monotonic() - started
+
+        buffer.seek(0)
+        return buffer
+
+    async def file(
+        self, url: str, filename: str, *, guild_id: int, limit: int
+    ) -> File:
+        """Download media straight into a `discord.File`."""
+
+        return File(
+            await self.fetch(url, guild_id=guild_id, limit=limit),
+            filename=filename,
+        )
@@ -0,0 +1,115 @@
+from asyncio import Semaphore, TaskGroup, gather
+from collections import deque
+from contextlib import suppress
+from time import monotonic
+from typing import Awaitable, Callable, Deque, Iterable, List, Optional, Tuple, Union
+
+from discord import HTTPException, Member, PermissionOverwrite, Role
+from discord.abc import GuildChannel
+
+__all__: Tuple[str, ...] = ("OverwriteJob",)
+
+Target = Union[Role, Member]
+Progress = Callable[[int, int], Awaitable[None]]
+
+
+class OverwriteJob:
+    """
+    Apply one permission overwrite change to many channels.
+
+    The plan is computed up front and channels which already have the desired
+    values are skipped, so planning again after an interruption resumes the
+    work. Edits run on a few concurrent workers (each channel is its own rate
+    limit route) and the previous overwrite of every edited channel is kept
+    so a failed job can be rolled back.
+    """
+
+    def __init__(
+        self,
+        target: Target,
+        channels: Iterable[GuildChannel],
+        *,
+        reason: str,
+        concurrency: int = 5,
+        **changes: Optional[bool],
+    ) -> None:
+        self.target: Target = target
+        self.reason: str = reason
+        self.changes = changes
+        self.concurrency: int = concurrency
+
+        self.pending: Deque[Tuple[GuildChannel, PermissionOverwrite]] = deque(
+            (channel, overwrite)
+            for channel in channels
+            if not self.satisfied(overwrite := channel.overwrites_for(target))
+        )
+        self.total: int = len(self.pending)
+        self.applied: List[Tuple[GuildChannel, PermissionOverwrite]] = []
+        self.failed: List[GuildChannel] = []
+
+    def satisfied(self, overwrite: PermissionOverwrite) -> bool:
+        return all(
+            getattr(overwrite, permission) is value
+            for permission, value in self.changes.items()
+        )
+
+    async def apply(self, channel: GuildChannel, before: PermissionOverwrite) -> None:
+        overwrite = PermissionOverwrite.from_pair(*before.pair())
+        overwrite.update(**self.changes)
+
+        try:
+            await channel.set_permissions(
+                self.target, overwrite=overwrite, reason=self.reason
+            )
+        except HTTPException:
+            self.failed.append(channel)
+        else:
+            self.applied.append((channel, before))
+
+    async def run(
+        self, progress: Optional[Progress] = None, interval: float = 2.0
+    ) -> None:
+        """Apply the remaining channels, reporting progress every `interval` seconds."""
+
+        reported = monotonic()
+
+        async def worker() -> None:
+            nonlocal reported
+            while self.pending:
+                channel, before = self.pending.popleft()
+                try:
+                    await self.apply(channel, before)
+                except BaseException:
+                    self.pending.appendleft((channel, before))
+                    raise
+
+                if progress and monotonic() - reported >= interval:
+                    reported = monotonic()
+                    with suppress(HTTPException):
+                        await progress(
+                            len(self.applied) + len(self.failed), self.total
+                        )
+
+        async with TaskGroup() as group:
+            for _ in range(self.concurrency):
+                group.create_task(worker())
+
+    async def rollback(self) -> None:
+        """Restore the previous overwrite of every applied channel."""
+
+        semaphore = Semaphore(self.concurrency)
+
+        async def restore(channel: GuildChannel, before: PermissionOverwrite):
+            async with semaphore:
+                try:
+                    await channel.set_permissions(
+                        self.target,
+                        overwrite=None if before.is_empty() else before,
+                        reason=f"{self.reason} (rollback)",
+                    )
+                except HTTPException:
+                    pass
+
+        applied, self.applied = self.applied, []
+        self.pending.clear()
+        await gather(*(restore(channel, before) for channel, before in applied))
@@ -0,0 +1,123 @@
+from collections import OrderedDict
+from time import monotonic
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from discord import Member, TextChannel, User
+
+if TYPE_CHECKING:
+    from tools.lain import lain
+
+
+__all__: Tuple[str, ...] = ("ReskinResolver",)
+
+SUPPORT_GUILD_ID: int = 1119909593234034690
+
+
+class ReskinResolver:
+    """
+    Resolve the reskin used for replies in a channel.
+
+    Results (including the empty ones) are kept per (guild, channel, author)
+    until a reskin, donator or config write invalidates them, so sending a
+    reply doesn't touch Postgres for styling. Entries also expire after
+    `ttl` seconds to pick up support server membership changes.
+    """
+
+    def __init__(self, bot: "lain", *, size: int = 50_000, ttl: float = 600) -> None:
+        self.bot: "lain" = bot
+        self.size: int = size
+        self.ttl: float = ttl
+        self.cache: OrderedDict[Tuple[int, int, int], Tuple[float, Dict]] = OrderedDict()
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        if not (total := self.hits + self.misses):
+            return 0.0
+
+        return self.hits / total
+
+    def invalidate(
+        self,
+        *,
+        guild_id: Optional[int] = None,
+        channel_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+    ) -> None:
+        """Drop every cached resolution matching the given ids."""
+
+        if guild_id is None and channel_id is None and user_id is None:
+            self.cache.clear()
+            return
+
+        for key in [
+            key
+            for key in self.cache
+            if (guild_id is None or key[0] == guild_id)
+            and (channel_id is None or key[1] == channel_id)
+            and (user_id is None or key[2] == user_id)
+        ]:
+            del self.cache[key]
+
+    def is_donator(self, user_id: int) -> bool:
+        guild = self.bot.get_guild(SUPPORT_GUILD_ID)
+        if not guild or not guild.get_member(user_id):
+            return False
+
+        return self.bot.entitlements.is_donator(user_id)
+
+    async def resolve(self, channel: TextChannel, author: Member | User) -> Dict:
+        if not getattr(channel, "guild", None):
+            return {}
+
+        key = (channel.guild.id, channel.id, author.id)
+        if cached := self.cache.get(key):
+            expires_at, reskin = cached
+            if expires_at > monotonic():
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return reskin
+
+        self.misses += 1
+        reskin = await self._resolve(channel, author)
+
+        self.cache[key] = (monotonic() + self.ttl, reskin)
+        self.cache.move_to_end(key)
+        if len(self.cache) > self.size:
+            self.cache.popitem(last=False)
+
+        return reskin
+
+    async def _resolve(self, channel: TextChannel, author: Member | User) -> Dict:
+        if not self.is_donator(author.id):
+            return {}
+
+        configuration = await self.bot.fetch_config(channel.guild.id, "reskin") or {}
+        if not configuration.get("status"):
+            return {}
+
+        if not (webhook_id := configuration.get("webhooks", {}).get(str(channel.id))):
+            return {}
+
+        reskin = await self.bot.db.fetchrow(
+            "SELECT username, avatar_url, colors, emojis FROM reskin WHERE user_id = $1",
+            author.id,
+        )
+        if not reskin or not (reskin.get("username") or reskin.get("avatar_url")):
+            return {}
+
+        webhook = await channel.reskin_webhook(webhook_id)
+        if not webhook:
+            del configuration["webhooks"][str(channel.id)]
+            await self.bot.update_config(channel.guild.id, "reskin", configuration)
+            return {}
+
+        return {
+            "username": reskin.get("username") or self.bot.user.name,
+            "avatar_url": reskin.get("avatar_url") or self.bot.user.display_avatar.url,
+            "colors": reskin.get("colors") or {},
+            "emojis": reskin.get("emojis") or {},
+            "webhook": webhook,
+        }
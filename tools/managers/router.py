@@ -0,0 +1,201 @@
+import logging
+from bisect import bisect_left
+from collections import OrderedDict
+from time import monotonic
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Coroutine,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Pattern,
+    Tuple,
+)
+
+from yarl import URL
+
+if TYPE_CHECKING:
+    from re import Match
+
+    from tools.managers.context import Context
+
+
+__all__: Tuple[str, ...] = ("RepostRouter", "route")
+
+LATENCY_BUCKETS: Tuple[float, ...] = (0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def route(service: str, *, hosts: Iterable[str], patterns: Iterable[Pattern]):
+    """Mark a cog method as the repost handler for a service."""
+
+    def decorator(func: Callable[..., Coroutine[Any, Any, Any]]):
+        func.__repost_route__ = (service, tuple(hosts), tuple(patterns))
+        return func
+
+    return decorator
+
+
+class ServiceStatistics:
+    __slots__ = ("calls", "errors", "hits", "misses", "latency")
+
+    def __init__(self) -> None:
+        self.calls: int = 0
+        self.errors: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.latency: List[int] = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    @property
+    def hit_rate(self) -> float:
+        if not (total := self.hits + self.misses):
+            return 0.0
+
+        return self.hits / total
+
+    def observe(self, seconds: float) -> None:
+        self.latency[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "hit_rate": self.hit_rate,
+            "latency": dict(
+                zip(
+                    [f"<={bucket}s" for bucket in LATENCY_BUCKETS] + ["+Inf"],
+                    self.latency,
+                )
+            ),
+        }
+
+
+class Route:
+    __slots__ = ("service", "patterns", "handler")
+
+    def __init__(
+        self,
+        service: str,
+        patterns: Tuple[Pattern, ...],
+        handler: Callable[["Context", "Match"], Coroutine[Any, Any, Any]],
+    ) -> None:
+        self.service: str = service
+        self.patterns: Tuple[Pattern, ...] = patterns
+        self.handler = handler
+
+    def match(self, url: str) -> Optional["Match"]:
+        for pattern in self.patterns:
+            if match := pattern.match(url):
+                return match
+
+        return None
+
+
+class RepostRouter:
+    """
+    Classify a reposted URL once and invoke only the matching service.
+
+    The host is resolved through a lookup table, only that service's
+    patterns are tried and the result is kept in a small LRU so the same
+    link posted again skips the regex work entirely.
+    """
+
+    def __init__(self, cache_size: int = 1024) -> None:
+        self.hosts: Dict[str, Route] = {}
+        self.routes: Dict[str, Route] = {}
+        self.statistics: Dict[str, ServiceStatistics] = {}
+        self.cache: OrderedDict[str, Tuple[Route, "Match"]] = OrderedDict()
+        self.cache_size: int = cache_size
+
+    def register(
+        self,
+        service: str,
+        hosts: Iterable[str],
+        patterns: Iterable[Pattern],
+        handler: Callable[["Context", "Match"], Coroutine[Any, Any, Any]],
+    ) -> None:
+        self.routes[service] = _route = Route(service, tuple(patterns), handler)
+        for host in hosts:
+            self.hosts[host.lower()] = _route
+
+        self.statistics.setdefault(service, ServiceStatistics())
+        self.cache.clear()
+
+    def unregister(self, service: str) -> None:
+        if not (_route := self.routes.pop(service, None)):
+            return
+
+        for host, value in list(self.hosts.items()):
+            if value is _route:
+                del self.hosts[host]
+
+        self.cache.clear()
+
+    def add_cog(self, cog: object) -> None:
+        for name in dir(type(cog)):
+            func = getattr(type(cog), name, None)
+            if spec := getattr(func, "__repost_route__", None):
+                service, hosts, patterns = spec
+                self.register(service, hosts, patterns, getattr(cog, name))
+
+    def remove_cog(self, cog: object) -> None:
+        for name in dir(type(cog)):
+            func = getattr(type(cog), name, None)
+            if spec := getattr(func, "__repost_route__", None):
+                self.unregister(spec[0])
+
+    def resolve_host(self, url: str) -> Optional[Route]:
+        try:
+            host = URL(url).host
+        except ValueError:
+            return None
+
+        if not host:
+            return None
+
+        host = host.lower()
+        while host:
+            if _route := self.hosts.get(host):
+                return _route
+
+            host = host.partition(".")[2]
+
+        return None
+
+    def classify(self, url: str) -> Optional[Tuple[Route, "Match"]]:
+        if cached := self.cache.get(url):
+            self.cache.move_to_end(url)
+            self.statistics[cached[0].service].hits += 1
+            return cached
+
+        if not (_route := self.resolve_host(url)):
+            return None
+
+        self.statistics[_route.service].misses += 1
+        if not (match := _route.match(url)):
+            return None
+
+        self.cache[url] = (_route, match)
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+        return _route, match
+
+    async def dispatch(self, ctx: "Context", url: str) -> None:
+        if not (result := self.classify(url)):
+            return
+
+        _route, match = result
+        statistics = self.statistics[_route.service]
+        statistics.calls += 1
+
+        started = monotonic()
+        try:
+            await _route.handler(ctx, match)
+        except Exception:
+            statistics.errors += 1
+            logging.exception(f"Repost handler {_route.service} failed for {url}")
+        finally:
+            statistics.observe(monotonic() - started)
@@ -0,0 +1,188 @@
+from bisect import bisect_left
+from collections import OrderedDict
+from time import time
+from typing import Dict, Generic, Iterator, List, Optional, Tuple, TypeVar
+
+from .cache import cache
+
+__all__: Tuple[str, ...] = ("SnipeStore", "Snipe", "ReactionSnipe")
+
+T = TypeVar("T", "Snipe", "ReactionSnipe")
+
+
+class Snipe:
+    """A deleted or edited message."""
+
+    __slots__ = ("author_name", "avatar_url", "content", "attachment_url", "timestamp")
+
+    def __init__(
+        self,
+        author_name: str,
+        avatar_url: str,
+        content: str,
+        attachment_url: Optional[str],
+        timestamp: float,
+    ) -> None:
+        self.author_name: str = author_name
+        self.avatar_url: str = avatar_url
+        self.content: str = content
+        self.attachment_url: Optional[str] = attachment_url
+        self.timestamp: float = timestamp
+
+    def to_tuple(self) -> Tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+
+class ReactionSnipe:
+    """A removed reaction."""
+
+    __slots__ = ("message_id", "user", "emoji", "timestamp")
+
+    def __init__(self, message_id: int, user: str, emoji: str, timestamp: float) -> None:
+        self.message_id: int = message_id
+        self.user: str = user
+        self.emoji: str = emoji
+        self.timestamp: float = timestamp
+
+    def to_tuple(self) -> Tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+
+class Ring(Generic[T]):
+    """A fixed-capacity ring buffer indexed newest first."""
+
+    __slots__ = ("items", "head", "count")
+
+    def __init__(self, capacity: int) -> None:
+        self.items: List[Optional[T]] = [None] * capacity
+        self.head: int = 0
+        self.count: int = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> T:
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+
+        return self.items[(self.head - 1 - index) % len(self.items)]
+
+    def __iter__(self) -> Iterator[T]:
+        for index in range(self.count):
+            yield self[index]
+
+    def push(self, item: T) -> None:
+        self.items[self.head] = item
+        self.head = (self.head + 1) % len(self.items)
+        self.count = min(self.count + 1, len(self.items))
+
+    def alive(self, ttl: float) -> int:
+        """Return how many of the newest entries are younger than `ttl` seconds."""
+
+        # Timestamps only grow, so expired entries form the tail of the view.
+        cutoff = time() - ttl
+        return bisect_left(
+            range(self.count), True, key=lambda index: self[index].timestamp < cutoff
+        )
+
+
+class SnipeStore:
+    """
+    Deleted messages, edits and removed reactions per channel.
+
+    Each channel holds a ring buffer of at most `capacity` records per kind and
+    each guild keeps at most `channels` buffers, evicting the least recently
+    written one. With `persist` every write is mirrored to the shared cache
+    so another process (or a restart) can pick the buffers back up, this
+    re-serializes the buffer on every write so it is off by default.
+    """
+
+    TTL: Dict[str, int] = {
+        "messages": 7200,
+        "edits": 7200,
+        "reactions": 300,
+    }
+    RECORDS = {
+        "messages": Snipe,
+        "edits": Snipe,
+        "reactions": ReactionSnipe,
+    }
+
+    def __init__(
+        self, *, capacity: int = 50, channels: int = 100, persist: bool = False
+    ) -> None:
+        self.capacity: int = capacity
+        self.channels: int = channels
+        self.persist: bool = persist
+        self.guilds: Dict[int, OrderedDict[Tuple[str, int], Ring]] = {}
+
+    @staticmethod
+    def key(guild_id: int, kind: str, channel_id: int) -> str:
+        return f"snipes:{guild_id}:{kind}:{channel_id}"
+
+    async def push(
+        self, guild_id: int, kind: str, channel_id: int, record: T
+    ) -> None:
+        ring = await self.ring(guild_id, kind, channel_id, create=True)
+        ring.push(record)
+
+        buffers = self.guilds[guild_id]
+        buffers.move_to_end((kind, channel_id))
+        while len(buffers) > self.channels:
+            buffers.popitem(last=False)
+
+        if self.persist:
+            await cache.set(
+                self.key(guild_id, kind, channel_id),
+                [item.to_tuple() for item in reversed(list(ring))],
+                expire=self.TTL[kind],
+            )
+
+    async def ring(
+        self, guild_id: int, kind: str, channel_id: int, *, create: bool = False
+    ) -> Optional[Ring]:
+        buffers = self.guilds.get(guild_id)
+        if buffers and (ring := buffers.get((kind, channel_id))) is not None:
+            return ring
+
+        records = None
+        if self.persist:
+            records = await cache.get(self.key(guild_id, kind, channel_id))
+            if not isinstance(records, list):
+                records = None
+
+        if not records and not create:
+            return None
+
+        ring = Ring(self.capacity)
+        record_type = self.RECORDS[kind]
+        for record in records or ():
+            # Skip anything written by an older layout of the buffers.
+            if isinstance(record, (list, tuple)) and len(record) == len(
+                record_type.__slots__
+            ):
+                ring.push(record_type(*record))
+
+        self.guilds.setdefault(guild_id, OrderedDict())[(kind, channel_id)] = ring
+        return ring
+
+    async def view(
+        self, guild_id: int, kind: str, channel_id: int
+    ) -> Tuple[Optional[Ring], int]:
+        """Return the channel buffer and how many of its records haven't expired."""
+
+        if (ring := await self.ring(guild_id, kind, channel_id)) is None:
+            return None, 0
+
+        return ring, ring.alive(self.TTL[kind])
+
+    async def get(self, guild_id: int, kind: str, channel_id: int) -> List[T]:
+        """Return the unexpired records of a channel, newest first."""
+
+        ring, count = await self.view(guild_id, kind, channel_id)
+        return [ring[index] for index in range(count)]
+
+    async def clear(self, guild_id: int) -> None:
+        self.guilds.pop(guild_id, None)
+        if self.persist:
+            await cache.delete_match(f"snipes:{guild_id}:*")
@@ -0,0 +1,85 @@
+from math import sqrt
+from typing import Iterable, List, Mapping, NamedTuple, Tuple
+
+__all__: Tuple[str, ...] = ("Taste", "Mutual")
+
+
+class Mutual(NamedTuple):
+    artist: str
+    plays: int
+    target_plays: int
+
+    @property
+    def delta(self) -> int:
+        return self.plays - self.target_plays
+
+
+class Taste:
+    """
+    The overlap between two Last.fm artist libraries.
+
+    Libraries are joined on the lowercased artist name through a dictionary,
+    so a comparison is linear in the size of both libraries. The mutual
+    artists, play deltas and both similarity scores come out of that one
+    pass, and `scores` derives them from SQL aggregates for server rankings.
+    """
+
+    __slots__ = ("mutual", "artists", "target_artists", "cosine", "jaccard")
+
+    def __init__(
+        self,
+        mutual: List[Mutual],
+        artists: int,
+        target_artists: int,
+        cosine: float,
+        jaccard: float,
+    ) -> None:
+        self.mutual: List[Mutual] = mutual
+        self.artists: int = artists
+        self.target_artists: int = target_artists
+        self.cosine: float = cosine
+        self.jaccard: float = jaccard
+
+    @staticmethod
+    def scores(
+        mutual: int,
+        artists: int,
+        target_artists: int,
+        dot: float,
+        norm: float,
+        target_norm: float,
+    ) -> Tuple[float, float]:
+        """Return the cosine and jaccard similarity of two libraries."""
+
+        union = artists + target_artists - mutual
+        return (
+            dot / (norm * target_norm) if norm and target_norm else 0.0,
+            mutual / union if union else 0.0,
+        )
+
+    @classmethod
+    def compare(
+        cls,
+        library: Iterable[Mapping],
+        target_library: Iterable[Mapping],
+    ) -> "Taste":
+        """Compare two sets of `lastfm_library.artists` rows."""
+
+        plays = {row["artist"].lower(): row["plays"] for row in target_library}
+
+        mutual: List[Mutual] = []
+        artists = dot = norm = 0
+        for row in library:
+            artists += 1
+            norm += row["plays"] ** 2
+            target_plays = plays.get(row["artist"].lower())
+            if target_plays is not None:
+                mutual.append(Mutual(row["artist"], row["plays"], target_plays))
+                dot += row["plays"] * target_plays
+
+        mutual.sort(key=lambda artist: artist.plays, reverse=True)
+        target_norm = sum(value**2 for value in plays.values())
+        cosine, jaccard = cls.scores(
+            len(mutual), artists, len(plays), dot, sqrt(norm), sqrt(target_norm)
+        )
+        return cls(mutual, artists, len(plays), cosine, jaccard)
@@ -0,0 +1,170 @@
+import json
+import os
+from time import monotonic
+from typing import Any, Dict, Optional, Tuple
+
+SEED: str = os.path.join(os.path.dirname(__file__), "aliases.json")
+# Anchored to the repository, the bot and the web service run from different directories.
+PATH: str = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "cache", "aliases.json")
+)
+
+
+class ArtistAliases:
+    """
+    Canonical artist names keyed on the case folded spelling Last.fm returns.
+
+    The tracked seed table is overlaid by runtime edits kept in a data file
+    shared by the bot and the web service, where a null drops a seeded alias.
+    Lookups reload them at most every `interval` seconds when either file
+    has changed, so edits (from either process) apply without a deploy.
+    """
+
+    # Fields holding the name of an artist object, depending on the method.
+    KEYS = ("name", "#text")
+
+    def __init__(
+        self, path: str = PATH, *, seed: str = SEED, interval: float = 30
+    ) -> None:
+        self.path: str = path
+        self.seed: str = seed
+        self.interval: float = interval
+        self.aliases: Dict[str, str] = {}
+        self.modified: Optional[Tuple[float, float]] = None
+        self.checked: float = 0.0
+
+    def reload(self, force: bool = False) -> None:
+        if not force and monotonic() - self.checked < self.interval:
+            return
+
+        self.checked = monotonic()
+        modified = (self.mtime(self.seed), self.mtime(self.path))
+        if not force and modified == self.modified:
+            return
+
+        try:
+            aliases = self.read()
+        except ValueError:
+            # Keep serving the previous table until the file is fixed.
+            return
+
+        self.aliases = {source.casefold(): output for source, output in aliases.items()}
+        self.modified = modified
+
+    @staticmethod
+    def mtime(path: str) -> float:
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return 0.0
+
+    def get(self, name: str) -> str:
+        """Return the canonical spelling of an artist."""
+
+        self.reload()
+        return self.aliases.get(name.casefold(), name)
+
+    def apply(self, data: Any) -> Any:
+        """Normalize every artist field of a Last.fm payload in place."""
+
+        self.reload()
+        if self.aliases:
+            self._walk(data)
+
+        return data
+
+    def _walk(self, data: Any) -> None:
+        if isinstance(data, dict):
+            for key, value in data.items():
+                if key == "artist":
+                    if isinstance(value, str):
+                        data[key] = value = self.aliases.get(value.casefold(), value)
+                    else:
+                        # A single artist object or a list of them.
+                        for artist in value if isinstance(value, list) else (value,):
+                            self._rename(artist)
+
+                if isinstance(value, (dict, list)):
+                    self._walk(value)
+
+        elif isinstance(data, list):
+            for value in data:
+                if isinstance(value, (dict, list)):
+                    self._walk(value)
+
+    @staticmethod
+    def load(path: str, *, overrides: bool = False) -> Dict[str, Optional[str]]:
+        try:
+            with open(path, encoding="utf-8") as file:
+                aliases = json.load(file)
+        except FileNotFoundError:
+            return {}
+
+        if not isinstance(aliases, dict) or not all(
+            isinstance(output, str) or (overrides and output is None)
+            for output in aliases.values()
+        ):
+            raise ValueError(f"{path} isn't a table of artist aliases")
+
+        return aliases
+
+    def overrides(self) -> Dict[str, Optional[str]]:
+        return self.load(self.path, overrides=True)
+
+    def _rename(self, artist: Any) -> None:
+        if not isinstance(artist, dict):
+            return
+
+        for key in self.KEYS:
+            if isinstance(name := artist.get(key), str):
+                artist[key] = self.aliases.get(name.casefold(), name)
+
+    def read(self) -> Dict[str, str]:
+        """Return the seed table with the runtime edits applied."""
+
+        aliases = {
+            source.casefold(): (source, output)
+            for source, output in self.load(self.seed).items()
+        }
+        for source, output in self.overrides().items():
+            if output is None:
+                aliases.pop(source.casefold(), None)
+            else:
+                aliases[source.casefold()] = (source, output)
+
+        return dict(aliases.values())
+
+    def write(self, overrides: Dict[str, Optional[str]]) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(overrides, file, indent=4, ensure_ascii=False)
+
+        os.replace(temporary, self.path)
+        self.reload(force=True)
+
+    def add(self, source: str, output: str) -> None:
+        overrides = {
+            key: value
+            for key, value in self.overrides().items()
+            if key.casefold() != source.casefold()
+        }
+        overrides[source] = output
+        self.write(overrides)
+
+    def remove(self, source: str) -> bool:
+        if source.casefold() not in map(str.casefold, self.read()):
+            return False
+
+        overrides = {
+            key: value
+            for key, value in self.overrides().items()
+            if key.casefold() != source.casefold()
+        }
+        if source.casefold() in map(str.casefold, self.load(self.seed)):
+            overrides[source] = None
+
+        self.write(overrides)
+        return True
+
+artist_aliases = ArtistAliases()
@@ -0,0 +1,213 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance, a metric so it can route a BK-tree."""
+
+    row = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        previous, row = row, [i]
+        for j, y in enumerate(b, 1):
+            row.append(min(previous[j] + 1, row[j - 1] + 1, previous[j - 1] + (x != y)))
+
+    return row[-1]
+
+
+def transposition_distance(a: str, b: str) -> int:
+    """Levenshtein distance counting an adjacent transposition as one edit."""
+
+    rows = [list(range(len(b) + 1))]
+    for i, x in enumerate(a, 1):
+        row = [i]
+        for j, y in enumerate(b, 1):
+            cost = min(rows[-1][j] + 1, row[j - 1] + 1, rows[-1][j - 1] + (x != y))
+            if i > 1 and j > 1 and x == b[j - 2] and a[i - 2] == y:
+                cost = min(cost, rows[-2][j - 2] + 1)
+
+            row.append(cost)
+
+        rows.append(row)
+
+    return rows[-1][-1]
+
+
+def parse_hash(value: str) -> Optional[int]:
+    """Convert a hex perceptual hash into an integer, ignoring random fallbacks."""
+
+    try:
+        return int(value, 16)
+    except (TypeError, ValueError):
+        return None
+
+
+class _Node:
+    __slots__ = ("hash", "children", "entries")
+
+    def __init__(self, hash: int) -> None:
+        self.hash: int = hash
+        self.children: Dict[int, "_Node"] = {}
+        self.entries: Dict[int, str] = {}
+
+
+class HashIndex:
+    """
+    A BK-tree over 64-bit perceptual hashes.
+
+    Each node holds every (user_id -> asset url) stored under that exact hash,
+    lookups walk only the children whose edge distance can still fall within
+    the requested threshold.
+    """
+
+    def __init__(self) -> None:
+        self.root: Optional[_Node] = None
+        self.nodes: Dict[int, _Node] = {}
+
+    def __len__(self) -> int:
+        return sum(len(node.entries) for node in self.nodes.values())
+
+    def add(self, hash: int, user_id: int, url: str) -> None:
+        if node := self.nodes.get(hash):
+            node.entries.setdefault(user_id, url)
+            return
+
+        node = self.nodes[hash] = _Node(hash)
+        node.entries[user_id] = url
+
+        if not self.root:
+            self.root = node
+            return
+
+        parent = self.root
+        while True:
+            distance = hamming(hash, parent.hash)
+            if not (child := parent.children.get(distance)):
+                parent.children[distance] = node
+                return
+
+            parent = child
+
+    def discard(self, user_id: int) -> None:
+        """Remove every entry for a user, empty nodes stay as routing points."""
+
+        for node in self.nodes.values():
+            node.entries.pop(user_id, None)
+
+    def search(self, hash: int, threshold: int = 4) -> Iterator[Tuple[int, _Node]]:
+        if not self.root:
+            return
+
+        stack: List[_Node] = [self.root]
+        while stack:
+            node = stack.pop()
+            distance = hamming(hash, node.hash)
+            if distance <= threshold and node.entries:
+                yield distance, node
+
+            for edge, child in node.children.items():
+                if distance - threshold <= edge <= distance + threshold:
+                    stack.append(child)
+
+    def closest(self, hash: int, threshold: int = 4) -> Optional[_Node]:
+        """Return the nearest stored asset within the threshold."""
+
+        best: Optional[Tuple[int, _Node]] = None
+        for distance, node in self.search(hash, threshold):
+            if not best or distance < best[0]:
+                best = (distance, node)
+                if not distance:
+                    break
+
+        return best[1] if best else None
+
+    def users(self, hash: int, threshold: int = 4) -> Dict[int, int]:
+        """Return every user with a near identical asset mapped to its distance."""
+
+        output: Dict[int, int] = {}
+        for distance, node in self.search(hash, threshold):
+            for user_id in node.entries:
+                if user_id not in output or distance < output[user_id]:
+                    output[user_id] = distance
+
+        return output
+
+
+class _Word:
+    __slots__ = ("word", "value", "children")
+
+    def __init__(self, word: str, value: str) -> None:
+        self.word: str = word
+        self.value: str = value
+        self.children: Dict[int, "_Word"] = {}
+
+
+class WordIndex:
+    """
+    A BK-tree over words by edit distance.
+
+    Every word maps to a value (a command name for an alias), lookups only
+    descend into children whose edge distance can still fall within the
+    threshold, so a typo is matched without comparing against every word.
+    The tree is routed by Levenshtein distance, which holds the triangle
+    inequality, and candidates are ranked by transposition distance.
+    """
+
+    def __init__(self) -> None:
+        self.root: Optional[_Word] = None
+        self.words: Dict[str, _Word] = {}
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def add(self, word: str, value: str) -> None:
+        if word in self.words:
+            return
+
+        node = self.words[word] = _Word(word, value)
+        if not self.root:
+            self.root = node
+            return
+
+        parent = self.root
+        while True:
+            distance = edit_distance(word, parent.word)
+            if not (child := parent.children.get(distance)):
+                parent.children[distance] = node
+                return
+
+            parent = child
+
+    def search(self, word: str, threshold: int) -> Iterator[_Word]:
+        """Yield every word within the Levenshtein threshold."""
+
+        if not self.root:
+            return
+
+        stack: List[_Word] = [self.root]
+        while stack:
+            node = stack.pop()
+            distance = edit_distance(word, node.word)
+            if distance <= threshold:
+                yield node
+
+            for edge, child in node.children.items():
+                if distance - threshold <= edge <= distance + threshold:
+                    stack.append(child)
+
+    def closest(self, word: str, threshold: int = 2) -> Optional[Tuple[int, str, str]]:
+        """Return the (distance, word, value) nearest to the word within the threshold."""
+
+        best: Optional[Tuple[int, str, str]] = None
+        # Every transposition costs two Levenshtein edits, so this radius
+        # covers anything within the threshold once transpositions count as one.
+        for node in self.search(word, threshold * 2):
+            distance = transposition_distance(word, node.word)
+            if distance <= threshold and (
+                not best or (distance, len(node.word)) < (best[0], len(best[1]))
+            ):
+                best = (distance, node.word, node.value)
+
+        return best
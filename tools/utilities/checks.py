@@ -24,28 +24,18 @@ def has_permissions(**permissions):
         if ctx.author.guild_permissions.administrator:
             return True
 
-        for permission in permissions:
-            missing_permissions = []
-            if not (getattr(ctx.author.guild_permissions, permission) == True):
-                missing_permissions.append(permission)
-
-            if missing_permissions:
-                fake_permissions = await ctx.bot.db.fetch(
-                    "SELECT * FROM fake_permissions WHERE guild_id = $1 AND permission = ANY($2::text[])",
-                    ctx.guild.id,
-                    missing_permissions,
-                )
-                for fake_permission in fake_permissions:
-                    if fake_permission["role_id"] in [
-                        role.id for role in ctx.author.roles
-                    ]:
-                        try:
-                            missing_permissions.remove(fake_permission["permission"])
-                        except ValueError:
-                            continue
-
-            if missing_permissions:
-                raise commands.MissingPermissions(missing_permissions)
+        missing_permissions = [
+            permission
+            for permission in permissions
+            if not getattr(ctx.author.guild_permissions, permission)
+        ]
+        if missing_permissions:
+            missing_permissions = ctx.bot.entitlements.missing(
+                ctx.author, missing_permissions
+            )
+
+        if missing_permissions:
+            raise commands.MissingPermissions(missing_permissions)
 
         return True
 
@@ -88,11 +78,7 @@ def donator(booster: bool = False):
 
             return True
 
-        donator_check = await ctx.bot.db.fetchrow(
-            "SELECT * FROM donators WHERE user_id = $1", ctx.author.id
-        )
-
-        if not user or not donator_check:
+        if not user or not ctx.bot.entitlements.is_donator(ctx.author.id):
             raise commands.CommandError(
                 f"You must be a **donator** to use `{ctx.command.qualified_name}` - [**Discord Server**](https://discord.gg/opp)"
             )
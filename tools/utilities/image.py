@@ -2,6 +2,8 @@ import asyncio, discord
 
 from io import BytesIO
 from math import sqrt
+from threading import Lock
+from typing import Literal, Optional
 
 from aiohttp import ClientSession  # circular import
 from PIL import Image
@@ -81,76 +83,148 @@ async def dominant(
         return await sample_colors(buffer)
 
 
-@async_executor()
-def _collage_open(image: BytesIO):
-    image = (
-        Image.open(image)
-        .convert("RGBA")
-        .resize(
+class _Canvas:
+    """A preallocated collage canvas which tiles are pasted into as they arrive."""
+
+    def __init__(self, count: int, size: int, columns: int = None):
+        self.count: int = count
+        self.size: int = size
+        self.fixed: Optional[int] = columns
+        self.columns: int = min(columns, count) if columns else _columns(count)
+        self.rows: int = (count + self.columns - 1) // self.columns
+        self.image: Image.Image = Image.new(
+            "RGBA",
             (
-                256,
-                256,
+                self.columns * size,
+                self.rows * size,
+            ),
+        )
+        self.filled: set[int] = set()
+        self.lock: Lock = Lock()
+
+    def position(self, index: int) -> tuple[int, int]:
+        return (
+            (index % self.columns) * self.size,
+            (index // self.columns) * self.size,
+        )
+
+    def paste(self, index: int, buffer: bytes) -> None:
+        with Image.open(BytesIO(buffer)) as tile:
+            # JPEG covers can be decoded at a reduced scale directly
+            tile.draft("RGB", (self.size, self.size))
+            tile = tile.convert("RGBA").resize(
+                (self.size, self.size),
+                resample=Image.BILINEAR,
             )
+
+        with self.lock:
+            self.image.paste(tile, self.position(index))
+            self.filled.add(index)
+
+        tile.close()
+
+    def compact(self) -> Optional[Image.Image]:
+        """Drop the slots of tiles which failed while preserving the order."""
+
+        if not self.filled:
+            return None
+
+        if len(self.filled) == self.count:
+            return self.image
+
+        canvas = _Canvas(
+            len(self.filled),
+            self.size,
+            self.fixed,
         )
-    )
-    return image
+        for new_index, index in enumerate(sorted(self.filled)):
+            x, y = self.position(index)
+            canvas.image.paste(
+                self.image.crop((x, y, x + self.size, y + self.size)),
+                canvas.position(new_index),
+            )
 
+        self.image.close()
+        return canvas.image
 
-async def _collage_read(image: str):
-    async with ClientSession() as session:
-        async with session.get(image) as response:
-            try:
-                return await _collage_open(BytesIO(await response.read()))
-            except:
-                return None
-
-
-async def _collage_paste(image: Image, x: int, y: int, background: Image):
-    background.paste(
-        image,
-        (
-            x * 256,
-            y * 256,
-        ),
-    )
 
+def _columns(count: int) -> int:
+    rows = max(int(sqrt(count)), 1)
+    return (count + rows - 1) // rows
 
-async def collage(images: list[str]):
-    tasks = list()
-    for image in images:
-        tasks.append(_collage_read(image))
 
-    images = [image for image in await asyncio.gather(*tasks) if image]
-    if not images:
-        return None
+@async_executor()
+def _collage_paste(canvas: _Canvas, index: int, buffer: bytes) -> None:
+    try:
+        canvas.paste(index, buffer)
+    except Exception:
+        return
 
-    rows = int(sqrt(len(images)))
-    columns = (len(images) + rows - 1) // rows
 
-    background = Image.new(
-        "RGBA",
-        (
-            columns * 256,
-            rows * 256,
-        ),
-    )
-    tasks = list()
-    for i, image in enumerate(images):
-        tasks.append(_collage_paste(image, i % columns, i // columns, background))
-    await asyncio.gather(*tasks)
+@async_executor()
+def _collage_save(canvas: _Canvas, format: str, quality: int) -> Optional[BytesIO]:
+    image = canvas.compact()
+    if not image:
+        return None
+
+    if format == "jpeg":
+        background = Image.new("RGB", image.size, (0, 0, 0))
+        background.paste(image, mask=image.split()[3])
+        image.close()
+        image = background
 
     buffer = BytesIO()
-    background.save(
-        buffer,
-        format="png",
-    )
+    if format == "png":
+        image.save(buffer, format="png", optimize=False)
+    else:
+        image.save(buffer, format=format, quality=quality, method=4)
     buffer.seek(0)
 
-    background.close()
-    for image in images:
-        image.close()
+    image.close()
+    return buffer
+
+
+async def collage(
+    session: ClientSession,
+    images: list[str],
+    *,
+    columns: int = None,
+    size: int = 256,
+    format: Literal["png", "webp", "jpeg"] = "png",
+    quality: int = 80,
+    concurrency: int = 8,
+) -> Optional[discord.File]:
+    """
+    Build a collage from a list of image URLs.
+
+    Downloads are bounded by a semaphore and reuse the given session, each
+    tile is decoded and pasted into a preallocated canvas in the executor as
+    soon as it arrives, so only the canvas is held in memory.
+    """
+
+    if not images:
+        return None
+
+    canvas = _Canvas(len(images), size, columns)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def read(index: int, url: str) -> None:
+        async with semaphore:
+            try:
+                async with session.get(URL(url)) as response:
+                    buffer = await response.read()
+            except Exception:
+                return
+
+        await _collage_paste(canvas, index, buffer)
+
+    await asyncio.gather(*[read(index, url) for index, url in enumerate(images)])
+
+    buffer = await _collage_save(canvas, format, quality)
+    if not buffer:
+        return None
 
     return discord.File(
         buffer,
-        filename="collage.png",
+        filename=f"collage.{format}",
     )
@@ -49,14 +49,6 @@ def shorten(value: str, length: int = 20) -> str:
     return value
 
 
-def replace_artist(text: str, source: str, output: str):
-    return (
-        text.replace(f'"artist": "{source}"', f'"artist": "{output}"')
-        .replace(f'"name": "{source}"', f'"name": "{output}"')
-        .replace(f'"#text": "{source}"', f'"#text": "{output}"')
-    )
-
-
 def human_join(seq: Sequence[str], delim: str = ", ", final: str = "or") -> str:
     size = len(seq)
     if size == 0:
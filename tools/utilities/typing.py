@@ -13,7 +13,6 @@ from discord.ext.commands import Command, Context, Bot
 
 from tools.managers.cache import cache
 
-from .checks import donator
 
 
 def _typing_done_callback(fut: Future) -> None:
@@ -35,22 +34,7 @@ class Typing:
         self.channel: TextChannel = ctx.channel
 
     async def is_reskin(self) -> bool:
-        try:
-            await donator().predicate(self)
-        except:
-            pass
-        else:
-            configuration = await self.bot.fetch_config(self.guild.id, "reskin") or {}
-            if configuration.get("status"):
-                if configuration["webhooks"].get(str(self.channel.id)):
-                    reskin = await self.bot.db.fetchrow(
-                        "SELECT username, avatar_url FROM reskin WHERE user_id = $1",
-                        self.author.id,
-                    )
-                    if reskin and (reskin["username"] or reskin["avatar_url"]):
-                        return True
-
-        return False
+        return bool(await self.bot.reskin.resolve(self.channel, self.author))
 
     async def wrapped_typer(self) -> None:
         # if await self.is_reskin():
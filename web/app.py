@@ -3,11 +3,14 @@ import sys
 sys.path.append("/home/vampire/lain/")
 
 import asyncio
+import json
+import time
 from random import randint
 from os import listdir
 
 from discord.ext.ipc import Client
-from quart import Quart, jsonify, render_template, request
+from quart import Quart, jsonify, make_response, render_template, request
+from xxhash import xxh64_hexdigest
 
 _IPC = Client(
     secret_key="lain",
@@ -20,27 +23,67 @@ app = Quart(
 )
 app.config["SERVER_NAME"] = "lains.life"
 
+# Rendered pages keyed by path: (expires at, etag, body)
+PAGES = {}
+PAGES_LIMIT = 5000
+
+
+async def cached(key: str, ttl: int, render):
+    """Serve a rendered page from memory, answering matching ETags with a 304."""
+
+    now = time.monotonic()
+    if not (page := PAGES.get(key)) or page[0] < now:
+        etag, body = await render()
+        page = PAGES[key] = (now + ttl, etag, body)
+        if len(PAGES) > PAGES_LIMIT:
+            for expired in [name for name, value in PAGES.items() if value[0] < now]:
+                del PAGES[expired]
+
+            while len(PAGES) > PAGES_LIMIT:
+                del PAGES[next(iter(PAGES))]
+
+    _, etag, body = page
+    if request.if_none_match.contains(etag):
+        response = await make_response("", 304)
+    else:
+        response = await make_response(body)
+
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = ttl
+    return response
+
 
 @app.route("/commands")
 @app.route("/help")
 @app.route("/cmds")
 async def commands():
-    data = await _IPC.request("commands")
-    return await render_template(
-        "commands.html", bot=data.response["bot"], commands=data.response["commands"]
-    )
+    async def render():
+        data = await _IPC.request("commands")
+        return data.response["version"], await render_template(
+            "commands.html",
+            bot=data.response["bot"],
+            commands=data.response["commands"],
+        )
+
+    return await cached("commands", 300, render)
 
 
 @app.route("/avatars/<int:user_id>")
 async def avatars(user_id):
-    data = await _IPC.request("avatars", user_id=user_id)
-    if error := data.response.get("error"):
-        raise ValueError(error)
-
-    return await render_template(
-        "avatars.html",
-        data=data.response,
-    )
+    async def render():
+        data = await _IPC.request("avatars", user_id=user_id)
+        if error := data.response.get("error"):
+            raise ValueError(error)
+
+        return xxh64_hexdigest(json.dumps(data.response, sort_keys=True)), (
+            await render_template(
+                "avatars.html",
+                data=data.response,
+            )
+        )
+
+    return await cached(f"avatars:{user_id}", 60, render)
 
 
 @app.route("/")
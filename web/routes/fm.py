@@ -4,15 +4,19 @@ import sys
 sys.path.append("../")
 
 import asyncio
+import collections
 import io
 import json
 import random
+import time
 
 from urllib.parse import quote
 import aiohttp
 from quart import Blueprint, jsonify, request, send_file
 from xxhash import xxh64_hexdigest
 
+from tools.utilities.aliases import artist_aliases
+
 router = Blueprint("fm", __name__, subdomain="fm")
 
 
@@ -790,66 +794,19 @@ async def track_search():
     # description="Index a Last.fm user's artist library",
     # parameters={
     #    "username": "Last.fm username",
+    #    "page": "Page to resume from (default: 1)",
+    #    "format": "json or ndjson (default: json)",
     # },
 )
 async def library_artists():
-    username = request.args.get("username") or request.args.get("user")
-    if not username:
-        raise ValueError("Parameter 'username' is required.")
-
-    data = await response(
-        {
-            "method": "user.getTopArtists",
-            "username": username,
-            "limit": 1000,
-            "page": 1,
-            "autocorrect": 1,
-        },
+    return await library(
+        "user.getTopArtists",
         "topartists",
-    )
-    pages = int(data["@attr"]["totalPages"])
-
-    artists = list()
-    artists.extend(
-        [
-            {
-                "name": artist["name"],
-                "plays": int(artist["playcount"]),
-            }
-            for artist in data["artist"]
-        ]
-    )
-
-    if pages > 1:
-        tasks = list()
-        for page in range(2, pages + 1):
-            tasks.append(
-                response(
-                    {
-                        "method": "user.getTopArtists",
-                        "username": username,
-                        "limit": 1000,
-                        "page": page,
-                        "autocorrect": 1,
-                    },
-                    "topartists",
-                )
-            )
-        data = await asyncio.gather(*tasks)
-        for item in data:
-            artists.extend(
-                [
-                    {
-                        "name": artist["name"],
-                        "plays": int(artist["playcount"]),
-                    }
-                    for artist in item["artist"]
-                ]
-            )
-
-    return (
-        jsonify(artists),
-        200,
+        "artist",
+        lambda artist: {
+            "name": artist["name"],
+            "plays": int(artist["playcount"]),
+        },
     )
 
 
@@ -859,68 +816,20 @@ async def library_artists():
     # description="Index a Last.fm user's album library",
     # parameters={
     #    "username": "Last.fm username",
+    #    "page": "Page to resume from (default: 1)",
+    #    "format": "json or ndjson (default: json)",
     # },
 )
 async def library_albums():
-    username = request.args.get("username") or request.args.get("user")
-    if not username:
-        raise ValueError("Parameter 'username' is required.")
-
-    data = await response(
-        {
-            "method": "user.getTopAlbums",
-            "username": username,
-            "limit": 1000,
-            "page": 1,
-            "autocorrect": 1,
-        },
+    return await library(
+        "user.getTopAlbums",
         "topalbums",
-    )
-    pages = int(data["@attr"]["totalPages"])
-
-    albums = list()
-    albums.extend(
-        [
-            {
-                "artist": album["artist"]["name"],
-                "name": album["name"],
-                "plays": int(album["playcount"]),
-            }
-            for album in data["album"]
-        ]
-    )
-
-    if pages > 1:
-        tasks = list()
-        for page in range(2, pages + 1):
-            tasks.append(
-                response(
-                    {
-                        "method": "user.getTopAlbums",
-                        "username": username,
-                        "limit": 1000,
-                        "page": page,
-                        "autocorrect": 1,
-                    },
-                    "topalbums",
-                )
-            )
-        data = await asyncio.gather(*tasks)
-        for item in data:
-            albums.extend(
-                [
-                    {
-                        "artist": album["artist"]["name"],
-                        "name": album["name"],
-                        "plays": int(album["playcount"]),
-                    }
-                    for album in item["album"]
-                ]
-            )
-
-    return (
-        jsonify(albums),
-        200,
+        "album",
+        lambda album: {
+            "artist": album["artist"]["name"],
+            "name": album["name"],
+            "plays": int(album["playcount"]),
+        },
     )
 
 
@@ -930,68 +839,179 @@ async def library_albums():
     # description="Index a Last.fm user's track library",
     # parameters={
     #    "username": "Last.fm username",
+    #    "page": "Page to resume from (default: 1)",
+    #    "format": "json or ndjson (default: json)",
     # },
 )
 async def library_tracks():
+    return await library(
+        "user.getTopTracks",
+        "toptracks",
+        "track",
+        lambda track: {
+            "artist": track["artist"]["name"],
+            "name": track["name"],
+            "plays": int(track["playcount"]),
+        },
+    )
+
+
+class TokenBucket:
+    """Pace requests to the Last.fm API across every library crawl."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.rate
+        )
+        self.updated = now
+
+    async def acquire(self):
+        async with self.lock:
+            self.refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self.refill()
+
+            self.tokens -= 1
+
+    def penalize(self, seconds: float):
+        """Hold every crawl back after being rate limited."""
+
+        self.refill()
+        self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+LIBRARY_LIMITER = TokenBucket(rate=4, capacity=8)
+LIBRARY_CONCURRENCY = 3
+LIBRARY_RETRIES = 4
+
+
+async def library_page(method: str, parameter: str, username: str, page: int):
+    for attempt in range(LIBRARY_RETRIES):
+        await LIBRARY_LIMITER.acquire()
+        try:
+            return await response(
+                {
+                    "method": method,
+                    "username": username,
+                    "limit": 1000,
+                    "page": page,
+                    "autocorrect": 1,
+                },
+                parameter,
+            )
+        except ValueError as error:
+            status = error.args[1] if len(error.args) > 1 else 400
+            if (status != 429 and status < 500) or attempt == LIBRARY_RETRIES - 1:
+                raise
+
+            if status == 429:
+                LIBRARY_LIMITER.penalize(2**attempt)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            if attempt == LIBRARY_RETRIES - 1:
+                raise
+
+        await asyncio.sleep(2**attempt + random.random())
+
+
+async def crawl(method: str, parameter: str, username: str, start: int = 1):
+    """Yield (page, pages, data) for every library page in order, data is None when a page failed."""
+
+    data = await library_page(method, parameter, username, start)
+    pages = int(data["@attr"]["totalPages"])
+    yield start, pages, data
+
+    window = collections.deque()
+    following = start + 1
+    try:
+        while window or following <= pages:
+            while following <= pages and len(window) < LIBRARY_CONCURRENCY:
+                window.append(
+                    (
+                        following,
+                        asyncio.ensure_future(
+                            library_page(method, parameter, username, following)
+                        ),
+                    )
+                )
+                following += 1
+
+            page, task = window.popleft()
+            try:
+                data = await task
+            except (ValueError, aiohttp.ClientError, asyncio.TimeoutError):
+                data = None
+
+            yield page, pages, data
+    finally:
+        for _, task in window:
+            task.cancel()
+
+
+async def library(method: str, parameter: str, key: str, serialize):
     username = request.args.get("username") or request.args.get("user")
     if not username:
         raise ValueError("Parameter 'username' is required.")
 
-    data = await response(
-        {
-            "method": "user.getTopTracks",
-            "username": username,
-            "limit": 1000,
-            "page": 1,
-            "autocorrect": 1,
-        },
-        "toptracks",
+    ndjson = request.args.get("format") == "ndjson"
+    pages = crawl(
+        method, parameter, username, max(int(request.args.get("page", 1)), 1)
     )
-    pages = int(data["@attr"]["totalPages"])
+    # The first page is fetched up front so its errors keep their status codes.
+    first = await pages.__anext__()
+
+    async def stream():
+        separator = ""
+        failed = []
+        if not ndjson:
+            yield "["
+
+        async def each():
+            yield first
+            try:
+                async for item in pages:
+                    yield item
+            finally:
+                await pages.aclose()
+
+        async for page, total, data in each():
+            if data is None:
+                failed.append(page)
+                if ndjson:
+                    yield json.dumps({"failed": page}) + "\n"
+
+                continue
+
+            for item in data[key]:
+                if ndjson:
+                    yield json.dumps(serialize(item)) + "\n"
+                else:
+                    yield separator + json.dumps(serialize(item))
+                    separator = ","
 
-    tracks = list()
-    tracks.extend(
-        [
-            {
-                "artist": track["artist"]["name"],
-                "name": track["name"],
-                "plays": int(track["playcount"]),
-            }
-            for track in data["track"]
-        ]
-    )
+            if ndjson:
+                yield json.dumps({"checkpoint": page, "pages": total}) + "\n"
 
-    if pages > 1:
-        tasks = list()
-        for page in range(2, pages + 1):
-            tasks.append(
-                response(
-                    {
-                        "method": "user.getTopTracks",
-                        "username": username,
-                        "limit": 1000,
-                        "page": page,
-                        "autocorrect": 1,
-                    },
-                    "toptracks",
-                )
-            )
-        data = await asyncio.gather(*tasks)
-        for item in data:
-            tracks.extend(
-                [
-                    {
-                        "artist": track["artist"]["name"],
-                        "name": track["name"],
-                        "plays": int(track["playcount"]),
-                    }
-                    for track in item["track"]
-                ]
-            )
+        if not ndjson:
+            # The status is already sent, so a partial library ends with a marker
+            # the client has to check before trusting the array.
+            if failed:
+                yield separator + json.dumps({"failed": failed, "pages": total})
+
+            yield "]"
 
     return (
-        jsonify(tracks),
+        stream(),
         200,
+        {"Content-Type": "application/x-ndjson" if ndjson else "application/json"},
     )
 
 
@@ -1028,49 +1048,10 @@ async def response(payload: dict, parameter: str = None, **kwargs: dict):
                     raise ValueError("Last.fm API returned an empty response", 404)
 
                 if autocorrect:
-                    data = json.dumps(data)
-                    data = replace_artist(
-                        data,
-                        "Lucky Twice",
-                        "Lucki",
-                    )
-                    data = replace_artist(
-                        data,
-                        "LUCKI",
-                        "Lucki",
-                    )
-                    data = replace_artist(
-                        data,
-                        "yeat",
-                        "Yeat",
-                    )
-                    data = replace_artist(
-                        data,
-                        "Ken Car$on",
-                        "Ken Carson",
-                    )
-                    data = replace_artist(
-                        data,
-                        "SLEEPY HALLOW",
-                        "Sleepy Hallow",
-                    )
-                    data = replace_artist(
-                        data,
-                        "LIL TRACY",
-                        "Lil Tracy",
-                    )
-                    data = json.loads(data)
+                    artist_aliases.apply(data)
                 return data if not parameter else data[parameter]
 
 
-def replace_artist(text: str, source: str, output: str):
-    return (
-        text.replace(f'"artist": "{source}"', f'"artist": "{output}"')
-        .replace(f'"name": "{source}"', f'"name": "{output}"')
-        .replace(f'"#text": "{source}"', f'"#text": "{output}"')
-    )
-
-
 def replace_timeframe(period: str, human: bool = False, collage: bool = False):
     period = period.lower().replace(" ", "")
     if not human:
@@ -1163,9 +1144,9 @@ def replace_size(size: str):
     row, col = size.split("x")
     if not row.isdigit() or not col.isdigit():
         raise ValueError("Collage size invalid")
-    if (int(row) + int(col)) < 2:
+    if min(int(row), int(col)) < 1:
         raise ValueError("Collage size is too small")
-    elif (int(row) + int(col)) > 20:
+    elif max(int(row), int(col)) > 10:
         raise ValueError("Collage size is too large")
 
     return (